@@ -10,4 +10,7 @@ from .appliance_category import ApplianceCategory
 from .appliance_parameter import ApplianceParameter
 from .appliance import Appliance
 from .log import Log, LogValue
+from .log_storage import LogStorage, EAVLogStorage, WideLogStorage
+from .log_rollup import LogRollup, HourlyLogRollup, DailyLogRollup
+from .log_partition import LogPartition
 from .reports import Report, ReportColumn, ReportSection, AggregationType
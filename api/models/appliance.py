@@ -4,6 +4,7 @@ from api.utils.error_messages import model_operations
 
 
 class Appliance(UserActionBase, OrgBaseModel):
+    __track_generations__ = True
     _ORG_ID_NULLABLE = False
 
     label = db.Column(db.String(50), nullable=False)
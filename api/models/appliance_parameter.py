@@ -4,6 +4,7 @@ from api.utils.error_messages import serialization_error
 
 
 class ApplianceParameter(BaseModel):
+    __track_generations__ = True
     _ORG_ID_NULLABLE = False
     appliance_id = db.Column(db.String(21), db.ForeignKey('Appliance.id'))
 
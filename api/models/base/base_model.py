@@ -1,19 +1,28 @@
+import collections
+import enum
+import io
+import json
 from settings import db
 from api.utils.time_util import TimeUtil
 from api.utils.error_messages import model_operations
 from api.utils.exceptions import UniqueConstraintException, ModelOperationException
 from sqlalchemy.ext.declarative import declared_attr, AbstractConcreteBase
-from sqlalchemy import exc, orm
+from sqlalchemy import event, exc, orm
 import numpy as np
+import psycopg2
 from psycopg2 import errors
 from api.utils.id_generator import IDGenerator
 
+ORG_COUNT_DELTAS = 'org_count_deltas'
+CHANGED_GENERATIONS = 'changed_generations'
+
 
 class BaseModel(db.Model):
     __abstract__ = True
     __unique_constraints__ = []
     __unique_violation_msg__ = None
     __missing_fk_error_msg__ = {}
+    __track_generations__ = False
     id = db.Column(db.String(21),
                    primary_key=True,
                    default=IDGenerator.generate_id)
@@ -83,38 +92,53 @@ class BaseModel(db.Model):
                 db.session.flush()
         except exc.IntegrityError as e:
             db.session.rollback()
+            cls._raise_integrity_error(e)
 
-            if isinstance(e.orig, errors.UniqueViolation):
-                import api.models
-                model_name = e.orig.diag.table_name
-                model = getattr(api.models, model_name)
-                raise UniqueConstraintException(
-                    message=model.__unique_violation_msg__)
-            elif isinstance(e.orig, errors.ForeignKeyViolation):
-                err_string = e.orig.diag.message_detail.split('=')[0]
-                err_key = err_string.split('Key ')[1][1:-1]
-                error_msg = model_operations['ids_not_found']
-                error_msg = cls.__missing_fk_error_msg__.get(
-                    err_key, error_msg)
-                raise ModelOperationException(
-                    message=error_msg,
-                    api_message=error_msg,
-                    status_code=404,
-                )
-            elif isinstance(e.orig, errors.NotNullViolation):
-                missing_column_name = e.orig.pgerror.split(
-                    'ERROR:  null value in column "')
-                missing_column_name = missing_column_name[1].split('"')[0]
-                raise ModelOperationException(
-                    message=model_operations['column_must_have_a_value'].
-                    format(missing_column_name),
-                    api_message=model_operations['column_must_have_a_value'].
-                    format(missing_column_name),
-                    status_code=400,
-                )
-            else:
+    @classmethod
+    def _raise_integrity_error(cls, e):
+        """Re-raises an IntegrityError as an exception the API can handle
+
+        Args:
+            e(sqlalchemy.exc.IntegrityError|psycopg2.IntegrityError): the error
+                raised by the database
 
-                raise e
+        Raise:
+            UniqueConstraintException: when a unique constraint is violated
+            ModelOperationException: when a foreign key is missing or a required
+                column is null
+            sqlalchemy.exc.IntegrityError: for any other integrity error
+        """
+        orig = getattr(e, 'orig', e)
+        if isinstance(orig, errors.UniqueViolation):
+            import api.models
+            model_name = orig.diag.table_name
+            model = getattr(api.models, model_name)
+            raise UniqueConstraintException(
+                message=model.__unique_violation_msg__)
+        elif isinstance(orig, errors.ForeignKeyViolation):
+            err_string = orig.diag.message_detail.split('=')[0]
+            err_key = err_string.split('Key ')[1][1:-1]
+            error_msg = model_operations['ids_not_found']
+            error_msg = cls.__missing_fk_error_msg__.get(err_key, error_msg)
+            raise ModelOperationException(
+                message=error_msg,
+                api_message=error_msg,
+                status_code=404,
+            )
+        elif isinstance(orig, errors.NotNullViolation):
+            missing_column_name = orig.pgerror.split(
+                'ERROR:  null value in column "')
+            missing_column_name = missing_column_name[1].split('"')[0]
+            raise ModelOperationException(
+                message=model_operations['column_must_have_a_value'].format(
+                    missing_column_name),
+                api_message=model_operations['column_must_have_a_value'].
+                format(missing_column_name),
+                status_code=400,
+            )
+        else:
+
+            raise e
 
     @classmethod
     def _compare_column(cls, obj, constraint_col):
@@ -197,18 +221,281 @@ class BaseModel(db.Model):
             None: Inserts the data and returns nothing
         """
         cls.before_bulk_create(iterable, *args, **kwargs)
-        model_objs = []
-        for data in iterable:
-            if not isinstance(data, cls):
-                data = cls(**data)
-            data.id = data.id if data.id else IDGenerator.generate_id()
-            model_objs.append(data)
+        model_objs = [
+            data if isinstance(data, cls) else cls(**data) for data in iterable
+        ]
+        cls._assign_ids(model_objs)
 
         db.session.bulk_save_objects(model_objs)
+        cls.track_org_counts(model_objs)
+        cls.track_generations(model_objs)
         cls._commit_or_flush(kwargs.get('commit', True))
         cls.after_bulk_create(model_objs, *args, **kwargs)
         return model_objs
 
+    @classmethod
+    def bulk_insert(cls, rows, commit=True, chunk_size=1000):
+        """Inserts dicts of column values with multi-row INSERT statements
+
+        Unlike `bulk_create`, no model object is created and every `chunk_size`
+        rows are sent to the database as a single `INSERT ... VALUES (...), (...)`
+        statement. The `id` and `created_at` of rows that do not have them are
+        generated.
+
+        Args:
+            rows(list): a list of dicts mapping column names to values
+            commit(bool, optional): commits the transaction when True else flushes
+            chunk_size(int, optional): the max number of rows in one statement
+
+        Returns:
+            list: the rows that were inserted
+        """
+        now = TimeUtil.now()
+        cls._assign_ids(rows)
+        for row in rows:
+            row['created_at'] = row.get('created_at') or now
+
+        try:
+            for index in range(0, len(rows), chunk_size):
+                db.session.execute(cls.__table__.insert().values(
+                    rows[index:index + chunk_size]))
+        except exc.IntegrityError as e:
+            db.session.rollback()
+            cls._raise_integrity_error(e)
+        cls.track_org_counts(rows)
+        cls.track_generations(rows)
+        cls._commit_or_flush(commit)
+        return rows
+
+    @classmethod
+    def bulk_copy(cls, iterable, *args, **kwargs):
+        """Inserts bulk data into the database with PostgreSQL's COPY
+
+        This is the faster alternative of `bulk_create` for large inputs. The rows
+        are written as CSV to an in-memory buffer that is streamed to the database
+        with a single `COPY ... FROM STDIN` on the connection of the session so
+        the rows are part of the current transaction.
+
+        The IDs, `created_at` and column defaults of rows that do not have them
+        are generated before the copy and set on the items in the iterable.
+
+        Args:
+            iterable: An iterable object where each item is either a dict or
+                this model_instance
+
+        Returns:
+            list: the items in the iterable
+        """
+        cls.before_bulk_create(iterable, *args, **kwargs)
+        items = list(iterable)
+        cls._assign_ids(items)
+        columns = list(cls.__table__.columns)
+        now = TimeUtil.now()
+        buffer = io.StringIO()
+        for item in items:
+            is_model = isinstance(item, cls)
+            row = []
+            for column in columns:
+                value = getattr(item, column.key) if is_model else item.get(
+                    column.key)
+                if value is None:
+                    value = cls._generate_default_value(column, now)
+                    if is_model:
+                        setattr(item, column.key, value)
+                    elif value is not None:
+                        item[column.key] = value
+                row.append(cls._to_csv_value(value))
+            buffer.write(','.join(row))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        preparer = db.engine.dialect.identifier_preparer
+        column_names = ', '.join(
+            preparer.quote(column.name) for column in columns)
+        copy_sql = (f'COPY {preparer.format_table(cls.__table__)} '
+                    f'({column_names}) FROM STDIN WITH (FORMAT csv)')
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(copy_sql, buffer)
+        except psycopg2.IntegrityError as e:
+            db.session.rollback()
+            cls._raise_integrity_error(e)
+        finally:
+            cursor.close()
+
+        cls.track_org_counts(items)
+        cls.track_generations(items)
+        cls._commit_or_flush(kwargs.get('commit', True))
+        cls.after_bulk_create(items, *args, **kwargs)
+        return items
+
+    @classmethod
+    def org_count_key(cls, org_id):
+        """Retrieves the redis key of the number of rows an organisation has"""
+        return f'{cls.__tablename__}_{org_id}_COUNT'
+
+    @classmethod
+    def track_org_counts(cls, items, delta=1, session=None):
+        """Records the change in the number of rows of each organisation
+
+        The changes are kept in the session and added to the cached counters once
+        the transaction is committed (see `_apply_org_count_deltas`). Rows
+        inserted with `session.add` and deleted with `session.delete` are tracked
+        when the session is flushed.
+
+        Args:
+            items(list): the dicts or model objects that were inserted or deleted
+            delta(int, optional): 1 for inserted rows and -1 for deleted rows
+            session(sqlalchemy.orm.Session, optional): defaults to `db.session`
+        """
+        if 'organisation_id' not in cls.__table__.columns:
+            return
+        session = session or db.session()
+        deltas = session.info.setdefault(ORG_COUNT_DELTAS,
+                                         collections.Counter())
+        for item in items:
+            org_id = item.get('organisation_id') if isinstance(
+                item, dict) else item.organisation_id
+            if org_id:
+                deltas[cls.org_count_key(org_id)] += delta
+
+    @classmethod
+    def generation_keys(cls, org_id=None):
+        """Retrieves the redis keys of the generations of the rows of an organisation
+
+        The generation of the model is bumped by changes to rows that do not
+        belong to an organisation and by bulk updates and deletes, while the
+        generation of an organisation is bumped by changes to its rows. Data read
+        from the rows an organisation can see is up to date as long as both
+        generations have not changed.
+
+        Returns:
+            list: the key of the generation of the model followed by the key of
+                the generation of the organisation when an org_id is specified
+        """
+        keys = [f'{cls.__tablename__}_GENERATION']
+        if org_id and 'organisation_id' in cls.__table__.columns:
+            keys.append(f'{cls.__tablename__}_{org_id}_GENERATION')
+        return keys
+
+    @classmethod
+    def track_generations(cls, items=None, session=None):
+        """Records that the rows of the organisations of the items have changed
+
+        Only models whose `__track_generations__` is True are tracked. The
+        generations are bumped once the transaction is committed (see
+        `_bump_generations`). Rows changed with `session.add`, `session.delete`
+        and by updating a model are tracked when the session is flushed.
+
+        Args:
+            items(list, optional): the dicts or model objects that changed. The
+                generation of the model is bumped when it is not specified
+            session(sqlalchemy.orm.Session, optional): defaults to `db.session`
+        """
+        if not cls.__track_generations__:
+            return
+        session = session or db.session()
+        changed = session.info.setdefault(CHANGED_GENERATIONS, set())
+        if items is None:
+            changed.update(cls.generation_keys())
+            return
+        for item in items:
+            org_id = item.get('organisation_id') if isinstance(
+                item, dict) else getattr(item, 'organisation_id', None)
+            changed.add(cls.generation_keys(org_id)[-1])
+
+    @staticmethod
+    def _assign_ids(items):
+        """Gives the dicts or model objects that do not have an ID a new one
+
+        The IDs are generated with a single `IDGenerator.generate_ids` call.
+        """
+        missing_id_items = [
+            item for item in items
+            if not (item.get('id') if isinstance(item, dict) else item.id)
+        ]
+        new_ids = IDGenerator.generate_ids(len(missing_id_items))
+        for item, new_id in zip(missing_id_items, new_ids):
+            if isinstance(item, dict):
+                item['id'] = new_id
+            else:
+                item.id = new_id
+
+    @staticmethod
+    def _generate_default_value(column, now):
+        if column.key == 'created_at':
+            return now
+        if column.default is None:
+            return None
+        if column.default.is_callable:
+            return column.default.arg(None)
+        return column.default.arg
+
+    @staticmethod
+    def _to_csv_value(value):
+        """Converts a value to a CSV field that COPY can read
+
+        Every non-null value is quoted so that an unquoted empty field always
+        means NULL.
+        """
+        if value is None:
+            return ''
+        if isinstance(value, enum.Enum):
+            value = value.name
+        elif isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        elif hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        value = str(value).replace('"', '""')
+        return f'"{value}"'
+
+
+@event.listens_for(orm.Session, 'after_flush')
+def _track_flushed_org_counts(session, flush_context):
+    for instances, delta in ((session.new, 1), (session.deleted, -1)):
+        for instance in instances:
+            if isinstance(instance, BaseModel):
+                instance.track_org_counts([instance], delta, session)
+
+
+@event.listens_for(orm.Session, 'after_flush')
+def _track_flushed_generations(session, flush_context):
+    for instances in (session.new, session.dirty, session.deleted):
+        for instance in instances:
+            if isinstance(instance, BaseModel):
+                instance.track_generations([instance], session)
+
+
+@event.listens_for(orm.Session, 'after_bulk_update')
+@event.listens_for(orm.Session, 'after_bulk_delete')
+def _track_bulk_generations(update_context):
+    mapper = update_context.mapper
+    if mapper is not None and issubclass(mapper.class_, BaseModel):
+        mapper.class_.track_generations(session=update_context.session)
+
+
+@event.listens_for(orm.Session, 'after_commit')
+def _apply_org_count_deltas(session):
+    from api.services.redis_util import RedisUtil
+    deltas = session.info.pop(ORG_COUNT_DELTAS, None) or {}
+    for key, delta in deltas.items():
+        if delta:
+            RedisUtil.increment_existing_key(key, delta)
+
+
+@event.listens_for(orm.Session, 'after_commit')
+def _bump_generations(session):
+    from api.services.redis_util import RedisUtil
+    keys = session.info.pop(CHANGED_GENERATIONS, None)
+    if keys:
+        RedisUtil.increment_keys(sorted(keys))
+
+
+@event.listens_for(orm.Session, 'after_rollback')
+def _discard_org_count_deltas(session):
+    session.info.pop(ORG_COUNT_DELTAS, None)
+    session.info.pop(CHANGED_GENERATIONS, None)
+
 
 class OrgBaseModel(BaseModel):
     __abstract__ = True
@@ -1,20 +1,96 @@
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.declarative import declared_attr
 from settings import db
+from api.utils.time_util import TimeUtil
 from .base import OrgBaseModel, UserActionBase, BaseModel
 from api.utils.error_messages import serialization_error
 
 
-class Log(UserActionBase, OrgBaseModel):
+def created_at_brin_index(name):
+    """Generates a BRIN index on `created_at`
+
+    Logs arrive roughly in time order so `created_at` follows the physical order
+    of the rows and a BRIN index, which stores the min and max `created_at` of
+    each range of pages, is a fraction of the size of a B-tree. New pages are
+    summarized as they are filled (`autosummarize`).
+    """
+    return db.Index(name,
+                    'created_at',
+                    postgresql_using='brin',
+                    postgresql_with={'autosummarize': 'on'})
+
+
+class PartitionedByCreatedAt:
+    """Range partitions the table of a model by `created_at`
+
+    PostgreSQL requires the partition key in the primary key, so the primary key
+    of the table is `(id, created_at)` while the model is still identified by its
+    `id`. The partitions are managed by `LogPartition` and rows that are not in
+    the range of any partition are stored in the `DEFAULT` partition.
+    """
+    created_at = db.Column(db.DateTime(timezone=True),
+                           default=TimeUtil.now,
+                           primary_key=True)
+
+    @declared_attr
+    def __table_args__(cls):
+        return (*cls.generate_table_args(), {
+            'postgresql_partition_by': 'RANGE (created_at)'
+        })
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {'primary_key': [cls.__table__.c.id]}
+
+    @classmethod
+    def default_partition_name(cls):
+        return f'{cls.__tablename__}_default'
+
+    @classmethod
+    def created_between(cls, start_date, end_date):
+        """Generates a filter for rows created within a date range
+
+        The dates are converted to a half-open timestamp range so the filter can
+        prune the partitions and use the BRIN index on `created_at`.
+
+        Args:
+            start_date(date): the first day in the range
+            end_date(date): the last day in the range
+
+        Returns:
+            sqlalchemy.sql.elements.BooleanClauseList: the filter expression
+        """
+        start, end = TimeUtil.date_range_to_timestamps(start_date, end_date)
+        return (cls.created_at >= start) & (cls.created_at < end)
+
+
+class Log(PartitionedByCreatedAt, UserActionBase, OrgBaseModel):
     _ORG_ID_NULLABLE = False
     appliance_id = db.Column(db.String(21),
                              db.ForeignKey('Appliance.id'),
                              nullable=False)
     appliance = db.relationship("Appliance", back_populates='logs', lazy=True)
     log_values = db.relationship("LogValue", back_populates='log', lazy=True)
+    # the values of the log when it is saved by the wide log storage
+    numeric_values = db.Column(JSONB, nullable=True)
+    text_values = db.Column(JSONB, nullable=True)
+    pivoted_values = None
     __unique_violation_msg__ = serialization_error['exists_in_org'].format(
         'Log')
 
+    @classmethod
+    def generate_table_args(cls):
+        t_args = [*super().generate_table_args()]
+        t_args.extend([
+            created_at_brin_index('log_created_at_brin_index'),
+            db.Index('log_appliance_id_index', 'appliance_id'),
+            db.Index('log_organisation_id_index', 'organisation_id'),
+        ])
+        return tuple(t_args)
 
-class LogValue(BaseModel):
+
+class LogValue(PartitionedByCreatedAt, BaseModel):
     text_value = db.Column(db.String)
     numeric_value = db.Column(db.Float(precision=2), nullable=True)
     parameter_id = db.Column(
@@ -22,9 +98,28 @@ class LogValue(BaseModel):
         db.ForeignKey('Parameter.id'),
         nullable=False,
     )
-    log_id = db.Column(
-        db.String(21),
-        db.ForeignKey('Log.id', ondelete='CASCADE'),
-        nullable=False,
-    )
+    # the values are stored in the partition of their log since the
+    # `created_at` of a value is the `created_at` of its log
+    log_id = db.Column(db.String(21), nullable=False)
     log = db.relationship("Log", back_populates='log_values', lazy=True)
+
+    @classmethod
+    def generate_table_args(cls):
+        t_args = [*super().generate_table_args()]
+        t_args.extend([
+            db.ForeignKeyConstraint(['log_id', 'created_at'],
+                                    ['Log.id', 'Log.created_at'],
+                                    ondelete='CASCADE'),
+            db.Index('log_value_log_id_parameter_id_index', 'log_id',
+                     'parameter_id'),
+            db.Index('log_value_parameter_id_index', 'parameter_id'),
+            created_at_brin_index('log_value_created_at_brin_index'),
+        ])
+        return tuple(t_args)
+
+
+for model in (Log, LogValue):
+    event.listen(
+        model.__table__, 'after_create',
+        DDL(f'CREATE TABLE "{model.default_partition_name()}" '
+            f'PARTITION OF "{model.__tablename__}" DEFAULT'))
@@ -0,0 +1,264 @@
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from dateutil import parser
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+from settings import db
+from api.utils.time_util import TimeUtil
+from .log import Log, LogValue
+
+_BOUNDS_REGEX = re.compile(
+    r"FROM \('(?P<start>[^']+)'\) TO \('(?P<end>[^']+)'\)")
+
+
+class LogPartition:
+    """Creates and detaches the range partitions of the log tables
+
+    `Log` and `LogValue` are partitioned by `created_at` with one partition per
+    `INTERVAL` (`month` by default, `week` or `day`) whose bounds are in UTC.
+    Both tables always have the same partitions since a value is stored in the
+    partition of its log.
+
+    `maintain` is run periodically by `LogPartitionManager`. It pre-creates the
+    partitions of the next `PARTITIONS_AHEAD` intervals and detaches the
+    partitions whose logs are older than `RETENTION_DAYS`, when it is set. The
+    detached tables are kept so they can be archived or dropped.
+
+    The partitions that are no longer written to can be rewritten in
+    `(appliance_id, created_at)` order with `cluster_historical`.
+    """
+    MODELS = (Log, LogValue)
+    INTERVAL = os.getenv('LOG_PARTITION_INTERVAL', 'month')
+    PARTITIONS_AHEAD = int(os.getenv('LOG_PARTITIONS_AHEAD', 3))
+    RETENTION_DAYS = os.getenv('LOG_RETENTION_DAYS')
+
+    @classmethod
+    def bounds_of(cls, timestamp):
+        """Returns the `(start, end)` UTC bounds of the partition of a timestamp"""
+        timestamp = timestamp.astimezone(timezone.utc)
+        start = datetime.combine(timestamp.date(),
+                                 datetime.min.time(),
+                                 tzinfo=timezone.utc)
+        if cls.INTERVAL == 'month':
+            start = start.replace(day=1)
+            return start, start + relativedelta(months=1)
+        if cls.INTERVAL == 'week':
+            start -= timedelta(days=start.weekday())
+            return start, start + timedelta(weeks=1)
+        if cls.INTERVAL == 'day':
+            return start, start + timedelta(days=1)
+        raise ValueError(f'Unknown log partition interval `{cls.INTERVAL}`')
+
+    @staticmethod
+    def partition_name(model, start):
+        return f'{model.__tablename__}_{start:%Y%m%d}'
+
+    @staticmethod
+    def partitions_of(model):
+        """Retrieves the range partitions of the table of a model
+
+        Returns:
+            list: `(name, start, end)` tuples ordered by `start`. The `DEFAULT`
+                partition is not included
+        """
+        rows = db.session.execute(
+            text('''SELECT child.relname,
+                    pg_get_expr(child.relpartbound, child.oid)
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = CAST(:table AS regclass)'''),
+            {'table': f'"{model.__tablename__}"'})
+        partitions = []
+        for name, bounds in rows:
+            match = _BOUNDS_REGEX.search(bounds)
+            if match:
+                partitions.append((name, parser.parse(match.group('start')),
+                                   parser.parse(match.group('end'))))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    @staticmethod
+    def _create_table_like(model, name):
+        db.session.execute(
+            text(f'''CREATE TABLE "{name}" (LIKE "{model.__tablename__}"
+                INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'''))
+
+    @staticmethod
+    def _attach(model, name, start, end):
+        db.session.execute(
+            text(f'''ALTER TABLE "{model.__tablename__}" ATTACH PARTITION
+                "{name}" FOR VALUES FROM (:start) TO (:end)'''), {
+                'start': start,
+                'end': end
+            })
+
+    @staticmethod
+    def _detach(model, name):
+        """Detaches a partition and drops the foreign keys it has to `Log`"""
+        db.session.execute(
+            text(f'''ALTER TABLE "{model.__tablename__}"
+                DETACH PARTITION "{name}"'''))
+        foreign_keys = db.session.execute(
+            text('''SELECT conname FROM pg_constraint
+                WHERE conrelid = CAST(:table AS regclass)
+                    AND confrelid = CAST(:parent AS regclass)'''), {
+                'table': f'"{name}"',
+                'parent': f'"{Log.__tablename__}"'
+            })
+        for foreign_key, in foreign_keys.fetchall():
+            db.session.execute(
+                text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{foreign_key}"'))
+
+    @classmethod
+    def create(cls, timestamp):
+        """Creates the partitions of the interval of a timestamp in every log table
+
+        The logs of the interval that were stored in the `DEFAULT` partitions are
+        moved to the new partitions before they are attached since PostgreSQL
+        does not attach a partition whose rows are in the `DEFAULT` partition.
+        The values are moved before their logs so the `ON DELETE CASCADE` of
+        `LogValue` does not delete them.
+
+        Returns:
+            list: the names of the partitions that were created
+        """
+        start, end = cls.bounds_of(timestamp)
+        existing = {
+            model: {name
+                    for name, _, _ in cls.partitions_of(model)}
+            for model in cls.MODELS
+        }
+        new_models = [
+            model for model in cls.MODELS
+            if cls.partition_name(model, start) not in existing[model]
+        ]
+        for model in reversed(new_models):
+            name = cls.partition_name(model, start)
+            cls._create_table_like(model, name)
+            db.session.execute(
+                text(f'''WITH moved AS (
+                        DELETE FROM "{model.default_partition_name()}"
+                        WHERE created_at >= :start AND created_at < :end
+                        RETURNING *)
+                    INSERT INTO "{name}" SELECT * FROM moved'''), {
+                    'start': start,
+                    'end': end
+                })
+        for model in new_models:
+            cls._attach(model, cls.partition_name(model, start), start, end)
+        db.session.commit()
+        return [cls.partition_name(model, start) for model in new_models]
+
+    @classmethod
+    def detach_before(cls, cutoff):
+        """Detaches the partitions whose intervals end at or before a timestamp
+
+        The `LogValue` partitions are detached first so the `Log` partitions have
+        no referencing values.
+
+        Returns:
+            list: the names of the partitions that were detached
+        """
+        detached = []
+        for model in reversed(cls.MODELS):
+            for name, _, end in cls.partitions_of(model):
+                if end > cutoff:
+                    continue
+                cls._detach(model, name)
+                db.session.commit()
+                detached.append(name)
+        return detached
+
+    @classmethod
+    def cluster(cls, timestamp):
+        """Rewrites the partitions of an interval in `(appliance_id, created_at)` order
+
+        The logs of an appliance, and their values, are then stored in
+        contiguous pages so the range scans of an appliance read few pages
+        through the `appliance_id` index. The rows are copied in order into new
+        tables that replace the partitions in one transaction, which blocks the
+        reads and writes of the interval while it runs. `CLUSTER` is not used
+        since `LogValue` has no `appliance_id` to order its rows by.
+
+        Returns:
+            list: the names of the partitions that were clustered
+        """
+        start, end = cls.bounds_of(timestamp)
+        log_name = cls.partition_name(Log, start)
+        value_name = cls.partition_name(LogValue, start)
+        ordered_rows = {
+            Log:
+            f'''SELECT * FROM "{log_name}"
+                ORDER BY appliance_id, created_at, id''',
+            LogValue:
+            f'''SELECT value.* FROM "{value_name}" AS value
+                JOIN "{log_name}" AS log ON log.id = value.log_id
+                    AND log.created_at = value.created_at
+                ORDER BY log.appliance_id, log.created_at, log.id''',
+        }
+        for model in cls.MODELS:
+            name = cls.partition_name(model, start)
+            cls._create_table_like(model, f'{name}_clustered')
+            db.session.execute(
+                text(f'''INSERT INTO "{name}_clustered"
+                    {ordered_rows[model]}'''))
+        for model in reversed(cls.MODELS):
+            name = cls.partition_name(model, start)
+            cls._detach(model, name)
+            db.session.execute(text(f'DROP TABLE "{name}"'))
+            db.session.execute(
+                text(f'''ALTER TABLE "{name}_clustered"
+                    RENAME TO "{name}"'''))
+        for model in cls.MODELS:
+            cls._attach(model, cls.partition_name(model, start), start, end)
+        db.session.commit()
+        for name in (log_name, value_name):
+            db.session.execute(text(f'ANALYZE "{name}"'))
+        db.session.commit()
+        return [log_name, value_name]
+
+    @classmethod
+    def cluster_historical(cls, since=None, now=None):
+        """Clusters the partitions that ended before the current interval
+
+        The partitions of the current and upcoming intervals are still written
+        to so they are not clustered.
+
+        Args:
+            since(datetime, optional): only the partitions that start at or after
+                it are clustered. Defaults to the start of the previous interval
+            now(datetime, optional): the current time. Defaults to `TimeUtil.now()`
+
+        Returns:
+            list: the names of the partitions that were clustered
+        """
+        current_start, _ = cls.bounds_of(now or TimeUtil.now())
+        if since is None:
+            since, _ = cls.bounds_of(current_start - timedelta(microseconds=1))
+        clustered = []
+        for _, start, end in cls.partitions_of(Log):
+            if start >= since and end <= current_start:
+                clustered.extend(cls.cluster(start))
+        return clustered
+
+    @classmethod
+    def maintain(cls, now=None):
+        """Pre-creates the upcoming partitions and detaches the expired ones
+
+        Args:
+            now(datetime, optional): the current time. Defaults to `TimeUtil.now()`
+
+        Returns:
+            dict: the names of the partitions that were `created` and `detached`
+        """
+        now = now or TimeUtil.now()
+        created = []
+        start, _ = cls.bounds_of(now)
+        for _ in range(cls.PARTITIONS_AHEAD + 1):
+            created.extend(cls.create(start))
+            _, start = cls.bounds_of(start)
+        detached = []
+        if cls.RETENTION_DAYS:
+            detached = cls.detach_before(now - timedelta(
+                days=int(cls.RETENTION_DAYS)))
+        return {'created': created, 'detached': detached}
@@ -0,0 +1,254 @@
+from abc import ABCMeta, abstractmethod
+from sqlalchemy import and_, func, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.declarative import declared_attr
+from settings import db
+from api.utils.time_util import TimeUtil
+from .log import Log
+from .log_storage import LogStorage
+
+_UTC = literal_column("'UTC'")
+
+
+class _AbstractModelMeta(ABCMeta, type(db.Model)):
+    """Lets abstract models declare abstract methods like `abc.ABC`"""
+
+
+class LogRollup(db.Model, metaclass=_AbstractModelMeta):
+    """Pre-aggregated numeric log values of a parameter in a time bucket
+
+    Each row holds the count, sum, min, max and sum of squares of the values of
+    one parameter of an appliance within a UTC hour or day, so averages and
+    standard deviations over long ranges can be computed without reading the
+    values of the logs.
+    """
+    __abstract__ = True
+    GRANULARITY = None
+
+    @declared_attr
+    def __tablename__(cls):
+        return cls.__name__
+
+    @declared_attr
+    def organisation_id(cls):
+        return db.Column(db.String(21),
+                         db.ForeignKey('Organisation.id', ondelete='CASCADE'),
+                         nullable=False)
+
+    @declared_attr
+    def appliance_id(cls):
+        return db.Column(db.String(21),
+                         db.ForeignKey('Appliance.id', ondelete='CASCADE'),
+                         primary_key=True)
+
+    @declared_attr
+    def parameter_id(cls):
+        return db.Column(db.String(21),
+                         db.ForeignKey('Parameter.id', ondelete='CASCADE'),
+                         primary_key=True)
+
+    bucket = db.Column(db.DateTime(timezone=True), primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+    sum = db.Column(db.Float, nullable=False)
+    min = db.Column(db.Float, nullable=False)
+    max = db.Column(db.Float, nullable=False)
+    sum_of_squares = db.Column(db.Float, nullable=False)
+
+    @classmethod
+    def model_for(cls, granularity):
+        """Retrieves the rollup model of a granularity
+
+        Args:
+            granularity(str): either `hour` or `day`
+
+        Returns:
+            LogRollup: the rollup model or None if the granularity has no rollup
+        """
+        for model in (HourlyLogRollup, DailyLogRollup):
+            if model.GRANULARITY == granularity:
+                return model
+        return None
+
+    @classmethod
+    def bucket_of(cls, column):
+        """Generates an expression that truncates a timestamp to its UTC bucket"""
+        return func.timezone(
+            _UTC,
+            func.date_trunc(literal_column(f"'{cls.GRANULARITY}'"),
+                            func.timezone(_UTC, column)))
+
+    @classmethod
+    def bucket_end(cls, bucket):
+        return bucket + literal_column(f"INTERVAL '1 {cls.GRANULARITY}'")
+
+    @classmethod
+    def affected_buckets(cls, *log_filters):
+        """Generates a subquery of the buckets of the logs that match the filters
+
+        Returns:
+            sqlalchemy.sql.Alias: a subquery of `(organisation_id, appliance_id,
+                bucket)` rows
+        """
+        bucket = cls.bucket_of(Log.created_at)
+        return select([
+            Log.organisation_id, Log.appliance_id,
+            bucket.label('bucket')
+        ]).where(and_(*log_filters)).group_by(Log.organisation_id,
+                                              Log.appliance_id,
+                                              bucket).alias()
+
+    @classmethod
+    @abstractmethod
+    def source_query(cls, buckets):
+        """Generates the query that aggregates the values of each bucket
+
+        Args:
+            buckets: a subquery with the `appliance_id` and `bucket` to aggregate
+
+        Returns:
+            sqlalchemy.sql.Select: a query whose columns match the rollup columns
+        """
+
+    @classmethod
+    def refresh(cls, buckets):
+        """Recomputes the rollups of the specified buckets
+
+        The existing rows of the buckets are removed first so buckets whose logs
+        were all deleted do not keep stale values.
+
+        Args:
+            buckets: a subquery with the `appliance_id` and `bucket` to recompute
+        """
+        db.session.execute(cls.__table__.delete().where(
+            tuple_(cls.appliance_id, cls.bucket).in_(
+                select([buckets.c.appliance_id, buckets.c.bucket]))))
+        source = cls.source_query(buckets)
+        insert_query = insert(cls.__table__).from_select(
+            [column.name for column in source.columns], source)
+        db.session.execute(
+            insert_query.on_conflict_do_update(
+                index_elements=[
+                    cls.appliance_id, cls.parameter_id, cls.bucket
+                ],
+                set_={
+                    column: insert_query.excluded[column]
+                    for column in ('count', 'sum', 'min', 'max',
+                                   'sum_of_squares')
+                }))
+
+    @staticmethod
+    def refresh_all(*log_filters, commit=True):
+        """Recomputes the hourly and daily rollups of the logs matching the filters
+
+        Args:
+            log_filters: filters on `Log` that select the logs that changed
+            commit(bool, optional): commits the transaction when True
+        """
+        HourlyLogRollup.refresh(HourlyLogRollup.affected_buckets(*log_filters))
+        DailyLogRollup.refresh(DailyLogRollup.affected_buckets(*log_filters))
+        if commit:
+            db.session.commit()
+
+    @staticmethod
+    def rebuild(start_date, end_date, commit=True):
+        """Rebuilds the rollups of every log created within a date range
+
+        Args:
+            start_date(date): the first day in the range
+            end_date(date): the last day in the range
+            commit(bool, optional): commits the transaction when True
+        """
+        start, end = TimeUtil.date_range_to_timestamps(start_date, end_date)
+        for model in (HourlyLogRollup, DailyLogRollup):
+            db.session.execute(
+                model.__table__.delete().where((model.bucket >= start)
+                                               & (model.bucket < end)))
+        LogRollup.refresh_all(Log.created_between(start_date, end_date),
+                              commit=commit)
+
+    @classmethod
+    def pivot_query(cls, org_id, appliance_id, parameters, start_date,
+                    end_date):
+        """Generates a query with one row per bucket and the stats of each parameter
+
+        Every row is `(bucket, average, min, max, ...)` with the average, min and
+        max of each parameter in the order of `parameters`.
+
+        Args:
+            org_id(str): the ID of the organisation of the appliance
+            appliance_id(str): the ID of the appliance
+            parameters(list): the numeric parameters to retrieve
+            start_date(date): the first day in the range
+            end_date(date): the last day in the range
+
+        Returns:
+            sqlalchemy.orm.Query: the query
+        """
+        start, end = TimeUtil.date_range_to_timestamps(start_date, end_date)
+        stat_columns = []
+        for param in parameters:
+            is_param = cls.parameter_id == param.id
+            stat_columns.extend([
+                (func.max(cls.sum).filter(is_param) /
+                 func.max(cls.count).filter(is_param)),
+                func.max(cls.min).filter(is_param),
+                func.max(cls.max).filter(is_param),
+            ])
+        return db.session.query(cls.bucket, *stat_columns).filter(
+            cls.organisation_id == org_id,
+            cls.appliance_id == appliance_id,
+            cls.bucket >= start,
+            cls.bucket < end,
+        ).group_by(cls.bucket).order_by(cls.bucket)
+
+
+class HourlyLogRollup(LogRollup):
+    GRANULARITY = 'hour'
+
+    @classmethod
+    def source_query(cls, buckets):
+        logs_in_buckets = Log.__table__.join(
+            buckets, (Log.organisation_id == buckets.c.organisation_id) &
+            (Log.appliance_id == buckets.c.appliance_id) &
+            (Log.created_at >= buckets.c.bucket) &
+            (Log.created_at < cls.bucket_end(buckets.c.bucket)))
+        from_clause, parameter_id, value = LogStorage.active(
+        ).join_numeric_values(logs_in_buckets)
+        return select([
+            Log.organisation_id,
+            Log.appliance_id,
+            parameter_id.label('parameter_id'),
+            buckets.c.bucket,
+            func.count(value).label('count'),
+            func.sum(value).label('sum'),
+            func.min(value).label('min'),
+            func.max(value).label('max'),
+            func.sum(value * value).label('sum_of_squares'),
+        ]).select_from(from_clause).where(value.isnot(None)).group_by(
+            Log.organisation_id, Log.appliance_id, parameter_id,
+            buckets.c.bucket)
+
+
+class DailyLogRollup(LogRollup):
+    GRANULARITY = 'day'
+
+    @classmethod
+    def source_query(cls, buckets):
+        hourly = HourlyLogRollup
+        return select([
+            hourly.organisation_id,
+            hourly.appliance_id,
+            hourly.parameter_id,
+            buckets.c.bucket,
+            func.sum(hourly.count).label('count'),
+            func.sum(hourly.sum).label('sum'),
+            func.min(hourly.min).label('min'),
+            func.max(hourly.max).label('max'),
+            func.sum(hourly.sum_of_squares).label('sum_of_squares'),
+        ]).select_from(
+            hourly.__table__.join(
+                buckets, (hourly.appliance_id == buckets.c.appliance_id) &
+                (hourly.bucket >= buckets.c.bucket) &
+                (hourly.bucket < cls.bucket_end(buckets.c.bucket)))).group_by(
+                    hourly.organisation_id, hourly.appliance_id,
+                    hourly.parameter_id, buckets.c.bucket)
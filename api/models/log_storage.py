@@ -0,0 +1,273 @@
+import os
+from abc import ABC, abstractmethod
+from sqlalchemy import Float, and_, cast, func, literal_column, select, true
+from settings import db
+from .log import Log, LogValue
+from .parameter import ValueType
+
+_EMPTY_OBJECT = literal_column("'{}'::jsonb")
+
+
+class LogStorage(ABC):
+    """Stores the values of logs and generates the queries that read them
+
+    The views, schemas and aggregations read log values through the storage
+    returned by `LogStorage.active()`, which is selected with the `LOG_STORAGE`
+    environment variable:
+        - `eav` (default): every value is a `LogValue` row (see `EAVLogStorage`)
+        - `wide`: the values are stored in the JSONB columns of the `Log` row
+            (see `WideLogStorage`)
+
+    Logs saved with one storage are not read by the other until they are
+    backfilled (see `WideLogStorage.backfill`).
+    """
+    NAME = None
+    EAGER_LOADING_FIELDS = []
+    ACTIVE_NAME = os.getenv('LOG_STORAGE', 'eav')
+
+    @staticmethod
+    def active():
+        for storage in (EAVLogStorage, WideLogStorage):
+            if storage.NAME == LogStorage.ACTIVE_NAME:
+                return storage
+        raise ValueError(f'Unknown log storage `{LogStorage.ACTIVE_NAME}`')
+
+    @classmethod
+    @abstractmethod
+    def save(cls, log_rows, log_value_rows, commit=True):
+        """Inserts logs and their values
+
+        Args:
+            log_rows(list): dicts of the column values of each `Log`
+            log_value_rows(list): dicts with the `log_id`, `parameter_id`,
+                `numeric_value` and `text_value` of each value
+            commit(bool, optional): commits the transaction when True
+        """
+
+    @classmethod
+    @abstractmethod
+    def pivot_query(cls, parameters, *columns):
+        """Generates a query that returns one row per log with one column per parameter
+
+        NUMERIC parameters come back as numbers while the other value types come
+        back as text. The parameter columns are labelled with the parameter ids
+        and are added after the `columns` specified.
+
+        Args:
+            parameters(list): the parameters that would be pivoted into columns
+            columns: the log columns/entities that should be selected. Defaults
+                to `Log.id` and `Log.created_at`
+
+        Returns:
+            flask_sqlalchemy.BaseQuery: the query
+        """
+
+    @classmethod
+    @abstractmethod
+    def values_of(cls, log):
+        """Retrieves the values of a log keyed by the IDs of their parameters"""
+
+    @classmethod
+    @abstractmethod
+    def join_numeric_values(cls, from_clause):
+        """Joins the numeric values of the logs to a FROM clause that has `Log`
+
+        Returns:
+            tuple: the joined FROM clause, the parameter ID column and the
+                numeric value column
+        """
+
+    @classmethod
+    def created_between(cls, start_date, end_date):
+        """Generates a filter for the logs and values created within a date range
+
+        The filter is on the partition key of every table the storage reads so
+        PostgreSQL only scans the partitions in the range.
+        """
+        return Log.created_between(start_date, end_date)
+
+    @classmethod
+    def appliance_logs_in_date_range(cls, org_id, appliance_id, parameters,
+                                     start_date, end_date):
+        """Returns the pivoted logs of an appliance that were logged within a date range
+
+        Args:
+            org_id(str): the organisation of the appliance
+            appliance_id(str): the appliance whose logs are retrieved
+            parameters(list): the parameters of the appliance
+            start_date(date): the first day in the range
+            end_date(date): the last day in the range
+
+        Returns:
+            flask_sqlalchemy.BaseQuery: a query of `(id, created_at, *values)` rows
+                ordered by `(Log.created_at, Log.id)`
+        """
+        return cls.pivot_query(parameters).filter(
+            Log.organisation_id == org_id,
+            Log.appliance_id == appliance_id,
+            cls.created_between(start_date, end_date),
+        ).order_by(Log.created_at, Log.id)
+
+
+class EAVLogStorage(LogStorage):
+    """Stores every value of a log in its own `LogValue` row
+
+    Reads join the `LogValue` rows and pivot them with `FILTER`-aggregates.
+    """
+    NAME = 'eav'
+    EAGER_LOADING_FIELDS = ['log_values']
+    VALUES_OF_LOG = (LogValue.log_id == Log.id) & (LogValue.created_at
+                                                   == Log.created_at)
+
+    @classmethod
+    def save(cls, log_rows, log_value_rows, commit=True):
+        Log.bulk_insert(log_rows, commit=False)
+        created_at = {
+            log_row['id']: log_row['created_at']
+            for log_row in log_rows
+        }
+        for row in log_value_rows:
+            row['created_at'] = created_at[row['log_id']]
+        LogValue.bulk_copy(log_value_rows, commit=commit)
+
+    @classmethod
+    def pivot_query(cls, parameters, *columns):
+        columns = columns if columns else (Log.id, Log.created_at)
+        value_columns = []
+        for param in parameters:
+            value_column = LogValue.text_value
+            if param.value_type == ValueType.NUMERIC:
+                value_column = LogValue.numeric_value
+            value_columns.append(
+                func.max(value_column).filter(
+                    LogValue.parameter_id == param.id).label(param.id))
+
+        return db.session.query(*columns, *value_columns).join(
+            LogValue, cls.VALUES_OF_LOG).group_by(Log.id, Log.created_at)
+
+    @classmethod
+    def values_of(cls, log):
+        return {
+            log_value.parameter_id: log_value.text_value
+            if log_value.text_value else log_value.numeric_value
+            for log_value in log.log_values
+        }
+
+    @classmethod
+    def join_numeric_values(cls, from_clause):
+        return (from_clause.join(LogValue.__table__, cls.VALUES_OF_LOG),
+                LogValue.parameter_id, LogValue.numeric_value)
+
+    @classmethod
+    def created_between(cls, start_date, end_date):
+        return Log.created_between(start_date,
+                                   end_date) & LogValue.created_between(
+                                       start_date, end_date)
+
+
+class WideLogStorage(LogStorage):
+    """Stores the values of a log in the JSONB columns of its `Log` row
+
+    The numeric values are stored in `Log.numeric_values` and the other values
+    in `Log.text_values`, both keyed by the IDs of their parameters. A log is one
+    row, so reads neither join nor group, and a value costs a key and a number
+    instead of a `LogValue` row with its own ID and timestamps.
+    """
+    NAME = 'wide'
+    BACKFILL_BATCH_SIZE = 1000
+    _VALUE_PAIRS = 'log_numeric_value'
+
+    @classmethod
+    def save(cls, log_rows, log_value_rows, commit=True):
+        values_by_log = {log_row['id']: ({}, {}) for log_row in log_rows}
+        for row in log_value_rows:
+            numeric_values, text_values = values_by_log[row['log_id']]
+            if row['numeric_value'] is not None:
+                numeric_values[row['parameter_id']] = float(
+                    row['numeric_value'])
+            else:
+                text_values[row['parameter_id']] = row['text_value']
+        for log_row in log_rows:
+            log_row['numeric_values'], log_row['text_values'] = values_by_log[
+                log_row['id']]
+        Log.bulk_insert(log_rows, commit=commit)
+
+    @classmethod
+    def pivot_query(cls, parameters, *columns):
+        columns = columns if columns else (Log.id, Log.created_at)
+        value_columns = []
+        for param in parameters:
+            if param.value_type == ValueType.NUMERIC:
+                value_column = cast(Log.numeric_values[param.id].astext, Float)
+            else:
+                value_column = Log.text_values[param.id].astext
+            value_columns.append(value_column.label(param.id))
+        return db.session.query(*columns, *value_columns).select_from(Log)
+
+    @classmethod
+    def values_of(cls, log):
+        return {**(log.numeric_values or {}), **(log.text_values or {})}
+
+    @classmethod
+    def join_numeric_values(cls, from_clause):
+        value_pairs = func.jsonb_each_text(Log.numeric_values).alias(
+            cls._VALUE_PAIRS)
+        return (from_clause.join(value_pairs, true()),
+                literal_column(f'{cls._VALUE_PAIRS}.key'),
+                cast(literal_column(f'{cls._VALUE_PAIRS}.value'), Float))
+
+    @classmethod
+    def backfill(cls, batch_size=None):
+        """Copies the `LogValue` rows of the logs saved by the EAV storage
+
+        The logs whose JSONB columns are null are updated `batch_size` logs
+        at a time in their own transactions, so the command can be stopped and
+        run again. Each batch starts after the last ID of the previous one so
+        the logs that were backfilled are not read again. The `LogValue` rows
+        are kept so the EAV storage can still read the logs.
+
+        Returns:
+            int: the number of logs that were backfilled
+        """
+        batch_size = batch_size or cls.BACKFILL_BATCH_SIZE
+        log_table, value_table = Log.__table__, LogValue.__table__
+        num_of_logs = 0
+        last_id = ''
+        while True:
+            log_ids = select([log_table.c.id, log_table.c.created_at]).where(
+                log_table.c.numeric_values.is_(None)
+                & log_table.c.text_values.is_(None)
+                & (log_table.c.id > last_id)).order_by(
+                    log_table.c.id).limit(batch_size).alias('log_ids')
+            same_log = (value_table.c.log_id == log_ids.c.id) & (
+                value_table.c.created_at == log_ids.c.created_at)
+            is_text = value_table.c.text_value.isnot(None) & (
+                value_table.c.text_value != '')
+            values = select([
+                log_ids.c.id.label('log_id'),
+                log_ids.c.created_at,
+                func.coalesce(
+                    func.jsonb_object_agg(
+                        value_table.c.parameter_id,
+                        value_table.c.numeric_value).filter(
+                            and_(~is_text,
+                                 value_table.c.numeric_value.isnot(None))),
+                    _EMPTY_OBJECT).label('numeric'),
+                func.coalesce(
+                    func.jsonb_object_agg(
+                        value_table.c.parameter_id,
+                        value_table.c.text_value).filter(is_text),
+                    _EMPTY_OBJECT).label('text'),
+            ]).select_from(log_ids.outerjoin(value_table, same_log)).group_by(
+                log_ids.c.id, log_ids.c.created_at).alias('log_values')
+            backfilled_ids = db.session.execute(log_table.update().where(
+                (log_table.c.id == values.c.log_id)
+                & (log_table.c.created_at == values.c.created_at)).values(
+                    numeric_values=values.c.numeric,
+                    text_values=values.c.text).returning(
+                        log_table.c.id)).fetchall()
+            db.session.commit()
+            if not backfilled_ids:
+                return num_of_logs
+            num_of_logs += len(backfilled_ids)
+            last_id = max(log_id for log_id, in backfilled_ids)
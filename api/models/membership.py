@@ -18,3 +18,18 @@ class Membership(BaseModel):
                                    back_populates='memberships')
     __unique_constraints__ = ((('user_id', 'organisation_id'),
                                'membership_user_id_organisation_id_key'), )
+
+    def after_save(self, *args, **kwargs):
+        self.invalidate_cache([self])
+
+    @classmethod
+    def after_bulk_create(cls, model_objs, *args, **kwargs):
+        cls.invalidate_cache(model_objs)
+
+    @staticmethod
+    def invalidate_cache(memberships):
+        """Removes the cached memberships of the users in the organisations"""
+        from api.services.membership_cache import MembershipCache
+        for membership in memberships:
+            MembershipCache.invalidate(membership.user_id,
+                                       membership.organisation_id)
@@ -49,13 +49,14 @@ class Organisation(BaseModel):
         """
         from api.services.redis_util import RedisUtil
         org_objs = super().bulk_create(iterable)
+        owner_role_id = RedisUtil.get_role_id('OWNER')
         memberships = []
         for org_obj in org_objs:
             memberships.append(
                 Membership(
                     user_id=org_obj.creator_id,
                     organisation_id=org_obj.id,
-                    role_id=RedisUtil.get_role_id('OWNER'),
+                    role_id=owner_role_id,
                 ))
         Membership.bulk_create(memberships)
         return org_objs
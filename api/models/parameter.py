@@ -15,6 +15,7 @@ class ValueType(enum.Enum):
 
 
 class Parameter(UserActionBase, OrgBaseModel):
+    __track_generations__ = True
 
     name = db.Column(db.String(), nullable=False)
     unit_id = db.Column(db.String(),
@@ -38,6 +39,35 @@ class Parameter(UserActionBase, OrgBaseModel):
     __unique_violation_msg__ = serialization_error['exists_in_org'].format(
         'Parameter')
 
+    @staticmethod
+    def parse_validation(value_type, validation):
+        """Parses the validation of a parameter into its options or bounds
+
+        Args:
+            value_type(ValueType): the value type of the parameter
+            validation(str): the validation saved with the parameter, for example
+                `gte 0,lt 500` or the comma separated options of ENUM parameters
+
+        Returns:
+            dict: `{'options': [...]}` for ENUM parameters, otherwise the bound
+                of each of `gte`, `gt`, `lte` and `lt` in the validation. The
+                bounds of NUMERIC parameters are floats while the bounds of
+                the other value types are the dates in the validation
+        """
+        if not validation:
+            return {}
+        if value_type == ValueType.ENUM:
+            return {
+                'options':
+                [option.strip() for option in validation.split(',')]
+            }
+        bounds = {}
+        for validation_arg in validation.split(','):
+            key, value = validation_arg.strip().split(' ')
+            bounds[key] = float(
+                value) if value_type == ValueType.NUMERIC else value
+        return bounds
+
     @classmethod
     def get_parameters_in_appliance(cls, org_id, appliance_id):
         param_test = (ApplianceParameter.parameter_id == cls.id) & (
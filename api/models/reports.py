@@ -1,6 +1,9 @@
 import enum
+from sqlalchemy import func, cast, literal_column, Date
 from settings import db
 from .base import OrgBaseModel, BaseModel, UserActionBase
+from .log import Log
+from .log_storage import LogStorage
 
 
 class AggregationType(enum.Enum):
@@ -9,6 +12,10 @@ class AggregationType(enum.Enum):
     MINIMUM = 'MIN'
     MAXIMUM = 'MAX'
 
+    @property
+    def sql_function(self):
+        return getattr(func, self.value.lower())
+
 
 class Report(OrgBaseModel, UserActionBase):
     _IS_CREATED_BY_NULLABLE = _ORG_ID_NULLABLE = False
@@ -19,6 +26,69 @@ class Report(OrgBaseModel, UserActionBase):
                                back_populates='report',
                                lazy=True)
 
+    def aggregation_query(self, appliance_id, aggregation_keys):
+        """Generates the query that computes the aggregations of an appliance
+
+        Every distinct `(parameter, aggregation)` pair becomes a filtered aggregate
+        and `GROUP BY ROLLUP(day)` returns one row per UTC day plus a total row
+        whose day is null. When the report has a date range only the partitions
+        of the range are scanned.
+
+        Args:
+            appliance_id(str): the ID of the appliance the columns belong to
+            aggregation_keys(list): the distinct `(parameter_id,
+                aggregation_type)` pairs to compute
+
+        Returns:
+            sqlalchemy.orm.Query: a query of `(day, *aggregates)` rows
+        """
+        day = cast(func.timezone(literal_column("'UTC'"), Log.created_at),
+                   Date)
+        log_storage = LogStorage.active()
+        from_clause, value_parameter_id, value = log_storage.join_numeric_values(
+            Log.__table__)
+        aggregates = [
+            aggregation_type.sql_function(value).filter(
+                value_parameter_id == parameter_id)
+            for parameter_id, aggregation_type in aggregation_keys
+        ]
+        query = db.session.query(
+            day, *aggregates).select_from(from_clause).filter(
+                Log.organisation_id == self.organisation_id,
+                Log.appliance_id == appliance_id,
+                value_parameter_id.in_(
+                    {parameter_id
+                     for parameter_id, _ in aggregation_keys}),
+            ).group_by(func.rollup(day))
+        if self.start_date is not None and self.end_date is not None:
+            query = query.filter(
+                log_storage.created_between(self.start_date, self.end_date))
+        return query
+
+    def aggregate_appliance_logs(self, appliance_id, columns):
+        """Computes the aggregations of the columns of an appliance in one query
+
+        No log value is loaded into Python (see `aggregation_query`).
+
+        Args:
+            appliance_id(str): the ID of the appliance the columns belong to
+            columns(list): the `ReportColumn`s of the appliance
+
+        Returns:
+            dict: maps each `(parameter_id, aggregation_type)` pair to a dict of
+                the aggregated value of each day. The total is under the None key
+        """
+        aggregation_keys = list(
+            dict.fromkeys((column.parameter_id, column.aggregation_type)
+                          for column in columns))
+        results = {key: {} for key in aggregation_keys}
+        for row_day, *values in self.aggregation_query(appliance_id,
+                                                       aggregation_keys):
+            for key, value in zip(aggregation_keys, values):
+                if value is not None:
+                    results[key][row_day] = value
+        return results
+
 
 class ReportSection(BaseModel):
     name = db.Column(db.String(), nullable=False)
@@ -59,3 +129,4 @@ class ReportColumn(BaseModel):
                                      back_populates='columns',
                                      lazy=True)
     parameter = db.relationship("Parameter", lazy=True)
+    result = None
@@ -6,6 +6,7 @@ from sqlalchemy.ext.declarative import declared_attr
 
 
 class Unit(OrgBaseModel):
+    __track_generations__ = True
     name = db.Column(db.String(), nullable=False)
     symbol = db.Column(db.String(5), nullable=False)
     __unique_constraints__ = ((('name', 'symbol', 'organisation_id'),
@@ -7,6 +7,7 @@ from .base import BaseModel
 
 
 class User(BaseModel):
+    __track_generations__ = True
     __unique_violation_msg__ = serialization_error['already_exists'].format(
         'Username or email')
     username = db.Column(
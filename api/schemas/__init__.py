@@ -13,6 +13,7 @@ from .role import Role as RoleSchema
 from .invitation import Invitation as InvitationSchema, InvitationRequestSchema, InvitationRequestWithoutInvitesSchema
 from .appliance_category import ApplianceCategory as ApplianceCategorySchema
 from .appliance import Appliance as ApplianceSchema
-from .log import Log as LogSchema
+from .log import Log as LogSchema, LogBatchEntry as LogBatchEntrySchema
 from .reports import (ReportSection as ReportSectionSchema, Report as
-                      ReportSchema, ReportColumn as ReportColumnSchema)
+                      ReportSchema, ReportColumn as ReportColumnSchema,
+                      ReportResult as ReportResultSchema)
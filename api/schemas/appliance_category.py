@@ -14,4 +14,5 @@ class ApplianceCategory(AbstractUserActionMixin,
     description = StringField(required=True)
     organisation_id = StringField(required=True, load_only=True)
     editable = fields.Function(lambda obj: bool(obj.organisation_id),
-                               dump_only=True)
+                               dump_only=True,
+                               requires=['organisation_id'])
@@ -1,6 +1,9 @@
+import threading
 from .custom_fields import *
+from .serializer_compiler import SerializerCompiler
 from marshmallow import Schema, post_load, EXCLUDE
 from api.utils.constants import EXCLUDE_USER_SCHEMA_FIELDS
+from api.utils.local_cache import LocalCache
 
 
 class BaseSchema(Schema):
@@ -17,15 +20,99 @@ class BaseSchema(Schema):
             return self.__model__(**data)
         return data
 
-    def dump_success_data(self, model_obj, message=None, **kwargs):
+    @classmethod
+    def pooled(cls, exclude=(), many=False):
+        """Retrieves the shared instance of this schema from the SchemaPool"""
+        return SchemaPool.get(cls, exclude=exclude, many=many)
+
+    def dump_compiled(self, obj, many=None):
+        """Serializes objects like `dump` with the compiled serializer of the schema"""
+        return SerializerCompiler.dump(self, obj, many=many)
+
+    def dump_success_data(self,
+                          model_obj,
+                          message=None,
+                          compiled=False,
+                          **kwargs):
+        dump = self.dump_compiled if compiled else self.dump
         dump_data = {
             'status': 'success',
             'message': message,
-            'data': self.dump(model_obj, **kwargs),
+            'data': dump(model_obj, **kwargs),
         }
         return dump_data
 
 
+class SchemaPool:
+    """Caches built schema instances per (class, exclude, many)
+
+    Building a schema deep copies its declared fields and resolves its nested
+    schemas, which is repeated on every request when views instantiate their
+    schemas. Loading and dumping does not modify a schema, so a single instance
+    of each configuration is shared by every request and thread.
+
+    Schemas that hold per-request state, such as `InvitationRequestSchema`,
+    must still be instantiated by the caller.
+
+    The schemas of the fields requested by clients are kept apart in the
+    bounded SPARSE_SCHEMAS cache (see `get_sparse`).
+    """
+    _schemas = {}
+    _lock = threading.Lock()
+    SPARSE_SCHEMAS = LocalCache(max_size=256, ttl=60 * 60)
+
+    @classmethod
+    def get(cls, schema_class, exclude=(), many=False):
+        """Retrieves the instance of a schema with the specified options
+
+        Args:
+            schema_class(type): the schema to instantiate
+            exclude(iterable, optional): the fields to exclude
+            many(bool, optional): serializes a list of objects when True
+
+        Returns:
+            BaseSchema: the cached schema instance
+        """
+        key = (schema_class, frozenset(exclude), many)
+        schema = cls._schemas.get(key)
+        if schema is None:
+            with cls._lock:
+                schema = cls._schemas.get(key)
+                if schema is None:
+                    schema = schema_class(exclude=exclude, many=many)
+                    cls._schemas[key] = schema
+        return schema
+
+    @classmethod
+    def get_sparse(cls, schema_class, exclude=(), many=False):
+        """Retrieves the instance of a schema that dumps a subset of its fields
+
+        The subsets are chosen by clients so, unlike the schemas of `get`, only
+        the most recently used ones are kept and each of them holds its
+        compiled serializer for at most an hour.
+
+        Args:
+            schema_class(type): the schema to instantiate
+            exclude(iterable, optional): the fields to exclude
+            many(bool, optional): serializes a list of objects when True
+
+        Returns:
+            BaseSchema: the cached schema instance
+        """
+        key = (schema_class, frozenset(exclude), many)
+        schema = cls.SPARSE_SCHEMAS.get(key)
+        if schema is None:
+            schema = schema_class(exclude=exclude, many=many)
+            cls.SPARSE_SCHEMAS.set(key, schema)
+        return schema
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._schemas.clear()
+        cls.SPARSE_SCHEMAS.clear()
+
+
 class AbstractSchemaWithTimeStampsMixin:
     created_at = fields.DateTime(data_key='createdAt', dump_only=True)
     updated_at = fields.DateTime(data_key='updatedAt', dump_only=True)
@@ -0,0 +1,156 @@
+from marshmallow import Schema, fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow.utils import ensure_text_type, get_func_args
+
+
+class SerializerCompiler:
+    """Compiles the dump of a schema into a specialised python function
+
+    `Schema.dump` calls `field.serialize` for every field of every object, which
+    retrieves the value through the schema accessor, checks the field default
+    and then calls `field._serialize`. The compiled function does this once per
+    schema when it is generated: it reads each attribute with `getattr`,
+    converts strings and datetimes inline, calls `Function` and `Method` fields
+    directly and dumps nested schemas with their own compiled functions.
+
+    Fields that are not specialised call their own `_serialize`, and schemas
+    with dump processors or a custom accessor are dumped with `Schema.dump`, so
+    the output is always the same as the output of `Schema.dump`.
+    """
+    _ATTRIBUTE = '_compiled_serializer'
+
+    @classmethod
+    def dump(cls, schema, obj, many=None):
+        """Serializes objects with the compiled function of a schema
+
+        Args:
+            schema(marshmallow.Schema): the schema whose output is generated
+            obj: the object or the list of objects to serialize
+            many(bool, optional): overrides the `many` option of the schema
+
+        Returns:
+            dict|list: the same data `schema.dump(obj, many=many)` returns
+        """
+        many = schema.many if many is None else bool(many)
+        serializer = cls.get(schema)
+        if serializer is None or obj is None:
+            return schema.dump(obj, many=many)
+        if many:
+            return [serializer(item) for item in obj]
+        return serializer(obj)
+
+    @classmethod
+    def get(cls, schema):
+        """Retrieves the compiled function of a schema, compiling it once
+
+        Returns:
+            function: a function that serializes one object or None if the
+                schema cannot be compiled
+        """
+        try:
+            return schema.__dict__[cls._ATTRIBUTE]
+        except KeyError:
+            serializer = cls.compile(schema)
+            setattr(schema, cls._ATTRIBUTE, serializer)
+            return serializer
+
+    @classmethod
+    def compile(cls, schema):
+        """Generates the function that serializes one object with a schema"""
+        has_processors = (schema._has_processors(PRE_DUMP)
+                          or schema._has_processors(POST_DUMP))
+        if (has_processors
+                or type(schema).get_attribute is not Schema.get_attribute):
+            return None
+
+        namespace = {
+            '_missing': missing,
+            '_dict_class': schema.dict_class,
+            '_get_attribute': schema.get_attribute,
+            '_fallback': schema._serialize,
+            '_text': ensure_text_type,
+        }
+        lines = [
+            'def serialize(obj):',
+            # marshmallow looks up keys before attributes on mappings and rows
+            '    if hasattr(obj, "__getitem__"):',
+            '        return _fallback(obj)',
+            '    ret = _dict_class()',
+        ]
+        for index, (attr_name, field) in enumerate(schema.dump_fields.items()):
+            key = field.data_key if field.data_key is not None else attr_name
+            field_lines = cls._compile_field(field, attr_name, key,
+                                             f'_field{index}', namespace)
+            lines.extend(f'    {line}' for line in field_lines)
+        lines.append('    return ret')
+
+        source = '\n'.join(lines)
+        exec(compile(source, f'<serializer {type(schema).__name__}>', 'exec'),
+             namespace)
+        serializer = namespace['serialize']
+        serializer.source = source
+        return serializer
+
+    @classmethod
+    def _compile_field(cls, field, attr_name, key, name, namespace):
+        namespace[name] = field
+        serialize_method = type(field)._serialize
+        if not field._CHECK_ATTRIBUTE:
+            if (serialize_method is fields.Function._serialize
+                    and len(get_func_args(field.serialize_func)) <= 1):
+                namespace[f'{name}_func'] = field.serialize_func
+                value = f'{name}_func(obj)'
+            elif (serialize_method is fields.Method._serialize
+                  and field.serialize_method_name):
+                namespace[f'{name}_func'] = getattr(
+                    field.parent, field.serialize_method_name)
+                value = f'{name}_func(obj)'
+            else:
+                value = f'{name}._serialize(None, {attr_name!r}, obj)'
+            return [
+                f'value = {value}',
+                'if value is not _missing:',
+                f'    ret[{key!r}] = value',
+            ]
+
+        attribute = field.attribute or attr_name
+        if '.' in attribute or field.default is not missing:
+            return [
+                f'value = {name}.serialize({attr_name!r}, obj, '
+                'accessor=_get_attribute)',
+                'if value is not _missing:',
+                f'    ret[{key!r}] = value',
+            ]
+
+        return [
+            f'value = getattr(obj, {attribute!r}, _missing)',
+            'if value is not _missing:',
+            f'    ret[{key!r}] = '
+            f'{cls._value_expression(field, attr_name, name, namespace)}',
+        ]
+
+    @classmethod
+    def _value_expression(cls, field, attr_name, name, namespace):
+        serialize_method = type(field)._serialize
+        if serialize_method is fields.String._serialize:
+            return ('value if value is None or value.__class__ is str '
+                    'else _text(value)')
+
+        if serialize_method is fields.DateTime._serialize:
+            format_func = field.SERIALIZATION_FUNCS.get(
+                field.format or field.DEFAULT_FORMAT)
+            if format_func:
+                namespace[f'{name}_format'] = format_func
+                return f'None if value is None else {name}_format(value)'
+
+        if serialize_method is fields.Nested._serialize:
+            nested_schema = field.schema
+            nested_serializer = cls.get(nested_schema)
+            if nested_serializer:
+                namespace[f'{name}_nested'] = nested_serializer
+                if nested_schema.many or field.many:
+                    return (f'None if value is None else '
+                            f'[{name}_nested(item) for item in value]')
+                return f'None if value is None else {name}_nested(value)'
+
+        return f'{name}._serialize(value, {attr_name!r}, obj)'
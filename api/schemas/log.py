@@ -1,4 +1,5 @@
 from marshmallow import fields
+from ..models import LogStorage
 from .base import (AbstractSchemaWithTimeStampsMixin, BaseSchema, StringField,
                    AbstractUserActionMixin, ListField, IDField)
 
@@ -7,14 +8,19 @@ class Log(BaseSchema, AbstractSchemaWithTimeStampsMixin,
           AbstractUserActionMixin):
     appliance_id = StringField(required=True, data_key='applianceId')
     log_data = fields.Dict(required=True, load_only=True, data_key='logData')
-    log_values = fields.Method('retrieve_log_value',
-                               data_key='logValues',
-                               dump_only=True)
+    log_values = fields.Method(
+        'retrieve_log_value',
+        data_key='logValues',
+        dump_only=True,
+        requires=['log_values', 'numeric_values', 'text_values'])
 
     def retrieve_log_value(self, obj, **kwargs):
-        final_dict = {}
-        for log_value in obj.log_values:
-            value = log_value.text_value if log_value.text_value else log_value.numeric_value
-            final_dict[log_value.parameter_id] = value
+        if obj.pivoted_values is not None:
+            return obj.pivoted_values
+        return LogStorage.active().values_of(obj)
 
-        return final_dict
+
+class LogBatchEntry(BaseSchema):
+    appliance_id = StringField(required=True, data_key='applianceId')
+    log_data = fields.Dict(required=True, data_key='logData')
+    timestamp = fields.DateTime()
@@ -23,7 +23,8 @@ class Parameter(AbstractUserActionMixin, AbstractSchemaWithTimeStampsMixin,
                            required=True)
     organisation_id = StringField(data_key='organisationId', required=True)
     editable = fields.Function(lambda obj: bool(obj.organisation_id),
-                               dump_only=True)
+                               dump_only=True,
+                               requires=['organisation_id'])
     unit = fields.Nested(Unit(exclude=GENERIC_EXCLUDE_SCHEMA_FIELDS +
                               ['organisation_id']),
                          dump_only=True)
@@ -61,3 +61,16 @@ class Report(BaseSchema, AbstractSchemaWithTimeStampsMixin,
                         'start date', 'end date'),
                 })
         return data
+
+
+class ReportColumnResult(ReportColumn):
+    parameter_id = IDField(data_key='parameterId', dump_only=True)
+    result = fields.Raw(dump_only=True)
+
+
+class ReportSectionResult(ReportSection):
+    columns = fields.Nested(ReportColumnResult, many=True, dump_only=True)
+
+
+class ReportResult(Report):
+    sections = fields.Nested(ReportSectionResult, many=True, dump_only=True)
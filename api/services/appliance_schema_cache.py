@@ -0,0 +1,154 @@
+import json
+from datetime import timedelta
+from api.models import (db, Appliance, ApplianceParameter, Parameter,
+                        ValueTypeEnum)
+from api.services.redis_util import RedisUtil
+from api.services.value_validator import ValueValidator
+from api.utils.local_cache import LocalCache
+
+
+class IngestParameter:
+    """The fields of a parameter of an appliance that logs are validated with
+
+    `rules` holds the parsed validation of the parameter (see
+    `Parameter.parse_validation`) and `validator` the ValueValidator compiled
+    from it.
+    """
+    FIELDS = ('id', 'value_type', 'required', 'rules')
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields[field])
+        self.value_type = ValueTypeEnum[self.value_type]
+        self.validator = ValueValidator(self.value_type, self.rules)
+
+    def to_dict(self):
+        fields = {field: getattr(self, field) for field in self.FIELDS}
+        fields['value_type'] = self.value_type.name
+        return fields
+
+
+class ApplianceSchemaCache:
+    """Caches the parameters logs of an appliance must contain
+
+    The parameters are looked up in the cache of the worker, then in redis and
+    then in the database. The key of the parameters of an appliance contains the
+    generations of the Appliance, ApplianceParameter and Parameter rows of its
+    organisation (see `BaseModel.generation_keys`), so changing an appliance or
+    its parameters makes every worker load the parameters again and logs are
+    validated without reading the database. The cache of the worker holds the
+    IngestParameter objects so their validation is compiled once per worker.
+    """
+    CACHE = LocalCache(max_size=10000, ttl=60)
+    REDIS_EXPIRY = timedelta(hours=1)
+    MODELS = (Appliance, ApplianceParameter, Parameter)
+
+    @classmethod
+    def get(cls, org_id, appliance_id):
+        """Retrieves the parameters of an appliance
+
+        Args:
+            org_id(str): the ID of the organisation of the appliance
+            appliance_id(str): the ID of the appliance
+
+        Returns:
+            list: the IngestParameter of each parameter of the appliance. It is
+                empty when the appliance does not exist
+        """
+        return cls.get_many(org_id, [appliance_id])[appliance_id]
+
+    @classmethod
+    def get_many(cls, org_id, appliance_ids):
+        """Retrieves the parameters of many appliances of an organisation
+
+        The generations are read with one MGET, the appliances missing in the
+        cache of the worker with another and the appliances missing in redis
+        with one query.
+
+        Returns:
+            dict: maps each appliance ID to its list of IngestParameter
+        """
+        appliance_ids = list(dict.fromkeys(appliance_ids))
+        keys = cls.keys(org_id, appliance_ids)
+        params_by_appliance = {}
+        missing_ids = []
+        for appliance_id in appliance_ids:
+            params = cls.CACHE.get(keys[appliance_id])
+            if params is None:
+                missing_ids.append(appliance_id)
+            else:
+                params_by_appliance[appliance_id] = params
+
+        redis_keys = [keys[appliance_id] for appliance_id in missing_ids]
+        fields_by_appliance = {}
+        unknown_ids = []
+        for appliance_id, cached_value in zip(missing_ids,
+                                              RedisUtil.mget(redis_keys)):
+            if cached_value is None:
+                unknown_ids.append(appliance_id)
+            else:
+                fields_by_appliance[appliance_id] = json.loads(cached_value)
+
+        if unknown_ids:
+            queried = cls._query_parameters(org_id, unknown_ids)
+            RedisUtil.mset(
+                {
+                    keys[appliance_id]: json.dumps(fields)
+                    for appliance_id, fields in queried.items()
+                }, cls.REDIS_EXPIRY)
+            fields_by_appliance.update(queried)
+
+        for appliance_id, fields in fields_by_appliance.items():
+            params = [
+                IngestParameter(**param_fields) for param_fields in fields
+            ]
+            cls.CACHE.set(keys[appliance_id], params)
+            params_by_appliance[appliance_id] = params
+
+        return {
+            appliance_id: params_by_appliance.get(appliance_id, [])
+            for appliance_id in appliance_ids
+        }
+
+    @classmethod
+    def keys(cls, org_id, appliance_ids):
+        """Generates the cache key of each appliance from the generations"""
+        generation_keys = [
+            key for model in cls.MODELS
+            for key in model.generation_keys(org_id)
+        ]
+        versions = '.'.join(
+            str(generation or 0)
+            for generation in RedisUtil.mget(generation_keys))
+        return {
+            appliance_id:
+            f'APPLIANCE_SCHEMA_{org_id}_{appliance_id}_{versions}'
+            for appliance_id in appliance_ids
+        }
+
+    @staticmethod
+    def _query_parameters(org_id, appliance_ids):
+        rows = db.session.query(
+            ApplianceParameter.appliance_id, Parameter.id,
+            Parameter.value_type,
+            Parameter.validation, ApplianceParameter.required).join(
+                Parameter, (ApplianceParameter.parameter_id == Parameter.id) &
+                (Parameter.organisation_id == org_id)).join(
+                    Appliance,
+                    (ApplianceParameter.appliance_id == Appliance.id) &
+                    (Appliance.organisation_id == org_id)).filter(
+                        Appliance.id.in_(appliance_ids)).order_by(Parameter.id)
+
+        params_by_appliance = {}
+        for appliance_id, param_id, value_type, validation, required in rows:
+            params_by_appliance.setdefault(appliance_id, []).append({
+                'id':
+                param_id,
+                'value_type':
+                value_type.name,
+                'required':
+                bool(required),
+                'rules':
+                Parameter.parse_validation(value_type, validation),
+            })
+        return params_by_appliance
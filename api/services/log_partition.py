@@ -0,0 +1,14 @@
+from api.models import LogPartition
+from celery_config import celery_app
+
+
+class LogPartitionManager:
+    @staticmethod
+    @celery_app.task(name='maintain-log-partitions')
+    def maintain_partitions():
+        """Pre-creates the upcoming log partitions and detaches the expired ones
+
+        Returns:
+            dict: the names of the partitions that were `created` and `detached`
+        """
+        return LogPartition.maintain()
@@ -0,0 +1,34 @@
+import time
+from api.models import Log, LogRollup
+from api.services.redis_util import RedisUtil
+from api.utils.id_generator import IDGenerator
+from celery_config import celery_app
+
+
+class LogRollupUpdater:
+    WATERMARK_KEY = 'LOG_ROLLUP_WATERMARK'
+    # Logs are picked by their ID so a log created in a transaction that commits
+    # after a run would be missed. Every run therefore re-checks the logs created
+    # shortly before the previous run.
+    LAG_MS = 5 * 60 * 1000
+
+    @staticmethod
+    @celery_app.task(name='update-log-rollups')
+    def update_rollups():
+        """Updates the rollups of the logs that were created since the last run
+
+        The time of the last run is stored in redis. Since IDs start with the time
+        they were generated, the logs created since then are the ones whose ID is
+        greater than `IDGenerator.min_id_at(last_run - LAG_MS)`. Only the hours
+        and days of those logs are recomputed.
+
+        Returns:
+            str: the ID the logs were retrieved from
+        """
+        run_started_at = int(time.time() * 1000)
+        watermark = RedisUtil.get_key(LogRollupUpdater.WATERMARK_KEY)
+        watermark = int(watermark) if watermark else LogRollupUpdater.LAG_MS
+        min_log_id = IDGenerator.min_id_at(watermark - LogRollupUpdater.LAG_MS)
+        LogRollup.refresh_all(Log.id >= min_log_id)
+        RedisUtil.set_key(LogRollupUpdater.WATERMARK_KEY, run_started_at)
+        return min_log_id
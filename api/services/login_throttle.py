@@ -0,0 +1,88 @@
+import time
+from api.services.redis_util import RedisUtil
+from api.utils.constants import FAILED_LOGIN_LIMITS, FAILED_LOGIN_IP_LIMITS
+from api.utils.local_cache import LocalCache
+
+
+class LoginThrottle:
+    """Limits the failed logins of each identifier and IP address
+
+    Failures are counted with atomic INCRs in 5 minute fixed windows. The count of
+    a bucket is estimated over a sliding window as the count of the current
+    window plus the part of the previous window that is still in the sliding
+    window, so attempts are not reset at the window boundaries.
+
+    Buckets found to be blocked are also remembered in the worker for
+    BLOCKED_CACHE_TTL seconds so repeated attempts do not reach redis.
+
+    The IP address bucket is skipped when no IP address is given, which the
+    views do when the address is not the client's, e.g. the address of a proxy
+    that every client shares.
+    """
+    WINDOW_SECONDS = 5 * 60
+    BLOCKED_CACHE_TTL = 10
+    LIMITS = {
+        'ID': FAILED_LOGIN_LIMITS,
+        'IP': FAILED_LOGIN_IP_LIMITS,
+    }
+    BLOCKED = LocalCache(max_size=10000, ttl=BLOCKED_CACHE_TTL)
+
+    @classmethod
+    def is_blocked(cls, identifier, ip_address):
+        """Checks if an identifier or IP address has too many failed logins
+
+        This only reads the counters so it is safe to call on every attempt.
+
+        Args:
+            identifier(str): the username or email used to log in
+            ip_address(str): the address the request was sent from or None
+                when it is not known
+
+        Returns:
+            str: the type of the first bucket that reached its limit, `ID` or
+                `IP` (see `LIMITS`), or None when neither is blocked
+        """
+        buckets = cls._buckets(identifier, ip_address)
+        for bucket, _ in buckets:
+            blocked_type = cls.BLOCKED.get(bucket)
+            if blocked_type:
+                return blocked_type
+
+        now = time.time()
+        current_window = int(now // cls.WINDOW_SECONDS)
+        previous_weight = 1 - (now % cls.WINDOW_SECONDS) / cls.WINDOW_SECONDS
+        keys = []
+        for bucket, _ in buckets:
+            keys.append(cls._key(bucket, current_window))
+            keys.append(cls._key(bucket, current_window - 1))
+        counts = [int(count or 0) for count in RedisUtil.mget(keys)]
+
+        blocked_type = None
+        for index, (bucket, limit) in enumerate(buckets):
+            current_count, previous_count = counts[index * 2:index * 2 + 2]
+            if current_count + previous_count * previous_weight >= limit:
+                bucket_type = bucket.split('_', 1)[0]
+                cls.BLOCKED.set(bucket, bucket_type)
+                blocked_type = blocked_type or bucket_type
+        return blocked_type
+
+    @classmethod
+    def record_failure(cls, identifier, ip_address):
+        """Counts a failed login of the identifier and IP address in one round trip"""
+        current_window = int(time.time() // cls.WINDOW_SECONDS)
+        keys = [
+            cls._key(bucket, current_window)
+            for bucket, _ in cls._buckets(identifier, ip_address)
+        ]
+        RedisUtil.increment_keys(keys, 2 * cls.WINDOW_SECONDS)
+
+    @classmethod
+    def _buckets(cls, identifier, ip_address):
+        buckets = [(f'ID_{identifier.strip().lower()}', cls.LIMITS['ID'])]
+        if ip_address:
+            buckets.append((f'IP_{ip_address}', cls.LIMITS['IP']))
+        return buckets
+
+    @staticmethod
+    def _key(bucket, window):
+        return f'LOGIN_ATTEMPTS_{bucket}_{window}'
@@ -0,0 +1,109 @@
+import json
+import threading
+from datetime import timedelta
+from api.models import db, Membership, Role
+from api.services.redis_util import RedisUtil
+from api.utils.constants import MEMBERSHIP_INVALIDATED_CHANNEL
+from api.utils.local_cache import LocalCache
+
+
+class CachedMembership:
+    """The fields of a Membership that org views need to authorize a request
+
+    The full Membership (with its role, member and organisation) is loaded from
+    the database the first time `model` is accessed.
+    """
+    FIELDS = ('id', 'user_id', 'organisation_id', 'role_id', 'role_name')
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields[field])
+        self._model = None
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = Membership.eager('role', 'member',
+                                           'organisation').get(self.id)
+        return self._model
+
+
+class MembershipCache:
+    """Caches the membership of users in organisations
+
+    Memberships are looked up in the cache of the worker, then in redis and then
+    in the database. Creating a membership invalidates both tiers in every
+    worker via MEMBERSHIP_INVALIDATED_CHANNEL.
+    """
+    CACHE = LocalCache(max_size=10000, ttl=30)
+    REDIS_EXPIRY = timedelta(minutes=10)
+    _subscribed = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, user_id, org_id):
+        """Retrieves the membership of a user in an organisation
+
+        Args:
+            user_id(str): the ID of the user
+            org_id(str): the ID of the organisation
+
+        Returns:
+            CachedMembership: the membership or None if the user is not a member
+        """
+        cls._subscribe()
+        cache_key = f'{user_id}/{org_id}'
+        fields = cls.CACHE.get(cache_key)
+        if fields is None:
+            redis_key = cls.redis_key(user_id, org_id)
+            cached_value = RedisUtil.get_key(redis_key)
+            if cached_value is not None:
+                fields = json.loads(cached_value)
+            else:
+                fields = cls._query_membership(user_id, org_id)
+                if fields is None:
+                    return None
+                RedisUtil.set_key(redis_key, json.dumps(fields),
+                                  cls.REDIS_EXPIRY)
+            cls.CACHE.set(cache_key, fields)
+        return CachedMembership(**fields)
+
+    @classmethod
+    def invalidate(cls, user_id, org_id):
+        RedisUtil.delete_key(cls.redis_key(user_id, org_id))
+        RedisUtil.publish(MEMBERSHIP_INVALIDATED_CHANNEL,
+                          f'{user_id}/{org_id}')
+
+    @staticmethod
+    def redis_key(user_id, org_id):
+        return f'MEMBERSHIP_{user_id}_{org_id}'
+
+    @staticmethod
+    def _query_membership(user_id, org_id):
+        row = db.session.query(Membership.id, Membership.user_id,
+                               Membership.organisation_id,
+                               Membership.role_id, Role.name).join(
+                                   Role, Role.id == Membership.role_id).filter(
+                                       Membership.organisation_id == org_id,
+                                       Membership.user_id == user_id).first()
+        return dict(zip(CachedMembership.FIELDS, row)) if row else None
+
+    @classmethod
+    def _on_invalidated(cls, message):
+        cache_key = message['data']
+        if isinstance(cache_key, bytes):
+            cache_key = cache_key.decode('utf-8')
+        cls.CACHE.delete(cache_key)
+
+    @classmethod
+    def _subscribe(cls):
+        if cls._subscribed:
+            return
+        with cls._lock:
+            if not cls._subscribed:
+                RedisUtil.subscribe(MEMBERSHIP_INVALIDATED_CHANNEL,
+                                    cls._on_invalidated)
+                cls._subscribed = True
@@ -1,18 +1,135 @@
 import os
+import threading
+import time
 import redis
+from contextlib import contextmanager
+from datetime import timedelta
+from api.utils.constants import HASH_DELETED_CHANNEL
 from api.utils.id_generator import IDGenerator
 
 
 class RedisUtil:
+    """Runs the redis commands of the app
+
+    The client uses a connection pool of REDIS_MAX_CONNECTIONS connections that
+    waits up to REDIS_POOL_TIMEOUT seconds for a free connection. The number of
+    calls and the time spent on each command are recorded in LATENCY_STATS (see
+    `latency_stats`).
+    """
     from tests.mocks import RedisMock
     REDIS = RedisMock
     if os.getenv('FLASK_ENV') != 'testing':
-        REDIS = redis.from_url(os.getenv('REDIS_SERVER_URL'))
+        REDIS = redis.Redis(
+            connection_pool=redis.BlockingConnectionPool.from_url(
+                os.getenv('REDIS_SERVER_URL'),
+                max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', 20)),
+                timeout=int(os.getenv('REDIS_POOL_TIMEOUT', 5))))
+    _local_handlers = {}
+    _local = threading.local()
+    _latency_lock = threading.Lock()
+    LATENCY_STATS = {}
+    MAX_HASH_INDEX_SIZE = 100
+    INCREMENT_EXISTING_KEY_SCRIPT = '''
+        if redis.call('exists', KEYS[1]) == 1 then
+            return redis.call('incrby', KEYS[1], ARGV[1])
+        end'''
+
+    @classmethod
+    def _execute(cls, command, *args, **kwargs):
+        """Runs a redis command and records how long it took"""
+        started_at = time.perf_counter()
+        try:
+            return getattr(cls.REDIS, command)(*args, **kwargs)
+        finally:
+            cls._record_latency(command, time.perf_counter() - started_at)
+
+    @classmethod
+    def _write(cls, command, *args, **kwargs):
+        """Runs a redis command or queues it when a `batch` is active"""
+        pipeline = getattr(cls._local, 'pipeline', None)
+        if pipeline is None:
+            return cls._execute(command, *args, **kwargs)
+        getattr(pipeline, command)(*args, **kwargs)
+
+    @classmethod
+    def _pipeline(cls, commands):
+        """Runs a list of `(command, *args)` tuples in one round trip
+
+        Returns:
+            list: the result of each command
+        """
+        pipeline = cls.REDIS.pipeline(transaction=False)
+        for command, *args in commands:
+            getattr(pipeline, command)(*args)
+        started_at = time.perf_counter()
+        try:
+            return pipeline.execute()
+        finally:
+            cls._record_latency('pipeline', time.perf_counter() - started_at)
+
+    @classmethod
+    @contextmanager
+    def batch(cls):
+        """Sends the writes made within the context to redis in one pipeline
+
+        Reads are still sent immediately so they do not see the writes queued in
+        the batch. The writes are discarded when an exception is raised within
+        the context. Nested batches are merged into the outermost one.
+        """
+        if getattr(cls._local, 'pipeline', None) is not None:
+            yield
+            return
+        pipeline = cls.REDIS.pipeline(transaction=True)
+        cls._local.pipeline = pipeline
+        try:
+            yield
+        except Exception:
+            pipeline.reset()
+            raise
+        finally:
+            cls._local.pipeline = None
+        started_at = time.perf_counter()
+        try:
+            pipeline.execute()
+        finally:
+            cls._record_latency('pipeline', time.perf_counter() - started_at)
+
+    @classmethod
+    def _record_latency(cls, command, duration):
+        with cls._latency_lock:
+            stats = cls.LATENCY_STATS.setdefault(command, [0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+
+    @classmethod
+    def latency_stats(cls):
+        """Retrieves the number of calls and time spent on each redis command
+
+        Returns:
+            dict: maps each command to its `count`, `total_ms` and `average_ms`
+        """
+        with cls._latency_lock:
+            return {
+                command: {
+                    'count': count,
+                    'total_ms': total * 1000,
+                    'average_ms': total * 1000 / count,
+                }
+                for command, (count, total) in cls.LATENCY_STATS.items()
+            }
+
+    @classmethod
+    def reset_latency_stats(cls):
+        with cls._latency_lock:
+            cls.LATENCY_STATS.clear()
+
+    @staticmethod
+    def _seconds(expiry_time):
+        return int(expiry_time.total_seconds()) if expiry_time else None
 
     @classmethod
     def set(cls, key, value, expiry_time=None):
-        cls.REDIS.set(key, value)
-        cls.REDIS.expire(key, int(expiry_time.total_seconds()))
+        cls._write('set', key, value, ex=cls._seconds(expiry_time))
 
     @classmethod
     def set_value(cls, value, expiry_time):
@@ -29,26 +146,113 @@ class RedisUtil:
             str: a the unique key that was generated for the value
         """
         unique_key = IDGenerator.generate_id()
-        success = cls.REDIS.set(unique_key, value)
-        cls.REDIS.expire(unique_key, int(expiry_time.total_seconds()))
+        success = cls._write('set',
+                             unique_key,
+                             value,
+                             ex=cls._seconds(expiry_time))
         return unique_key, success
 
     @classmethod
     def set_key(cls, key, value, expiry_time=None):
-        cls.REDIS.set(key, value)
-        if expiry_time:
-            cls.REDIS.expire(key, int(expiry_time.total_seconds()))
+        cls._write('set', key, value, ex=cls._seconds(expiry_time))
+
+    @classmethod
+    def mget(cls, keys):
+        """Retrieves the values of many keys in one round trip
+
+        Returns:
+            list: the decoded value of each key or None if it does not exist
+        """
+        return [
+            value.decode('utf-8') if isinstance(value, bytes) else value
+            for value in cls._execute('mget', keys)
+        ]
+
+    @classmethod
+    def mset(cls, mapping, expiry_time=None):
+        """Sets many keys that expire after `expiry_time` in one round trip"""
+        with cls.batch():
+            for key, value in mapping.items():
+                cls._write('set', key, value, ex=cls._seconds(expiry_time))
 
     @classmethod
     def hset(cls, hash_name, key, value, expiry_time=None):
+        """Sets a field of a hash whose fields expire independently
+
+        Each field is stored in the `<hash_name>_<key>` key and its name is added
+        to the index set of the hash (see `hash_index_key`) so the hash can be
+        deleted without scanning the keyspace. The index set lives as long as
+        its longest lived field.
+
+        Args:
+            hash_name(str): the name of the hash
+            key(str): the field in the hash
+            value(str): the value of the field
+            expiry_time(datetime.timedelta, optional): when the field expires
+        """
         custom_key = f'{hash_name}_{key}'
-        cls.REDIS.set(custom_key, value)
-        if expiry_time:
-            cls.REDIS.expire(custom_key, int(expiry_time.total_seconds()))
+        with cls.batch():
+            cls._write('set', custom_key, value, ex=cls._seconds(expiry_time))
+            cls._add_to_hash_index(hash_name, custom_key, expiry_time)
+
+    @classmethod
+    def hash_index_key(cls, hash_name):
+        return f'{hash_name}_INDEX'
+
+    @classmethod
+    def _add_to_hash_index(cls, hash_name, custom_key, expiry_time=None):
+        index_key = cls.hash_index_key(hash_name)
+        index_ttl, index_size = cls._pipeline([('ttl', index_key),
+                                               ('scard', index_key)])
+        with cls.batch():
+            cls._write('sadd', index_key, custom_key)
+            if not expiry_time:
+                cls._write('persist', index_key)
+            elif index_ttl == -2 or 0 <= index_ttl < expiry_time.total_seconds(
+            ):
+                cls._write('expire', index_key, cls._seconds(expiry_time))
+
+            if index_size >= cls.MAX_HASH_INDEX_SIZE:
+                members = list(cls._execute('smembers', index_key))
+                exists = cls._pipeline([('exists', member)
+                                        for member in members])
+                expired_keys = [
+                    member for member, member_exists in zip(members, exists)
+                    if not member_exists
+                ]
+                if expired_keys:
+                    cls._write('srem', index_key, *expired_keys)
+
+    @classmethod
+    def index_flat_hash_keys(cls, hash_suffix):
+        """Adds the fields that were set before hashes were indexed to their index
+
+        The keyspace is iterated with SCAN so redis is not blocked. Fields are
+        matched with `*_<hash_suffix>_*` and keep their remaining expiry.
+
+        Args:
+            hash_suffix(str): the suffix of the hash names e.g `TOKEN`
+
+        Returns:
+            int: the number of fields that were indexed
+        """
+        num_of_keys = 0
+        for key in cls.REDIS.scan_iter(match=f'*_{hash_suffix}_*', count=1000):
+            if isinstance(key, bytes):
+                key = key.decode('utf-8')
+            prefix, _, field = key.partition(f'_{hash_suffix}_')
+            if field == 'INDEX':
+                continue
+            hash_name = f'{prefix}_{hash_suffix}'
+            ttl = cls._execute('ttl', key)
+            expiry_time = timedelta(seconds=ttl) if ttl > 0 else None
+            cls._add_to_hash_index(hash_name, key, expiry_time)
+            num_of_keys += 1
+        return num_of_keys
 
     @classmethod
     def hget(cls, hash_name, key):
-        value = cls.REDIS.get(f'{hash_name}_{key}')
+        value = cls._execute('get', f'{hash_name}_{key}')
         if isinstance(value, bytes):
             return value.decode('utf-8')
         return value
@@ -56,7 +260,7 @@ class RedisUtil:
     @classmethod
     def find_keys(cls, regex):
         final_list = []
-        for key in cls.REDIS.keys(regex):
+        for key in cls._execute('keys', regex):
             if isinstance(key, bytes):
                 key = key.decode('utf-8')
             final_list.append(key)
@@ -64,9 +268,37 @@ class RedisUtil:
 
     @classmethod
     def delete_hash(cls, hash_name):
-        hash_keys = cls.find_keys(f'{hash_name}*')
-        for key in hash_keys:
-            cls.REDIS.delete(key)
+        """Deletes every field of a hash that was set with `hset`"""
+        index_key = cls.hash_index_key(hash_name)
+        hash_keys = list(cls._execute('smembers', index_key))
+        cls._write('delete', index_key, *hash_keys)
+        cls.publish(HASH_DELETED_CHANNEL, hash_name)
+
+    @classmethod
+    def publish(cls, channel, message):
+        """Publishes a message to the subscribers of a channel
+
+        The handlers subscribed in this worker are called immediately so they do
+        not wait for the message to come back from redis.
+        """
+        for handler in cls._local_handlers.get(channel, []):
+            handler({'type': 'message', 'channel': channel, 'data': message})
+        cls._write('publish', channel, message)
+
+    @classmethod
+    def subscribe(cls, channel, handler):
+        """Calls the handler with every message published to a channel
+
+        Messages are received in a daemon thread of the worker.
+
+        Args:
+            channel(str): the channel to subscribe to
+            handler(callable): called with the message dict redis sends
+        """
+        cls._local_handlers.setdefault(channel, []).append(handler)
+        pubsub = cls.REDIS.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: handler})
+        pubsub.run_in_thread(sleep_time=1, daemon=True)
 
     @classmethod
     def get_key(cls, key):
@@ -78,7 +310,35 @@ class RedisUtil:
         Returns:
 
         """
-        return cls.REDIS.get(key)
+        return cls._execute('get', key)
+
+    @classmethod
+    def increment_existing_key(cls, key, amount):
+        """Adds an amount to a counter only when the counter is already cached
+
+        The check and the increment run in one lua script so a counter that
+        expires in between is not recreated without an expiry.
+
+        Args:
+            key(str): the key of the counter
+            amount(int): the amount to add. Can be negative
+        """
+        cls._write('eval', cls.INCREMENT_EXISTING_KEY_SCRIPT, 1, key, amount)
+
+    @classmethod
+    def increment_keys(cls, keys, expiry_seconds=None):
+        """Atomically increments counters and sets their expiry in one round trip
+
+        Args:
+            keys(list): the keys of the counters
+            expiry_seconds(int, optional): the number of seconds each counter
+                expires in. The counters do not expire when it is not specified
+        """
+        with cls.batch():
+            for key in keys:
+                cls._write('incr', key)
+                if expiry_seconds:
+                    cls._write('expire', key, expiry_seconds)
 
     @classmethod
     def delete_key(cls, key):
@@ -90,19 +350,38 @@ class RedisUtil:
             key:
 
         """
-        return cls.REDIS.delete(key)
+        return cls._write('delete', key)
 
     @classmethod
     def get_role_id(cls, role_name):
+        return cls.get_role_ids(role_name)[0]
+
+    @classmethod
+    def get_role_ids(cls, *role_names):
+        """Retrieves the IDs of roles from their names
+
+        The IDs are read from redis in one round trip and the roles that are not
+        cached are retrieved with one query and cached.
+
+        Returns:
+            list: the ID of each role or None if the role does not exist
+        """
         from api.models.role import Role
-        role_key = f'ROLE_{role_name}'
-        role_id = cls.get_key(role_key)
-
-        if not role_id:
-            role = Role.query.filter_by(name=role_name).first()
-            if role:
-                cls.set_key(role_key, role.id)
-                role_id = role.id
-        if isinstance(role_id, bytes):
-            return role_id.decode('utf-8')
-        return role_id
+        role_keys = [f'ROLE_{role_name}' for role_name in role_names]
+        role_ids = cls.mget(role_keys)
+        missing_names = [
+            role_name for role_name, role_id in zip(role_names, role_ids)
+            if not role_id
+        ]
+        if missing_names:
+            roles = Role.query.filter(Role.name.in_(missing_names)).all()
+            found_ids = {role.name: role.id for role in roles}
+            cls.mset({
+                f'ROLE_{role_name}': role_id
+                for role_name, role_id in found_ids.items()
+            })
+            role_ids = [
+                role_id or found_ids.get(role_name)
+                for role_name, role_id in zip(role_names, role_ids)
+            ]
+        return role_ids
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import threading
+from datetime import timedelta
+from urllib.parse import urlencode
+from api.services.redis_util import RedisUtil
+from api.utils.local_cache import LocalCache
+
+
+class ResponseCache:
+    """Caches the data of GET responses until the models they read change
+
+    The key of a response is made up of the endpoint, the path and the sorted
+    query params of the request and the current generations of the models the
+    response reads (see `BaseModel.generation_keys`). Committing a change to
+    a model bumps its generation, so later requests look up a new key and
+    responses generated before the change are never returned again. The TTLs
+    only bound the memory used by responses that are no longer requested.
+
+    Responses are cached in the worker for LOCAL_TTL seconds and in redis for
+    REDIS_TTL. The number of hits and misses of each endpoint are recorded in
+    METRICS (see `metrics`).
+    """
+    LOCAL_TTL = 60
+    REDIS_TTL = timedelta(hours=1)
+    LOCAL = LocalCache(max_size=1000, ttl=LOCAL_TTL)
+    METRICS = {}
+    _metrics_lock = threading.Lock()
+
+    @classmethod
+    def key(cls, endpoint, path, query_params, models, org_id=None):
+        """Generates the key of a response from the generations of its models
+
+        The generations are read before the response is generated, so a change
+        committed while the response is generated bumps the generations and the
+        response is stored under a key that is no longer looked up.
+
+        Args:
+            endpoint(str): the name of the view
+            path(str): the path of the request
+            query_params(werkzeug.datastructures.MultiDict): the query params
+            models(list): the models the response reads
+            org_id(str, optional): the organisation whose rows are read
+
+        Returns:
+            str: the key of the response
+        """
+        generation_keys = [
+            key for model in models for key in model.generation_keys(org_id)
+        ]
+        generations = RedisUtil.mget(generation_keys)
+        params = urlencode(sorted(query_params.items(multi=True)))
+        digest = hashlib.sha1(f'{path}?{params}'.encode()).hexdigest()
+        versions = '.'.join(str(generation or 0) for generation in generations)
+        return f'RESPONSE_{endpoint}_{digest}_{versions}'
+
+    @classmethod
+    def get_or_set(cls, endpoint, key, generate_data):
+        """Retrieves the data of a response, generating and caching it on a miss
+
+        The data returned from the local cache is shared by the threads of the
+        worker so it must not be modified.
+
+        Args:
+            endpoint(str): the name of the view the metrics are recorded for
+            key(str): the key generated with `ResponseCache.key`
+            generate_data(callable): generates the data when it is not cached
+
+        Returns:
+            dict: the data of the response
+        """
+        data = cls.LOCAL.get(key)
+        if data is not None:
+            cls._record(endpoint, 'local_hits')
+            return data
+
+        cached_data = RedisUtil.get_key(key)
+        if cached_data is not None:
+            data = json.loads(cached_data)
+            cls.LOCAL.set(key, data)
+            cls._record(endpoint, 'redis_hits')
+            return data
+
+        cls._record(endpoint, 'misses')
+        data = generate_data()
+        RedisUtil.set_key(key, json.dumps(data), cls.REDIS_TTL)
+        cls.LOCAL.set(key, data)
+        return data
+
+    @classmethod
+    def _record(cls, endpoint, outcome):
+        with cls._metrics_lock:
+            metrics = cls.METRICS.setdefault(endpoint, {
+                'local_hits': 0,
+                'redis_hits': 0,
+                'misses': 0,
+            })
+            metrics[outcome] += 1
+
+    @classmethod
+    def metrics(cls):
+        """Retrieves the number of hits and misses of each endpoint
+
+        Returns:
+            dict: maps each endpoint to its `local_hits`, `redis_hits`, `misses`
+                and `hit_ratio`
+        """
+        with cls._metrics_lock:
+            return {
+                endpoint: {
+                    **metrics,
+                    'hit_ratio':
+                    (metrics['local_hits'] + metrics['redis_hits']) /
+                    sum(metrics.values()),
+                }
+                for endpoint, metrics in cls.METRICS.items()
+            }
+
+    @classmethod
+    def reset_metrics(cls):
+        with cls._metrics_lock:
+            cls.METRICS.clear()
@@ -0,0 +1,60 @@
+import threading
+from api.services.redis_util import RedisUtil
+from api.utils.constants import HASH_DELETED_CHANNEL, REDIS_TOKEN_HASH_KEY
+from api.utils.local_cache import LocalCache
+
+
+class SessionCache:
+    """Caches the decoded claims of login tokens in the worker
+
+    The claims are keyed by the `<user_id>/<token_id>` cookie value so requests
+    that send a cookie that was recently verified skip the redis lookup and the
+    JWT decode. Claims are kept for at most a minute and never past the `exp` of
+    their token.
+
+    Deleting the token hash of a user with `RedisUtil.delete_hash` publishes the
+    hash on HASH_DELETED_CHANNEL which removes the claims of the user from the
+    cache of every worker.
+    """
+    CACHE = LocalCache(max_size=10000, ttl=60)
+    _subscribed = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, cookie_value):
+        cls._subscribe()
+        claims = cls.CACHE.get(cookie_value)
+        return dict(claims) if claims is not None else None
+
+    @classmethod
+    def set(cls, cookie_value, claims, expires_at):
+        """Caches the claims of a token
+
+        Args:
+            cookie_value(str): the `<user_id>/<token_id>` of the token
+            claims(dict): the decoded data of the token
+            expires_at(float): the `exp` of the token
+        """
+        cls.CACHE.set(cookie_value, dict(claims), expires_at)
+
+    @classmethod
+    def invalidate_user(cls, user_id):
+        cls.CACHE.delete_prefix(f'{user_id}/')
+
+    @classmethod
+    def _on_hash_deleted(cls, message):
+        hash_name = message['data']
+        if isinstance(hash_name, bytes):
+            hash_name = hash_name.decode('utf-8')
+        suffix = f'_{REDIS_TOKEN_HASH_KEY}'
+        if hash_name.endswith(suffix):
+            cls.invalidate_user(hash_name[:-len(suffix)])
+
+    @classmethod
+    def _subscribe(cls):
+        if cls._subscribed:
+            return
+        with cls._lock:
+            if not cls._subscribed:
+                RedisUtil.subscribe(HASH_DELETED_CHANNEL, cls._on_hash_deleted)
+                cls._subscribed = True
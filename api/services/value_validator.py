@@ -0,0 +1,138 @@
+import numpy as np
+from dateutil import parser, tz
+from api.models import ValueTypeEnum
+from api.utils.error_messages import parameter_errors, serialization_error
+
+
+class ValueValidator:
+    """Validates the logged values of a parameter with its compiled validation
+
+    The validation of the parameter (see `Parameter.parse_validation`) is
+    compiled once: NUMERIC bounds into numpy comparisons, DATE and DATE_TIME
+    bounds into datetimes and ENUM options into a set. Validating the values of
+    many logs then compares arrays instead of parsing the validation for every
+    value.
+    """
+    OPERATORS = {
+        'gte': (np.greater_equal, 'more than or equal to'),
+        'gt': (np.greater, 'more than'),
+        'lte': (np.less_equal, 'less than or equal to'),
+        'lt': (np.less, 'less than'),
+    }
+    SCALAR_TYPES = (str, int, float)
+    DATE_TYPES = (ValueTypeEnum.DATE, ValueTypeEnum.DATE_TIME)
+
+    def __init__(self, value_type, rules):
+        self.value_type = value_type
+        self.options = None
+        self.bounds = []
+        descriptions = []
+        if value_type == ValueTypeEnum.ENUM:
+            self.options = frozenset(rules.get('options', []))
+            rules = {}
+        for key, bound in rules.items():
+            operator, description = self.OPERATORS[key]
+            if value_type == ValueTypeEnum.NUMERIC:
+                descriptions.append(f'{description} {bound:g}')
+            else:
+                descriptions.append(f'{description} {bound}')
+                bound = self.to_utc(parser.parse(bound))
+            self.bounds.append((operator, bound))
+        self.bounds_error = serialization_error['value_out_of_bounds'].format(
+            ' and '.join(descriptions))
+
+    def validate(self, values):
+        """Validates the values of the parameter in many logs
+
+        Args:
+            values(list): the value of the parameter in each log or None when a
+                log does not contain it
+
+        Returns:
+            list: the error of each value or None when the value is valid
+        """
+        errors = [self._check_scalar(value) for value in values]
+        if self.value_type == ValueTypeEnum.NUMERIC:
+            comparable = self._to_numbers(values, errors)
+            for index in np.flatnonzero(np.isnan(comparable)):
+                errors[index] = errors[index] or serialization_error[
+                    'number_only']
+        elif self.options is not None:
+            return [
+                error or self._validate_option(value)
+                for value, error in zip(values, errors)
+            ]
+        elif self.bounds:
+            comparable = self._to_datetimes(values, errors)
+        else:
+            return errors
+
+        if self.bounds:
+            checked = np.flatnonzero([error is None for error in errors])
+            is_valid = np.ones(len(checked), dtype=bool)
+            for operator, bound in self.bounds:
+                is_valid &= operator(comparable[checked], bound).astype(bool)
+            for index in checked[~is_valid]:
+                errors[index] = self.bounds_error
+        return errors
+
+    def _check_scalar(self, value):
+        """Returns the error of a missing value or a value of the wrong type"""
+        if value is None:
+            return serialization_error['required']
+        if self.value_type in self.DATE_TYPES and not isinstance(value, str):
+            return parameter_errors['invalid_date'].format(value)
+        if isinstance(value, self.SCALAR_TYPES):
+            return None
+        if self.value_type == ValueTypeEnum.NUMERIC:
+            return serialization_error['number_only']
+        if self.value_type == ValueTypeEnum.ENUM:
+            return serialization_error['invalid_option'].format(
+                value, ', '.join(sorted(self.options)))
+        return None
+
+    def _validate_option(self, value):
+        if value in self.options:
+            return None
+        return serialization_error['invalid_option'].format(
+            value, ', '.join(sorted(self.options)))
+
+    @staticmethod
+    def _to_numbers(values, errors):
+        try:
+            numbers = np.asarray([
+                np.nan if error else value
+                for value, error in zip(values, errors)
+            ],
+                                 dtype=np.float64)
+            if numbers.ndim == 1:
+                return numbers
+        except (TypeError, ValueError):
+            pass
+        numbers = np.full(len(values), np.nan)
+        for index, value in enumerate(values):
+            if errors[index]:
+                continue
+            try:
+                numbers[index] = float(value)
+            except (TypeError, ValueError):
+                errors[index] = serialization_error['number_only']
+        return numbers
+
+    @classmethod
+    def _to_datetimes(cls, values, errors):
+        datetimes = np.empty(len(values), dtype=object)
+        for index, value in enumerate(values):
+            if errors[index]:
+                continue
+            try:
+                datetimes[index] = cls.to_utc(parser.parse(str(value)))
+            except (ValueError, OverflowError):
+                errors[index] = parameter_errors['invalid_date'].format(value)
+        return datetimes
+
+    @staticmethod
+    def to_utc(value):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=tz.UTC)
+        return value.astimezone(tz.UTC)
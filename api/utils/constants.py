@@ -1,5 +1,8 @@
 """Add constants used in the app to this file"""
-CELERY_TASKS = ['api.services.file_uploader', 'api.utils.emails']
+CELERY_TASKS = [
+    'api.services.file_uploader', 'api.utils.emails', 'api.services.log_rollup',
+    'api.services.log_partition'
+]
 APP_EMAIL = 'info@utility-manager.com'
 CONFIRM_EMAIL_SUBJECT = 'Complete Registration'
 RESET_PASSWORD_SUBJECT = 'Reset Password'
@@ -7,8 +10,11 @@ CONFIRM_TOKEN = 0
 LOGIN_TOKEN = 1
 RESET_TOKEN = 2
 FAILED_LOGIN_LIMITS = 6
+FAILED_LOGIN_IP_LIMITS = 30
 COOKIE_TOKEN_KEY = 'T_KEY'
 REDIS_TOKEN_HASH_KEY = 'TOKEN'
+HASH_DELETED_CHANNEL = 'HASH_DELETED'
+MEMBERSHIP_INVALIDATED_CHANNEL = 'MEMBERSHIP_INVALIDATED'
 SENTRY_IGNORE_ERRORS = [
     'api.utils.exceptions.UniqueConstraintException',
     'api.utils.exceptions.ResponseException',
@@ -52,7 +52,17 @@ serialization_error = {
     'some_ids_not_found':
     "There are {} ids you specified that were not found",
     'invalid_required_params':
-    'The required parameters must be a subset of specified parameters'
+    'The required parameters must be a subset of specified parameters',
+    'list_only':
+    'Only a list of items is allowed here',
+    'max_items_error':
+    'You can send at most {} items at once',
+    'invalid_option':
+    '`{}` must be one of {}',
+    'invalid_cursor':
+    'The cursor you specified is invalid',
+    'value_out_of_bounds':
+    'The value must be {}',
 }
 
 authentication_errors = {
@@ -1,44 +1,83 @@
+import threading
 import time
 import numpy as np
 
 
 # Logic of this was inspired by https://gist.github.com/risent/4cab3878d995bec7d1c2
 class IDGenerator:
+    """Generates push IDs made up of 8 timestamp chars and 12 random chars
+
+    The 12 random chars are treated as a base 64 number made up of two 6 digit
+    halves so they fit in int64 arrays. IDs generated within the same millisecond
+    increment that number (with a carry) so they are strictly increasing.
+    """
 
     PUSH_CHARS = ('-0123456789'
                   'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
                   '_abcdefghijklmnopqrstuvwxyz')
+    _CHAR_ARRAY = np.array(list(PUSH_CHARS))
+    _HALF_BASE = 64**6
+    _HALF_POWERS = 64**np.arange(5, -1, -1, dtype=np.int64)
+    _lock = threading.Lock()
     last_push_time = 0
-    last_rand_chars = np.empty(12, dtype=int)
+    last_rand_value = 0
 
     @classmethod
     def generate_id(cls):
-        now = int(time.time() * 1000)
-        duplicate_time = (now == cls.last_push_time)
-        cls.last_push_time = now
-        time_stamp_chars = np.empty(8, dtype=str)
-
-        for i in range(7, -1, -1):
-            time_stamp_chars[i] = cls.PUSH_CHARS[now % 64]
-            now = int(now / 64)
+        return cls.generate_ids(1)[0]
 
-        uid = ''.join(time_stamp_chars)
-        if not duplicate_time:
-            cls.last_rand_chars = np.random.randint(low=0, high=63, size=12)
-        else:
-            cls.last_rand_chars = np.where(cls.last_rand_chars == 63, 0,
-                                           cls.last_rand_chars + 1)
+    @classmethod
+    def generate_ids(cls, n):
+        """Generates n IDs in one vectorised operation
 
-        string_mapper = np.vectorize(
-            cls._get_vectorize_func(cls.PUSH_CHARS, cls.last_rand_chars))
+        Args:
+            n(int): the number of IDs to generate
 
-        sample = string_mapper(np.arange(12))
+        Returns:
+            list: the IDs in increasing order
+        """
+        if n <= 0:
+            return []
+        with cls._lock:
+            now = max(int(time.time() * 1000), cls.last_push_time)
+            if now == cls.last_push_time:
+                start = cls.last_rand_value + 1
+            else:
+                start = int(
+                    np.random.randint(0, cls._HALF_BASE, dtype=np.int64)
+                ) * cls._HALF_BASE + int(
+                    np.random.randint(0, cls._HALF_BASE, dtype=np.int64))
+            cls.last_push_time = now
+            cls.last_rand_value = start + n - 1
 
-        return uid + ''.join(sample)
+        offsets = np.arange(n, dtype=np.int64)
+        start_high, start_low = divmod(start, cls._HALF_BASE)
+        low = start_low + offsets
+        high = (start_high + low // cls._HALF_BASE) % cls._HALF_BASE
+        low = low % cls._HALF_BASE
+        digits = np.concatenate([
+            (high[:, None] // cls._HALF_POWERS) % 64,
+            (low[:, None] // cls._HALF_POWERS) % 64,
+        ],
+                                axis=1)
+        rand_chars = np.ascontiguousarray(
+            cls._CHAR_ARRAY[digits]).view('<U12').ravel()
+        time_stamp_chars = cls._encode_time(now)
+        return [time_stamp_chars + chars for chars in rand_chars.tolist()]
 
     @classmethod
-    def _get_vectorize_func(cls, chars, last_chars):
-        def vectorize_func(index):
-            return chars[last_chars[index]]
+    def min_id_at(cls, timestamp_ms):
+        """Retrieves the smallest ID that can be generated at a time
 
-        return vectorize_func
+        Since IDs start with their timestamp, `id >= IDGenerator.min_id_at(ms)`
+        matches every ID generated from that millisecond onwards.
+        """
+        return cls._encode_time(timestamp_ms) + cls.PUSH_CHARS[0] * 12
+
+    @classmethod
+    def _encode_time(cls, now):
+        time_stamp_chars = []
+        for _ in range(8):
+            time_stamp_chars.append(cls.PUSH_CHARS[now % 64])
+            now //= 64
+        return ''.join(reversed(time_stamp_chars))
@@ -0,0 +1,62 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LocalCache:
+    """A bounded in-process cache whose items expire
+
+    The least recently used item is removed once the cache has `max_size` items.
+    The cache is safe to use from the threads of a worker but it is not shared
+    between workers.
+    """
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Retrieves a value or None if it is missing or has expired"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at=None):
+        """Caches a value for at most `ttl` seconds
+
+        Args:
+            key(str): the key of the value
+            value: the value to be cached
+            expires_at(float, optional): a unix timestamp after which the value
+                must not be returned even if the `ttl` has not elapsed
+        """
+        max_expires_at = time.time() + self.ttl
+        expires_at = min(expires_at,
+                         max_expires_at) if expires_at else max_expires_at
+        with self._lock:
+            self._items[key] = (value, expires_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """Removes every value whose key starts with the prefix"""
+        with self._lock:
+            for key in [key for key in self._items if key.startswith(prefix)]:
+                del self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
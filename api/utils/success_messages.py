@@ -17,4 +17,9 @@ INVITING_USER_MSG_DICT = {
     'partial': 'Some invitations were sent and some failed',
     'success': 'All invitations were sent successfully',
 }
+LOG_BATCH_MSG_DICT = {
+    'error': 'No log was saved',
+    'partial': 'Some logs were saved and some failed',
+    'success': 'All logs were saved successfully',
+}
 ADDED_TO_ORG = 'Successfully added you to organisation'
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import datetime, time, timedelta, timezone
 
 
 class TimeUtil:
@@ -6,6 +6,30 @@ class TimeUtil:
     def now(cls):
         return datetime.now(timezone.utc)
 
+    @classmethod
+    def date_range_to_timestamps(cls,
+                                 start_date,
+                                 end_date,
+                                 tzinfo=timezone.utc):
+        """Converts an inclusive date range to a half-open timestamp range
+
+        Filtering with `start <= created_at < end` lets PostgreSQL use indexes on
+        `created_at` unlike `cast(created_at, Date)` comparisons.
+
+        Args:
+            start_date(date): the first day in the range
+            end_date(date): the last day in the range
+            tzinfo(tzinfo, optional): the timezone the days are in. Defaults to UTC
+
+        Returns:
+            (datetime, datetime): the start(inclusive) and end(exclusive) timestamps
+        """
+        start = datetime.combine(start_date, time.min, tzinfo=tzinfo)
+        end = datetime.combine(end_date + timedelta(days=1),
+                               time.min,
+                               tzinfo=tzinfo)
+        return start, end
+
     @classmethod
     def generate_time_before_update(cls, mapper, connection, target):
         target.updated_at = cls.now()
@@ -2,7 +2,7 @@ import numpy as np
 from sqlalchemy.orm import joinedload
 from .base import BaseOrgView, BasePaginatedView
 from api.utils.exceptions import ResponseException
-from api.models import ApplianceCategory, ApplianceParameter, Appliance, Parameter, db
+from api.models import ApplianceCategory, ApplianceParameter, Appliance, Parameter, User, db
 from settings import org_endpoint
 from flask import request
 from api.schemas import ApplianceCategorySchema, ParameterSchema
@@ -54,10 +54,10 @@ class SuggestParameter(BaseOrgView):
         filter_data = (param for param in suggested_params
                        if param is not None)
         suggested_params = [p for p in filter_data]
-        dumped_params = ParameterSchema(exclude=exclude_param_fields,
-                                        many=True).dump(suggested_params)
+        dumped_params = ParameterSchema.pooled(
+            exclude=exclude_param_fields, many=True).dump(suggested_params)
 
-        res_data = ApplianceCategorySchema(
+        res_data = ApplianceCategorySchema.pooled(
             exclude=cat_exclude).dump_success_data(
                 array[0][0], RETRIEVED.format('Appliance Category'))
 
@@ -88,14 +88,17 @@ class ApplianceCategoryView(BaseOrgView, BasePaginatedView):
 
     RETRIEVE_SUCCESS_MSG = RETRIEVED.format('Appliance Category')
     SCHEMA_EXCLUDE = ['organisation_id']
+    CACHE_RESPONSES = True
+    CACHE_DEPENDENCIES = [User]
+    ETAG_STRATEGY = 'generation'
 
     def post(self, org_id, user_data, membership):
         json_data = request.get_json()
         json_data = json_data if json_data else {}
         json_data['organisation_id'] = org_id
         json_data['created_by_id'] = user_data['id']
-        category_obj = ApplianceCategorySchema().load(json_data)
+        category_obj = ApplianceCategorySchema.pooled().load(json_data)
         category_obj.save()
-        res_data = ApplianceCategorySchema().dump_success_data(
+        res_data = ApplianceCategorySchema.pooled().dump_success_data(
             category_obj, CREATED.format('Appliance Category'))
         return res_data, 201
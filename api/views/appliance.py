@@ -3,7 +3,7 @@ from api.utils.error_messages import serialization_error
 from .base import BaseOrgView, BasePaginatedView, BaseValidateRelatedOrgModelMixin
 from settings import org_endpoint
 from flask import request
-from api.models import Parameter, ApplianceParameter, ApplianceCategory, Appliance
+from api.models import Parameter, ApplianceParameter, ApplianceCategory, Appliance, Unit, User
 from api.schemas import ApplianceSchema, ApplianceParameterSchema
 from api.utils.success_messages import RETRIEVED, CREATED
 
@@ -40,6 +40,9 @@ class ApplianceView(BaseOrgView, BasePaginatedView,
     }
 
     RETRIEVE_SUCCESS_MSG = RETRIEVED.format('Appliances')
+    COUNT_STRATEGY = 'cached'
+    CACHE_DEPENDENCIES = [ApplianceCategory, User]
+    ETAG_STRATEGY = 'generation'
 
     VALIDATE_RELATED_KWARGS = {
         "parameter_ids": {
@@ -62,7 +65,7 @@ class ApplianceView(BaseOrgView, BasePaginatedView,
         json_data = json_data if json_data else {}
         json_data['organisationId'] = org_id
         json_data['created_by_id'] = user_data['id']
-        validated_data = ApplianceSchema().load(json_data)
+        validated_data = ApplianceSchema.pooled().load(json_data)
         category_id = json_data['categoryId']
         param_ids = set(validated_data['parameters'])
         required_param_ids = set(validated_data.get('required_parameters', []))
@@ -96,7 +99,7 @@ class ApplianceView(BaseOrgView, BasePaginatedView,
 
         ApplianceParameter.bulk_create(bulk_appliance_param)
 
-        res_data = ApplianceSchema().dump_success_data(
+        res_data = ApplianceSchema.pooled().dump_success_data(
             appliance_obj, CREATED.format('Appliance'))
 
         return res_data, 201
@@ -124,6 +127,9 @@ class ApplianceParamsView(BaseOrgView, BasePaginatedView):
 
     RETRIEVE_SUCCESS_MSG = RETRIEVED.format('Appliance Parameters')
     EAGER_LOADING_FIELDS = ['parameter', 'parameter.unit']
+    CACHE_RESPONSES = True
+    CACHE_DEPENDENCIES = [Appliance, Parameter, Unit]
+    ETAG_STRATEGY = 'generation'
 
     def filter_get_method_query(self, query, *args, org_id, appliance_id,
                                 **kwargs):
@@ -1,6 +1,19 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from marshmallow import fields
+from sqlalchemy import and_, or_, inspect, Date, DateTime
 from sqlalchemy.sql import expression, desc
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, Load
+from flask_sqlalchemy import Pagination
 import numpy as np
+from settings import db
+from api.utils.exceptions import ResponseException
+from api.utils.error_messages import serialization_error
+from api.schemas.base import SchemaPool
+from api.services.redis_util import RedisUtil
 
 
 class BaseFilterMixin:
@@ -26,7 +39,7 @@ class SearchFilterMixin(BaseFilterMixin):
 
     def search_model(self, query_params):
         filter_condition = []
-        model_query = self.__model__.eager(*self.EAGER_LOADING_FIELDS)
+        model_query = self.__model__.eager(*self.eager_loading_fields())
         for model_column in self.SEARCH_FILTER_ARGS:
             col_search_str = f'{str(model_column)}_search'
             search_value = query_params.get(col_search_str)
@@ -50,6 +63,9 @@ class SearchFilterMixin(BaseFilterMixin):
                 np.bitwise_or.reduce(filter_condition))
         return model_query
 
+    def eager_loading_fields(self):
+        return self.EAGER_LOADING_FIELDS
+
     def _retrieve_filter_binary_expression(self, model_col, search_value,
                                            filter_type):
         rel_args = self.extract_rel_model_and_col(model_col)
@@ -66,11 +82,167 @@ class SearchFilterMixin(BaseFilterMixin):
         raise Exception('Invalid search args in model')
 
 
+class SparseFieldsMixin:
+    """
+    Narrows the output of a list endpoint to the fields in the `fields` param
+
+    `fields` is a comma separated list of the data keys of the schema, e.g.
+    `?fields=name,createdAt`. The `id` is always included. The other fields are
+    excluded from the dump, only the columns the requested fields read are
+    loaded and the `EAGER_LOADING_FIELDS` they do not need are not joined.
+
+    Function and Method fields must declare the model attributes they read in a
+    `requires` list, e.g. `fields.Function(..., requires=['organisation_id'])`,
+    otherwise the query is not narrowed when they are requested.
+    """
+    ALWAYS_INCLUDED_FIELDS = {'id'}
+    _required_attributes = None
+
+    def list_schema(self, field_names=None):
+        """Retrieves the schema that dumps a page of the requested fields"""
+        schema = self.__SCHEMA__.pooled(exclude=self.SCHEMA_EXCLUDE, many=True)
+        if field_names is None:
+            return schema
+        exclude = set(self.SCHEMA_EXCLUDE).union(name
+                                                 for name in schema.dump_fields
+                                                 if name not in field_names)
+        return SchemaPool.get_sparse(self.__SCHEMA__,
+                                     exclude=exclude,
+                                     many=True)
+
+    def requested_fields(self, query_params):
+        """Retrieves the names of the schema fields in the `fields` param
+
+        Args:
+            query_params: the params sent from the API call
+
+        Returns:
+            set: the names of the requested fields or None if all the fields
+                were requested
+
+        Raises:
+            ResponseException: when a field is not in the schema
+        """
+        fields_param = query_params.get('fields', '').strip()
+        if not fields_param:
+            return None
+        dump_fields = self.list_schema().dump_fields
+        field_names = {
+            field.data_key or name: name
+            for name, field in dump_fields.items()
+        }
+        requested = self.ALWAYS_INCLUDED_FIELDS.intersection(dump_fields)
+        for data_key in fields_param.split(','):
+            data_key = data_key.strip()
+            if data_key not in field_names:
+                raise ResponseException(
+                    serialization_error['invalid_option'].format(
+                        'fields', ', '.join(field_names)), 400)
+            requested.add(field_names[data_key])
+        return requested
+
+    def required_attributes(self, field_names):
+        """Retrieves the model attributes that the fields read when dumped
+
+        Returns:
+            set: the names of the attributes or None if a field did not declare
+                the attributes it reads
+        """
+        if field_names is None:
+            return None
+        dump_fields = self.list_schema().dump_fields
+        attributes = set()
+        for name in field_names:
+            field = dump_fields[name]
+            if 'requires' in field.metadata:
+                attributes.update(field.metadata['requires'])
+            elif isinstance(field, (fields.Function, fields.Method)):
+                return None
+            else:
+                attributes.add(field.attribute or name)
+        return attributes
+
+    def eager_loading_fields(self):
+        attributes = self._required_attributes
+        if attributes is None:
+            return super().eager_loading_fields()
+        return [
+            path for path in super().eager_loading_fields()
+            if path.split('.')[0] in attributes
+        ]
+
+    def load_only_required_columns(self, query):
+        """Defers the columns of the model that the requested fields do not read
+
+        The sort fields are also loaded since the cursor of a page is generated
+        from the values of its last item.
+        """
+        if self._required_attributes is None:
+            return query
+        column_names = set(inspect(self.__model__).column_attrs.keys())
+        sort_fields = (self.SORT_KWARGS or {}).get('sort_fields', set())
+        columns = column_names.intersection(
+            self._required_attributes.union(sort_fields))
+        return query.options(Load(self.__model__).load_only(*columns))
+
+
 class PaginatorMixin(BaseFilterMixin):
     """
     Contains methods for paginating an output query.
+
+    The total number of objects in `meta` is computed with the COUNT_STRATEGY:
+        - `exact`: a COUNT query is executed for every page
+        - `cached`: the count of the unfiltered query is read from a counter of
+            the rows the organisation has (see `BaseModel.org_count_key`) while
+            the count of a filtered query is cached for FILTERED_COUNT_TTL
+        - `estimated`: like `cached` but the count of a filtered query is the
+            planner estimate when it is at least ESTIMATED_COUNT_THRESHOLD
+
+    The `cached` and `estimated` strategies must only be used by org views whose
+    unfiltered query retrieves every row the organisation has.
     """
     SORT_KWARGS = None
+    COUNT_STRATEGY = 'exact'
+    FILTERED_COUNT_TTL = timedelta(seconds=30)
+    ORG_COUNT_TTL = timedelta(hours=1)
+    ESTIMATED_COUNT_THRESHOLD = 100000
+    NON_FILTER_PARAMS = {'page', 'page_limit', 'sort_by', 'cursor', 'fields'}
+
+    def _sort_keys(self, query, query_params):
+        """Retrieves the columns the query would be sorted by
+
+        Args:
+            query(flask_sqlalchemy.BaseQuery): the query that we want to sort
+            query_params: the params sent from the API call
+
+        Returns:
+            (flask_sqlalchemy.BaseQuery, list): the query with the joins required
+                by relationship sort fields and a list of
+                `(field_name, column, is_desc)` tuples
+        """
+        sort_fields = self.SORT_KWARGS['sort_fields']
+        default_sort = self.SORT_KWARGS['defaults']
+        sort_keys = []
+        order_by = query_params.get('sort_by', default_sort)
+        for order_by_str in order_by.split(','):
+            field_name = order_by_str.strip()
+            asc_or_desc = '+'
+            if len(field_name) > 0 and not order_by_str[0].isalpha():
+                field_name = order_by_str[1:]
+                asc_or_desc = order_by_str[0]
+            if len(field_name) > 0 and field_name in sort_fields:
+                field_name = self.FILTER_QUERY_MAPPER.get(
+                    field_name, field_name)
+                rel_args = self.extract_rel_model_and_col(field_name)
+                if rel_args:
+                    rel, rel_name, model_class_col, rel_class = rel_args
+                    filter_field = getattr(rel_class, rel_name)
+                    query = self.join_col(query, rel_class)
+                else:
+                    filter_field = getattr(self.__model__, field_name)
+                sort_keys.append(
+                    (field_name, filter_field, asc_or_desc == '-'))
+        return query, sort_keys
 
     def _sort_query(self, query, query_params):
         """Sorts the query based on query_params provided
@@ -81,6 +253,7 @@ class PaginatorMixin(BaseFilterMixin):
          SORT_KWARGS= {
             'defaults': '<comma-seperated-model-column>',
             'sort_fields': <a-set-contiaining the fields>,
+            'cursor_pagination': <optional-bool>,
         }
         The sort_fields tells the function which fields can be sorted. It should contain a set of
         field that would be sorted.
@@ -92,6 +265,8 @@ class PaginatorMixin(BaseFilterMixin):
                 'sort_fields': {'name', 'symbol'}
             }
 
+        When cursor_pagination is True, the view can also be paginated with
+        `?cursor=` (see `cursor_paginate_query`).
 
         Args:
             query(flask_sqlalchemy.BaseQuery): the query that we want to sort
@@ -101,34 +276,15 @@ class PaginatorMixin(BaseFilterMixin):
             flask_sqlalchemy.BaseQuery: a sorted query object
 
         """
-
-        sort_fields = self.SORT_KWARGS['sort_fields']
-        default_sort = self.SORT_KWARGS['defaults']
+        query, sort_keys = self._sort_keys(query, query_params)
         order_by_list = []
-        order_by = query_params.get('sort_by', default_sort)
-        for order_by_str in order_by.split(','):
-            field_name = order_by_str.strip()
-            asc_or_desc = '+'
-            if len(field_name) > 0 and not order_by_str[0].isalpha():
-                field_name = order_by_str[1:]
-                asc_or_desc = order_by_str[0]
-            if len(field_name) > 0 and field_name in sort_fields:
-                field_name = self.FILTER_QUERY_MAPPER.get(
-                    field_name, field_name)
-                rel_args = self.extract_rel_model_and_col(field_name)
-                if rel_args:
-                    rel, rel_name, model_class_col, rel_class = rel_args
-                    filter_field = getattr(rel_class, rel_name)
-                    query = self.join_col(query, rel_class)
-                else:
-                    filter_field = getattr(self.__model__, field_name)
-                filter_field = desc(
-                    filter_field) if asc_or_desc == '-' else filter_field
-                order_by_list.append(expression.nullslast(filter_field))
+        for _, filter_field, is_desc in sort_keys:
+            filter_field = desc(filter_field) if is_desc else filter_field
+            order_by_list.append(expression.nullslast(filter_field))
 
         return query.order_by(*order_by_list)
 
-    def paginate_query(self, query, query_params):
+    def paginate_query(self, query, query_params, **kwargs):
         """Paginates the query using the query_params provided
 
         Uses the queries ?page=<page>&page_limit=<limit> to paginate output data.
@@ -139,18 +295,28 @@ class PaginatorMixin(BaseFilterMixin):
         Args:
             query(flask_sqlalchemy.BaseQuery): The query to be filtered
             query_params(dict): Query params passed by the user
+            kwargs: the keyword args passed to the GET method
 
         Returns:
             (flask_sqlalchemy.BaseQuery, dict): Returns a tuple containing the query items and metadata
         """
+        page_limit = self._page_limit(query_params)
+        if self.SORT_KWARGS.get(
+                'cursor_pagination') and 'cursor' in query_params:
+            return self.cursor_paginate_query(query, query_params, page_limit)
         page_str = query_params.get('page')
-        page_limit_str = query_params.get('page_limit')
-        page_is_valid = page_str and page_str.isnumeric()
-        limit_is_valid = page_limit_str and page_limit_str.isnumeric()
+        page_is_valid = page_str and page_str.isnumeric() and int(page_str) > 0
         page = int(page_str) if page_is_valid else 1
-        page_limit = int(page_limit_str) if limit_is_valid else 10
         sorted_query = self._sort_query(query, query_params)
-        paginated_query = sorted_query.paginate(page, page_limit, False)
+        items = sorted_query.limit(page_limit).offset(
+            (page - 1) * page_limit).all()
+        if page == 1 and len(items) < page_limit:
+            total, is_count_exact = len(items), True
+        else:
+            total, is_count_exact = self.count_query(query, query_params,
+                                                     **kwargs)
+        paginated_query = Pagination(sorted_query, page, page_limit, total,
+                                     items)
         curent_page = (paginated_query.pages +
                        1 if paginated_query.page > paginated_query.pages else
                        paginated_query.page)
@@ -161,5 +327,175 @@ class PaginatorMixin(BaseFilterMixin):
             'totalObjects': paginated_query.total,
             'totalPages': paginated_query.pages,
             'maxObjectsPerPage': paginated_query.per_page,
+            'isCountExact': is_count_exact,
         }
         return paginated_query.items, meta
+
+    def count_query(self, query, query_params, org_id=None, **kwargs):
+        """Counts the objects in the query with the COUNT_STRATEGY of the view
+
+        Args:
+            query(flask_sqlalchemy.BaseQuery): The query to be counted
+            query_params(dict): Query params passed by the user
+            org_id(str, optional): the organisation of an org view
+            kwargs: the other keyword args passed to the GET method
+
+        Returns:
+            (int, bool): the count and whether the count is exact
+        """
+        query = query.order_by(None)
+        if self.COUNT_STRATEGY == 'exact':
+            return query.count(), True
+
+        filter_params = {
+            key: value
+            for key, value in query_params.items()
+            if key not in self.NON_FILTER_PARAMS and value
+        }
+        if not filter_params and org_id:
+            count_key = self.__model__.org_count_key(org_id)
+            return self._cached_count(count_key, query,
+                                      self.ORG_COUNT_TTL), True
+
+        if self.COUNT_STRATEGY == 'estimated':
+            estimate = self._estimate_count(query)
+            if estimate >= self.ESTIMATED_COUNT_THRESHOLD:
+                return estimate, False
+
+        path_params = {
+            key: value
+            for key, value in kwargs.items() if isinstance(value, str)
+        }
+        params_str = json.dumps([org_id, path_params, filter_params],
+                                sort_keys=True)
+        params_hash = hashlib.sha1(params_str.encode()).hexdigest()
+        count_key = f'{type(self).__name__}_{params_hash}_COUNT'
+        return self._cached_count(count_key, query,
+                                  self.FILTERED_COUNT_TTL), True
+
+    @staticmethod
+    def _cached_count(count_key, query, expiry_time):
+        count = RedisUtil.get_key(count_key)
+        if count is None:
+            count = query.count()
+            RedisUtil.set_key(count_key, count, expiry_time)
+        return int(count)
+
+    @staticmethod
+    def _estimate_count(query):
+        """Retrieves the number of rows PostgreSQL's planner estimates for a query"""
+        statement = query.enable_eagerloads(False).statement.compile(
+            dialect=db.engine.dialect)
+        plan = db.session.connection().execute(
+            f'EXPLAIN (FORMAT JSON) {statement}', statement.params).scalar()
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def cursor_paginate_query(self, query, query_params, page_limit):
+        """Paginates the query with the keyset of the last item of the previous page
+
+        Uses the queries ?cursor=<cursor>&page_limit=<limit> where an empty cursor
+        retrieves the first page. Rows are sorted by the sort fields followed by
+        `id`, and a page is retrieved by filtering for the rows that come after the
+        sort key in the cursor, so no OFFSET or COUNT query is executed.
+
+        Args:
+            query(flask_sqlalchemy.BaseQuery): The query to be filtered
+            query_params(dict): Query params passed by the user
+            page_limit(int): the maximum number of items in the page
+
+        Returns:
+            (list, dict): Returns a tuple containing the query items and metadata
+        """
+        query, sort_keys = self._sort_keys(query, query_params)
+        sort_keys.append(('id', self.__model__.id, False))
+        sort_by = [
+            f'{"-" if is_desc else "+"}{field_name}'
+            for field_name, _, is_desc in sort_keys
+        ]
+        cursor = query_params.get('cursor')
+        if cursor:
+            values = self._decode_cursor(cursor, sort_by, sort_keys)
+            query = query.filter(self._keyset_filter(sort_keys, values))
+
+        order_by_list = []
+        for _, column, is_desc in sort_keys:
+            column = desc(column) if is_desc else column
+            order_by_list.append(expression.nullslast(column))
+        items = query.order_by(*order_by_list).limit(page_limit + 1).all()
+
+        next_cursor = None
+        if len(items) > page_limit:
+            items = items[:page_limit]
+            next_cursor = self._encode_cursor(items[-1], sort_by, sort_keys)
+        meta = {
+            'nextCursor': next_cursor,
+            'maxObjectsPerPage': page_limit,
+        }
+        return items, meta
+
+    @staticmethod
+    def _page_limit(query_params):
+        page_limit_str = query_params.get('page_limit')
+        limit_is_valid = page_limit_str and page_limit_str.isnumeric()
+        return int(page_limit_str) if limit_is_valid else 10
+
+    @staticmethod
+    def _keyset_filter(sort_keys, values):
+        """Generates the filter for the rows that are after a keyset
+
+        Since NULLs are sorted last, a row is after a NULL value only when its
+        own value is NULL and it is after the keyset in the later columns.
+        """
+        conditions = []
+        equal_conditions = []
+        for (_, column, is_desc), value in zip(sort_keys, values):
+            if value is None:
+                after_condition = None
+                equal_condition = column.is_(None)
+            else:
+                after_condition = (column < value) if is_desc else (
+                    column > value)
+                after_condition = after_condition | column.is_(None)
+                equal_condition = column == value
+            if after_condition is not None:
+                conditions.append(and_(*equal_conditions, after_condition))
+            equal_conditions.append(equal_condition)
+        return or_(*conditions)
+
+    def _encode_cursor(self, item, sort_by, sort_keys):
+        model = item if isinstance(item, self.__model__) else item[0]
+        values = []
+        for field_name, _, _ in sort_keys:
+            value = model
+            for attr in field_name.split('.'):
+                value = getattr(value, attr) if value is not None else None
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            values.append(value)
+        cursor = json.dumps({'sort_by': sort_by, 'values': values})
+        return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor, sort_by, sort_keys):
+        """Retrieves the keyset values in a cursor
+
+        Raises:
+            ResponseException: when the cursor is invalid or was generated for a
+                different sort order
+        """
+        try:
+            cursor_dict = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            values = cursor_dict['values']
+            if cursor_dict['sort_by'] != sort_by or len(values) != len(
+                    sort_keys):
+                raise ValueError('Cursor does not match the sort order')
+            for index, (_, column, _) in enumerate(sort_keys):
+                if values[index] is None:
+                    continue
+                if isinstance(column.type, DateTime):
+                    values[index] = datetime.fromisoformat(values[index])
+                elif isinstance(column.type, Date):
+                    values[index] = date.fromisoformat(values[index])
+        except (ValueError, TypeError, KeyError, binascii.Error):
+            raise ResponseException(serialization_error['invalid_cursor'], 400)
+        return values
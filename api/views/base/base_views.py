@@ -1,12 +1,15 @@
-from .base_queries import PaginatorMixin, SearchFilterMixin
+from .base_queries import PaginatorMixin, SearchFilterMixin, SparseFieldsMixin
+import hashlib
 import os
 from flask_restplus import Resource
-from flask import request
+from flask import request, Response
+from werkzeug.http import quote_etag
 from api.utils.token_validator import TokenValidator
 from api.utils.constants import LOGIN_TOKEN
 from datetime import timedelta, datetime
 from .decoratorators import Authentication, OrgViewDecorator
 from api.services.redis_util import RedisUtil
+from api.services.response_cache import ResponseCache
 from api.utils.constants import COOKIE_TOKEN_KEY, REDIS_TOKEN_HASH_KEY
 from api.utils.id_generator import IDGenerator
 from sqlalchemy import func
@@ -88,29 +91,149 @@ class BaseValidateRelatedOrgModelMixin:
                                     errors=errors)
 
 
-class BasePaginatedView(SearchFilterMixin, PaginatorMixin):
+class BasePaginatedView(SparseFieldsMixin, SearchFilterMixin, PaginatorMixin):
+    """
+    Retrieves a page of the models of `__model__` in the GET method
+
+    When CACHE_RESPONSES is True the data of each page is cached with the
+    ResponseCache until the `__model__` or any of the CACHE_DEPENDENCIES, the
+    other models whose rows are in the response, is changed. These models must
+    set `__track_generations__` to True.
+
+    The ETAG_STRATEGY adds a weak ETag to the response and answers requests
+    whose If-None-Match matches it with `304 Not Modified` before the page is
+    queried and serialized:
+        - `generation`: the ETag is generated from the generations of the
+            `__model__` and the CACHE_DEPENDENCIES, the same way the key of the
+            ResponseCache is
+        - `timestamp`: the ETag is generated from the number of rows in the
+            filtered query and the latest `created_at` or `updated_at` of the
+            rows and of their ETAG_TIMESTAMP_RELATIONSHIPS
+    """
     __SCHEMA__ = None
     RETRIEVE_SUCCESS_MSG = None
     SCHEMA_EXCLUDE = []
     EAGER_LOADING_FIELDS = []
     SEARCH_FILTER_ARGS = {}
+    CACHE_RESPONSES = False
+    CACHE_DEPENDENCIES = []
+    ETAG_STRATEGY = None
+    ETAG_TIMESTAMP_RELATIONSHIPS = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not (cls.CACHE_RESPONSES or cls.ETAG_STRATEGY == 'generation'):
+            return
+        untracked_models = [
+            model.__name__
+            for model in [cls.__model__, *cls.CACHE_DEPENDENCIES]
+            if not model.__track_generations__
+        ]
+        if untracked_models:
+            raise TypeError(
+                f'{cls.__name__} uses the generations of {untracked_models} '
+                'but they are not tracked')
 
     def get(self, *args, **kwargs):
+        endpoint = type(self).__name__
+        key = None
+        if self.CACHE_RESPONSES or self.ETAG_STRATEGY == 'generation':
+            key = ResponseCache.key(endpoint,
+                                    request.path,
+                                    request.args,
+                                    [self.__model__, *self.CACHE_DEPENDENCIES],
+                                    org_id=kwargs.get('org_id'))
+
+        headers = {}
+        etag = self.generate_etag(key, *args, **kwargs)
+        if etag:
+            headers['ETag'] = quote_etag(etag, weak=True)
+            if request.if_none_match.contains_weak(etag):
+                return Response(status=304, headers=headers)
+
+        if self.CACHE_RESPONSES:
+            data = ResponseCache.get_or_set(
+                endpoint, key,
+                lambda: self.generate_page_data(*args, **kwargs))
+        else:
+            data = self.generate_page_data(*args, **kwargs)
+        return data, 200, headers
+
+    def generate_etag(self, cache_key, *args, **kwargs):
+        """Generates the ETag of the response with the ETAG_STRATEGY
+
+        Args:
+            cache_key(str): the key generated with `ResponseCache.key` or None
+                when the view neither caches responses nor uses generations
+            *args: the args passed to the GET method
+            **kwargs: the keyword args passed to the GET method
+
+        Returns:
+            str: the unquoted ETag or None if the view has no ETAG_STRATEGY
+        """
+        if self.ETAG_STRATEGY == 'generation':
+            validator = cache_key
+        elif self.ETAG_STRATEGY == 'timestamp':
+            validator = self._timestamp_validator(*args, **kwargs)
+        else:
+            return None
+        # the same page can differ between users so the user is a part of it
+        user_id = (kwargs.get('user_data') or {}).get('id')
+        return hashlib.sha1(f'{user_id}:{validator}'.encode()).hexdigest()
+
+    def _timestamp_validator(self, *args, **kwargs):
+        self._joined_fields = []  # used in BaseFilterMixin
+        query = self.get_method_query(request.args, *args, **kwargs)
+        model = self.__model__
+        timestamps = [model.created_at, model.updated_at]
+        for relationship in self.ETAG_TIMESTAMP_RELATIONSHIPS:
+            related_model = getattr(model, relationship).property.mapper.class_
+            query = self.join_col(query, related_model)
+            timestamps.extend(
+                [related_model.created_at, related_model.updated_at])
+
+        count, last_modified = query.enable_eagerloads(False).with_entities(
+            func.count(), func.max(func.greatest(*timestamps))).one()
+        last_modified = last_modified.isoformat() if last_modified else None
+        params = sorted(request.args.items(multi=True))
+        return f'{request.path}?{params}:{count}:{last_modified}'
+
+    def generate_page_data(self, *args, **kwargs):
         self._joined_fields = []  # used in BaseFilterMixin
         query_params = request.args
-        query = self.search_model(query_params)
-        query = self.filter_get_method_query(query, *args, **kwargs)
-        page_query, meta = self.paginate_query(query, query_params)
-        data = self.__SCHEMA__(exclude=self.SCHEMA_EXCLUDE,
-                               many=True).dump_success_data(
-                                   page_query,
-                                   message=self.RETRIEVE_SUCCESS_MSG)
+        field_names = self.requested_fields(query_params)
+        self._required_attributes = self.required_attributes(field_names)
+        query = self.get_method_query(query_params, *args, **kwargs)
+        query = self.load_only_required_columns(query)
+        page_query, meta = self.paginate_query(query, query_params, **kwargs)
+        data = self.list_schema(field_names).dump_success_data(
+            self.process_page_items(page_query),
+            message=self.RETRIEVE_SUCCESS_MSG,
+            compiled=True)
         data['meta'] = meta
-        return data, 200
+        return data
+
+    def get_method_query(self, query_params, *args, **kwargs):
+        """Returns the query that would be paginated by the GET method
+
+        Args:
+            query_params(dict): Query params passed by the user
+            *args: the args passed to the GET method
+            **kwargs: the keyword args passed to the GET method
+
+        Returns:
+            flask_sqlalchemy.BaseQuery: the searched and filtered query
+        """
+        query = self.search_model(query_params)
+        return self.filter_get_method_query(query, *args, **kwargs)
 
     def filter_get_method_query(self, query, *args, **kwargs):
         return query
 
+    def process_page_items(self, items):
+        """Converts the items of the current page to what would be serialized"""
+        return items
+
 
 class CookieGeneratorMixin:
     def generate_cookie(self, resp, user):
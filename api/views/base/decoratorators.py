@@ -2,7 +2,7 @@ from api.utils.exceptions import ResponseException
 from api.utils.token_validator import TokenValidator
 from api.utils.error_messages import authentication_errors, serialization_error
 from api.utils.constants import LOGIN_TOKEN, COOKIE_TOKEN_KEY, REDIS_TOKEN_HASH_KEY
-from api.models import Membership
+from api.services.membership_cache import MembershipCache
 
 from functools import wraps
 from flask import request
@@ -25,6 +25,7 @@ class Authentication:
             dict, str: The decoded token data
         """
         from api.services.redis_util import RedisUtil
+        from api.services.session_cache import SessionCache
         cookie_value = request.cookies.get(COOKIE_TOKEN_KEY)
 
         if not cookie_value or len(cookie_value.split('/')) != 2:
@@ -32,11 +33,15 @@ class Authentication:
                 authentication_errors['token_error'],
                 401,
             )
-        user_id, token_id = cookie_value.split('/')
-        redis_hash = f'{user_id}_{REDIS_TOKEN_HASH_KEY}'
-        token = RedisUtil.hget(redis_hash, token_id)
-        decoded_data = TokenValidator.decode_token_data(token,
-                                                        token_type=LOGIN_TOKEN)
+        decoded_data = SessionCache.get(cookie_value)
+        if decoded_data is None:
+            user_id, token_id = cookie_value.split('/')
+            redis_hash = f'{user_id}_{REDIS_TOKEN_HASH_KEY}'
+            token = RedisUtil.hget(redis_hash, token_id)
+            token_data = TokenValidator.decode_token(token,
+                                                     token_type=LOGIN_TOKEN)
+            decoded_data = token_data['data']
+            SessionCache.set(cookie_value, decoded_data, token_data['exp'])
         if check_user_is_verified and not decoded_data['verified']:
             raise ResponseException(
                 authentication_errors['unverified_user'],
@@ -74,9 +79,7 @@ class OrgViewDecorator:
         def wrapper(*args, **kwargs):
             user_data = kwargs.get('user_data')
             org_id = kwargs.get('org_id')
-            membership = Membership.eager('role', 'member')\
-                .filter_by(
-                organisation_id=org_id, user_id=user_data['id']).first()
+            membership = MembershipCache.get(user_data['id'], org_id)
 
             if not membership:
                 raise ResponseException(
@@ -87,7 +90,7 @@ class OrgViewDecorator:
 
             allowed_roles = self.view.ALLOWED_ROLES.get(request.method.upper())
 
-            if allowed_roles and membership.role.name not in allowed_roles:
+            if allowed_roles and membership.role_name not in allowed_roles:
                 raise ResponseException(
                     message=authentication_errors['forbidden'],
                     status_code=403,
@@ -1,8 +1,8 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 import jwt
 from .base import BaseView, CookieGeneratorMixin
 from settings import endpoint
-from flask import request, redirect, make_response
+from flask import current_app, request, redirect, make_response
 
 from api.utils.error_messages import serialization_error, authentication_errors
 from api.utils.success_messages import REG_VERIFIED, CONFIRM_EMAIL_RESENT
@@ -11,17 +11,18 @@ from api.utils.token_validator import TokenValidator
 from api.models import User
 from api.schemas import UserSchema, LoginSchema
 from api.utils.success_messages import CREATED, LOGIN
-from api.utils.constants import CONFIRM_TOKEN, FAILED_LOGIN_LIMITS
+from api.utils.constants import CONFIRM_TOKEN
 from api.services.redis_util import RedisUtil
+from api.services.login_throttle import LoginThrottle
 
 
 @endpoint('/auth/register')
 class Register(BaseView, CookieGeneratorMixin):
     def post(self):
-        user_obj = UserSchema().load(request.get_json())
+        user_obj = UserSchema.pooled().load(request.get_json())
         user_obj.save()
-        user_data = UserSchema().dump_success_data(user_obj,
-                                                   CREATED.format('user'))
+        user_data = UserSchema.pooled().dump_success_data(
+            user_obj, CREATED.format('user'))
         return user_data, 201
 
 
@@ -88,24 +89,32 @@ class ConfirmEmail(BaseView, CookieGeneratorMixin):
 
 @endpoint('/auth/login')
 class Login(BaseView, CookieGeneratorMixin):
-    def validate_login_limit(self, username_or_email):
-        number_of_tries = RedisUtil.hget('login', username_or_email)
-        if number_of_tries is None:
-            number_of_tries = 0
-        number_of_tries = int(number_of_tries)
-        if number_of_tries >= FAILED_LOGIN_LIMITS:
+    def validate_login_limit(self, username_or_email, ip_address):
+        blocked_type = LoginThrottle.is_blocked(username_or_email, ip_address)
+        if blocked_type:
             raise LoginLimitExceeded(
                 message=authentication_errors['login_limit_reached'].format(
-                    FAILED_LOGIN_LIMITS),
+                    LoginThrottle.LIMITS[blocked_type]),
                 status_code=400,
             )
-        return number_of_tries
+
+    @staticmethod
+    def client_ip_address():
+        """Retrieves the address of the client when it can be trusted
+
+        Without proxies configured (see NUM_OF_PROXIES) the address is the
+        proxy's when the app is deployed behind one, so it is not used.
+        """
+        if current_app.config['NUM_OF_PROXIES']:
+            return request.remote_addr
+        return None
 
     def post(self):
-        user_data = LoginSchema().load(request.get_json())
+        user_data = LoginSchema.pooled().load(request.get_json())
         username_or_email = user_data['username_or_email']
         password = user_data['password']
-        number_of_tries = self.validate_login_limit(username_or_email)
+        ip_address = self.client_ip_address()
+        self.validate_login_limit(username_or_email, ip_address)
         query_by_email = '@' in username_or_email
         if query_by_email:
             user = User.query.filter_by(email=username_or_email).first()
@@ -113,16 +122,13 @@ class Login(BaseView, CookieGeneratorMixin):
             user = User.query.filter_by(username=username_or_email).first()
 
         if user and user.verify_password(password):
-            user_json = UserSchema().dump_success_data(user,
-                                                       LOGIN.format('user'))
+            user_json = UserSchema.pooled().dump_success_data(
+                user, LOGIN.format('user'))
             resp = make_response(user_json)
             resp.status_code = 200
             return self.generate_cookie(resp, user)
 
-        expiry_duration = timedelta(minutes=5)
-        number_of_tries += 1
-        RedisUtil.hset('login', username_or_email, number_of_tries,
-                       expiry_duration)
+        LoginThrottle.record_failure(username_or_email, ip_address)
         raise LoginFailedException(
             message=serialization_error['login_failed'],
             status_code=400,
@@ -51,7 +51,7 @@ class OrgInvitations(BaseOrgView, BasePaginatedView):
             membership, org_id)
         invitations = Invitation.bulk_create_or_none(
             list_of_models,
-            inviter_membership=membership,
+            inviter_membership=membership.model,
             send_email=True,
             signup_url=request_data['signupURL'],
             dashboard_url=request_data['userDashboardURL'],
@@ -61,16 +61,16 @@ class OrgInvitations(BaseOrgView, BasePaginatedView):
                 message=invitation_errors['missing_role_ids'],
                 status_code=404,
             )
-        res_data = InvitationSchema(many=True,
-                                    exclude=['role',
-                                             'organisation']).dump(invitations)
+        res_data = InvitationSchema.pooled(many=True,
+                                           exclude=['role', 'organisation'
+                                                    ]).dump(invitations)
         return self.generate_response(list_of_existing_emails, list_of_models,
                                       res_data)
 
     def extract_inv_model_list(self, membership, org_id):
         request_data = request.get_json()
         roles_user_cannot_send_invites = self.roles_that_cannot_be_sent_invites_by_current_user(
-            membership.role.name)
+            membership.role_name)
 
         invitations = InvitationRequestSchema(
             roles_user_cannot_send_invites=roles_user_cannot_send_invites,
@@ -146,11 +146,12 @@ class OrgInvitations(BaseOrgView, BasePaginatedView):
 
     @staticmethod
     def roles_that_cannot_be_sent_invites_by_current_user(user_role):
+        owner_role_id, admin_role_id = RedisUtil.get_role_ids('OWNER', 'ADMIN')
         roles_not_allowed = {
-            RedisUtil.get_role_id('OWNER'): 'OWNER',
+            owner_role_id: 'OWNER',
         }
         if user_role != 'OWNER':
-            roles_not_allowed[RedisUtil.get_role_id('ADMIN')] = 'ADMIN'
+            roles_not_allowed[admin_role_id] = 'ADMIN'
         return roles_not_allowed
 
 
@@ -174,13 +175,13 @@ class ResendInvitation(BaseOrgView):
                 status_code=404,
             )
 
-        invitation_requests = InvitationRequestWithoutInvitesSchema().load(
-            request.get_json())
+        invitation_requests = InvitationRequestWithoutInvitesSchema.pooled(
+        ).load(request.get_json())
 
         Invitation.send_email_to_users(
             dashboard_url=invitation_requests['user_dashboard_url'],
             signup_url=invitation_requests['signup_url'],
-            inviter_membership=membership,
+            inviter_membership=membership.model,
             emails=[invitation.email])
 
         return {'status': 'success', 'message': 'Invitation was re-sent.'}, 202
@@ -233,7 +234,7 @@ class AcceptInvitation(BaseView):
             organisation_id=invitation.organisation_id,
         )
         membersip.save(commit=False)
-        final_response = MembershipIDOnlySchema(
+        final_response = MembershipIDOnlySchema.pooled(
             exclude=['user_id']).dump_success_data(membersip, ADDED_TO_ORG)
         invitation.delete(commit=True)
         return final_response, 201
@@ -1,23 +1,31 @@
-import pandas as pd
+import csv
+from itertools import chain
 from datetime import datetime, timedelta
 from dateutil import parser, tz
 from pytz import timezone
-from sqlalchemy.sql import functions
-from sqlalchemy import cast, Date, String
-from flask import make_response
+from sqlalchemy.orm import joinedload
+from flask import make_response, Response, stream_with_context
+from marshmallow import ValidationError
 from api.utils.exceptions import ResponseException
+from api.utils.id_generator import IDGenerator
+from api.utils.time_util import TimeUtil
 from api.utils.error_messages import serialization_error
 from .base import BaseOrgView, BasePaginatedView
 from settings import org_endpoint
 from flask import request
-from api.models import ValueTypeEnum, Log, LogValue, Parameter, db, Unit
-from api.schemas import LogSchema
-from api.utils.success_messages import SAVED, RETRIEVED
+from api.models import ValueTypeEnum, Log, LogStorage, Parameter, LogRollup
+from api.services.appliance_schema_cache import ApplianceSchemaCache
+from api.schemas import LogSchema, LogBatchEntrySchema
+from api.utils.success_messages import SAVED, RETRIEVED, LOG_BATCH_MSG_DICT
 
 
 @org_endpoint('/appliances/<string:appliance_id>/export-logs')
 class ExportLogsView(BaseOrgView):
     PROTECTED_METHODS = ['GET']
+    DATE_CREATED_KEY = 'Date Created'
+    PERIOD_START_KEY = 'Period Start'
+    AGGREGATED_STATS = ['Average', 'Min', 'Max']
+    STREAM_BATCH_SIZE = 1000
 
     def parse_seconds_data(self):
         try:
@@ -30,11 +38,13 @@ class ExportLogsView(BaseOrgView):
         try:
             start_date = request.args.get('start_date', str(datetime.utcnow()))
             start_date = parser.parse(start_date)
-            start_date = start_date if start_date.tzinfo else timezone('UTC').localize(start_date)
+            start_date = start_date if start_date.tzinfo else timezone(
+                'UTC').localize(start_date)
             end_date = request.args.get('end_date',
                                         str(start_date - timedelta(days=30)))
             end_date = parser.parse(end_date)
-            end_date = end_date if end_date.tzinfo else timezone('UTC').localize(end_date)
+            end_date = end_date if end_date.tzinfo else timezone(
+                'UTC').localize(end_date)
             if end_date < start_date:
                 raise ResponseException(
                     serialization_error['f1_must_be_gte_f2'].format(
@@ -46,49 +56,96 @@ class ExportLogsView(BaseOrgView):
         return seconds_offset, start_date.date(), end_date.date()
 
     def get(self, org_id, user_data, appliance_id, membership, **kwargs):
+        """Exports the logs of an appliance to a CSV file
+
+        The logs are pivoted by PostgreSQL (see `LogStorage.pivot_query`) so every row read
+        is already a CSV row with one typed column per parameter. The unit of each
+        parameter is added to its column header.
+
+        When `?mode=stream` is specified, the rows are read through a server-side
+        cursor and streamed to the client one log at a time so memory usage stays
+        flat regardless of how many logs are in the date range.
+
+        When `?mode=aggregated` is specified, the average, min and max of every
+        numeric parameter in each hour or day (`?granularity=hour|day`) are read
+        from the log rollups (see `LogRollup`) instead of the logs.
+        """
         seconds_offset, start_date, end_date = self.parse_seconds_data()
-        date_created_key = 'Date Created'
-        coalesce_log_value = functions.coalesce(
-            LogValue.text_value, cast(LogValue.numeric_value, String))
-        log_data = db.session.query(
-            Log.id, Log.created_at, Parameter.name,
-            functions.concat(coalesce_log_value, ' ', Unit.symbol)).join(
-                LogValue,
-                (LogValue.log_id == Log.id) &
-                (Log.appliance_id == appliance_id) &
-                (cast(Log.created_at, Date) >= start_date) &
-                (cast(Log.created_at, Date) <= end_date),
-            ).join(Parameter, Parameter.id == LogValue.parameter_id).join(
-                Unit,
-                Parameter.unit_id == Unit.id,
-                isouter=True,
-            ).filter(Log.organisation_id == org_id).all()
-        if len(log_data) == 0:
+        params = Parameter.get_parameters_in_appliance(
+            org_id, appliance_id).options(joinedload(Parameter.unit)).order_by(
+                Parameter.name).all()
+        mode = request.args.get('mode')
+        if mode == 'aggregated':
+            header, logs = self._aggregated_rows(org_id, appliance_id, params,
+                                                 start_date, end_date)
+        else:
+            header = [self.DATE_CREATED_KEY
+                      ] + [self._column_header(param) for param in params]
+            logs = LogStorage.active().appliance_logs_in_date_range(
+                org_id, appliance_id, params, start_date, end_date)
+        stream = mode == 'stream'
+        if stream:
+            logs = logs.yield_per(self.STREAM_BATCH_SIZE)
+        logs = iter(logs)
+        first_log = next(logs, None)
+        if first_log is None:
             raise ResponseException(
                 serialization_error['not_found'].format(
                     'Logs with specified filters'), 404)
 
-        # This pivots the columns and generates the report
-        df = pd.DataFrame(
-            log_data,
-            columns=['log_id', date_created_key, 'parameter', 'value'])
-        pivoted_df = df.pivot(index='log_id',
-                              columns='parameter',
-                              values='value')
-        joined_df = pd.merge(df[['log_id', date_created_key]],
-                             pivoted_df,
-                             on='log_id',
-                             how='inner').drop_duplicates()
-        joined_df[date_created_key] = joined_df[date_created_key].apply(
-            lambda date: date.astimezone(tz.tzoffset(None, seconds_offset)))
-        del joined_df['log_id']
-
-        resp = make_response(joined_df.to_csv(index=False))
+        logs = chain([first_log], logs)
+        if mode != 'aggregated':
+            logs = ((created_at, *values)
+                    for log_id, created_at, *values in logs)
+        rows = self._generate_csv_rows(header, logs, seconds_offset)
+        if stream:
+            resp = Response(stream_with_context(rows), mimetype='text/csv')
+        else:
+            resp = make_response(''.join(rows))
+            resp.headers["Content-Type"] = "text/csv"
         resp.headers[
             "Content-Disposition"] = "attachment; filename=exported_log_file.csv"
-        resp.headers["Content-Type"] = "text/csv"
         return resp
 
+    def _aggregated_rows(self, org_id, appliance_id, params, start_date,
+                         end_date):
+        rollup_model = LogRollup.model_for(
+            request.args.get('granularity', 'day'))
+        if rollup_model is None:
+            raise ResponseException(
+                serialization_error['invalid_option'].format(
+                    'granularity', 'hour, day'), 400)
+        params = [
+            param for param in params
+            if param.value_type == ValueTypeEnum.NUMERIC
+        ]
+        header = [self.PERIOD_START_KEY] + [
+            f'{self._column_header(param)} {stat}' for param in params
+            for stat in self.AGGREGATED_STATS
+        ]
+        rows = rollup_model.pivot_query(org_id, appliance_id, params,
+                                        start_date, end_date)
+        return header, rows
+
+    def _generate_csv_rows(self, header, rows, seconds_offset):
+        writer = csv.writer(_EchoBuffer())
+        offset = tz.tzoffset(None, seconds_offset)
+        yield writer.writerow(header)
+        for timestamp, *values in rows:
+            yield writer.writerow([timestamp.astimezone(offset), *values])
+
+    @staticmethod
+    def _column_header(param):
+        if param.unit:
+            return f'{param.name} ({param.unit.symbol})'
+        return param.name
+
+
+class _EchoBuffer:
+    """A file-like object that hands back whatever the csv writer writes"""
+    def write(self, value):
+        return value
+
 
 @org_endpoint('/logs')
 class LogsView(BaseOrgView, BasePaginatedView):
@@ -102,10 +159,12 @@ class LogsView(BaseOrgView, BasePaginatedView):
 
     SORT_KWARGS = {
         'defaults': '-created_at, -updated_at',
-        'sort_fields': {'created_at', 'updated_at'}
+        'sort_fields': {'created_at', 'updated_at'},
+        'cursor_pagination': True,
     }
 
     RETRIEVE_SUCCESS_MSG = RETRIEVED.format('Logs')
+    COUNT_STRATEGY = 'estimated'
     EAGER_LOADING_FIELDS = ['log_values']
     SEARCH_FILTER_ARGS = {
         'appliance_id': {
@@ -116,59 +175,302 @@ class LogsView(BaseOrgView, BasePaginatedView):
     # SCHEMA_EXCLUDE = ['appliance_id']
 
     def filter_get_method_query(self, query, *args, **kwargs):
-        return query.filter_by(organisation_id=kwargs.get('org_id'))
+        return query.filter(Log.organisation_id == kwargs.get('org_id'))
+
+    def eager_loading_fields(self):
+        storage_fields = LogStorage.active().EAGER_LOADING_FIELDS
+        return [
+            field for field in super().eager_loading_fields()
+            if field != 'log_values' or field in storage_fields
+        ]
+
+    def get_method_query(self, query_params, *args, org_id, **kwargs):
+        """Uses the SQL pivot when the logs of only one appliance are requested
+
+        The log values of the appliance are pivoted by PostgreSQL into one row per
+        log (see `LogStorage.pivot_query`) so no `log_values` rows need to be
+        loaded.
+        """
+        appliance_id = query_params.get('appliance_id_search')
+        if not appliance_id:
+            self._pivot_params = None
+            return super().get_method_query(query_params,
+                                            *args,
+                                            org_id=org_id,
+                                            **kwargs)
+
+        self._pivot_params = Parameter.get_parameters_in_appliance(
+            org_id, appliance_id).all()
+        query = LogStorage.active().pivot_query(
+            self._pivot_params, Log).filter(Log.appliance_id == appliance_id)
+        return self.filter_get_method_query(query,
+                                            *args,
+                                            org_id=org_id,
+                                            **kwargs)
+
+    def process_page_items(self, items):
+        if self._pivot_params is None:
+            return items
+        logs = []
+        for log, *values in items:
+            log.pivoted_values = {
+                param.id: value
+                for param, value in zip(self._pivot_params, values)
+                if value is not None
+            }
+            logs.append(log)
+        return logs
 
     def post(self, org_id, user_data, membership, **kwargs):
-        request_dict = LogSchema().load(request.get_json())
+        request_dict = LogSchema.pooled().load(request.get_json())
         appliance_id = request_dict['appliance_id']
         log_data = request_dict['log_data']
-        param_objs = Parameter.get_parameters_in_appliance(
-            org_id, appliance_id).all()
-
-        error_objs = {}
+        param_objs = ApplianceSchemaCache.get(org_id, appliance_id)
 
         if len(param_objs) == 0:
             raise ResponseException(
                 message=serialization_error['not_found'].format('Appliance'), )
-        log_model = Log(organisation_id=org_id,
-                        appliance_id=appliance_id,
-                        created_by_id=user_data['id'])
-        log_model.save(commit=False)
-        log_values = []
-        for param in param_objs:
-            request_value = log_data.get(param.id)
-            if request_value is None:
-                error_objs[param.id] = serialization_error['required']
-            elif (param.value_type == ValueTypeEnum.NUMERIC
-                  and self.validate_numeric_value(request_value) is False):
-                error_objs[param.id] = serialization_error['number_only']
-            elif param.value_type == ValueTypeEnum.NUMERIC:
-                log_values.append(
-                    LogValue(parameter_id=param.id,
-                             log_id=log_model.id,
-                             numeric_value=request_value))
-            else:
-                log_values.append(
-                    LogValue(parameter_id=param.id,
-                             log_id=log_model.id,
-                             text_value=request_value))
-
+        value_dicts, error_objs = self.validate_log_data(param_objs, log_data)
         if error_objs:
             raise ResponseException(
                 message=serialization_error['invalid_field_data'],
                 status_code=400,
                 errors=error_objs)
 
-        LogValue.bulk_create(log_values, commit=True)
+        log_storage = LogStorage.active()
+        log_row = {
+            'id': IDGenerator.generate_id(),
+            'organisation_id': org_id,
+            'appliance_id': appliance_id,
+            'created_by_id': user_data['id'],
+        }
+        log_storage.save([log_row], [{
+            'log_id': log_row['id'],
+            **value_dict
+        } for value_dict in value_dicts])
+
+        saved_log_model = Log.eager(
+            *log_storage.EAGER_LOADING_FIELDS).filter_by(
+                id=log_row['id']).first()
+        return LogSchema.pooled().dump_success_data(saved_log_model,
+                                                    SAVED.format('Log')), 201
 
-        saved_log_model = Log.eager('log_values').filter_by(
-            id=log_model.id).first()
-        return LogSchema().dump_success_data(saved_log_model,
-                                             SAVED.format('Log')), 201
+    @classmethod
+    def validate_log_data(cls, param_objs, log_data):
+        """Validates the values of a log against the parameters of its appliance
+
+        Args:
+            param_objs(list): the IngestParameter of each parameter of the
+                appliance (see `ApplianceSchemaCache`)
+            log_data(dict): maps parameter IDs to the values that were logged
+
+        Returns:
+            (list, dict): the `LogValue` column values of each parameter and a
+                dict mapping the IDs of invalid parameters to their errors
+        """
+        return cls.validate_logs_data(param_objs, [log_data])[0]
 
     @staticmethod
-    def validate_numeric_value(num_with_str):
-        try:
-            return float(num_with_str)
-        except ValueError:
-            return False
+    def validate_logs_data(param_objs, logs_data):
+        """Validates the values of many logs of an appliance at once
+
+        The values of each parameter in every log are validated together by
+        the compiled validator of the parameter.
+
+        Args:
+            param_objs(list): the IngestParameter of each parameter of the
+                appliance (see `ApplianceSchemaCache`)
+            logs_data(list): the `log_data` of each log
+
+        Returns:
+            list: the `(value_dicts, error_objs)` of each log, see
+                `validate_log_data`
+        """
+        results = [([], {}) for _ in logs_data]
+        for param in param_objs:
+            values = [log_data.get(param.id) for log_data in logs_data]
+            is_numeric = param.value_type == ValueTypeEnum.NUMERIC
+            for (value_dicts, error_objs), value, error in zip(
+                    results, values, param.validator.validate(values)):
+                if error:
+                    error_objs[param.id] = error
+                    continue
+                value_dicts.append({
+                    'parameter_id': param.id,
+                    'numeric_value': value if is_numeric else None,
+                    'text_value': None if is_numeric else value,
+                })
+        return results
+
+
+@org_endpoint('/logs/batch')
+class LogBatchView(BaseOrgView):
+    PROTECTED_METHODS = ['POST']
+    ALLOWED_ROLES = {
+        'POST': ['OWNER', 'ADMIN', 'ENGINEER'],
+    }
+    MAX_BATCH_SIZE = 1000
+
+    def post(self, org_id, user_data, membership, **kwargs):
+        """Saves many logs of one or more appliances at once
+
+        The parameters of all the appliances in the request are retrieved from
+        the ApplianceSchemaCache at once and the entries of each appliance are
+        validated together before anything is saved. The logs of the valid
+        entries are then saved with the active LogStorage in a single
+        transaction while the invalid entries are reported in `data.failed`.
+        """
+        entries = self.load_entries()
+        appliance_ids = {
+            entry['appliance_id']
+            for _, entry, errors in entries if not errors
+        }
+        params_by_appliance = ApplianceSchemaCache.get_many(
+            org_id, appliance_ids)
+        validated_entries = self.validate_entries(entries, params_by_appliance)
+
+        now = TimeUtil.now()
+        log_ids = iter(IDGenerator.generate_ids(len(entries)))
+        log_rows, log_value_rows, failed = [], [], []
+        for index, entry, errors in entries:
+            if errors:
+                failed.append({'index': index, 'errors': errors})
+                continue
+            param_objs = params_by_appliance.get(entry['appliance_id'])
+            if not param_objs:
+                failed.append({
+                    'index': index,
+                    'errors': {
+                        'applianceId':
+                        [serialization_error['not_found'].format('Appliance')]
+                    }
+                })
+                continue
+            value_dicts, error_objs = validated_entries[index]
+            if error_objs:
+                failed.append({
+                    'index': index,
+                    'errors': {
+                        'logData': error_objs
+                    }
+                })
+                continue
+            log_row = {
+                'id': next(log_ids),
+                'organisation_id': org_id,
+                'appliance_id': entry['appliance_id'],
+                'created_by_id': user_data['id'],
+                'created_at': self.to_utc(entry.get('timestamp')) or now,
+            }
+            log_rows.append(log_row)
+            log_value_rows.extend({
+                'log_id': log_row['id'],
+                'created_at': log_row['created_at'],
+                **value_dict
+            } for value_dict in value_dicts)
+
+        if log_rows:
+            LogStorage.active().save(log_rows, log_value_rows)
+        return self.generate_response(log_rows, log_value_rows, failed)
+
+    def load_entries(self):
+        """Loads every entry in the request body on its own
+
+        Returns:
+            list: `(index, entry, errors)` tuples where `entry` is the loaded data
+                and `errors` the validation errors of the entry
+        """
+        request_data = request.get_json()
+        if not isinstance(request_data, list) or len(request_data) == 0:
+            raise ResponseException(
+                message=serialization_error['list_only'],
+                status_code=400,
+            )
+        if len(request_data) > self.MAX_BATCH_SIZE:
+            raise ResponseException(
+                message=serialization_error['max_items_error'].format(
+                    self.MAX_BATCH_SIZE),
+                status_code=400,
+            )
+        schema = LogBatchEntrySchema.pooled()
+        entries = []
+        for index, entry_data in enumerate(request_data):
+            try:
+                entries.append((index, schema.load(entry_data), None))
+            except ValidationError as e:
+                entries.append((index, None, e.messages))
+        return entries
+
+    @staticmethod
+    def validate_entries(entries, params_by_appliance):
+        """Validates the log data of the entries of each appliance at once
+
+        Returns:
+            dict: maps the index of every loaded entry of an existing appliance
+                to its `(value_dicts, error_objs)` (see
+                `LogsView.validate_log_data`)
+        """
+        entries_by_appliance = {}
+        for index, entry, errors in entries:
+            if not errors and params_by_appliance.get(entry['appliance_id']):
+                entries_by_appliance.setdefault(entry['appliance_id'],
+                                                []).append((index, entry))
+
+        validated_entries = {}
+        for appliance_id, appliance_entries in entries_by_appliance.items():
+            results = LogsView.validate_logs_data(
+                params_by_appliance[appliance_id],
+                [entry['log_data'] for _, entry in appliance_entries])
+            validated_entries.update(
+                zip([index for index, _ in appliance_entries], results))
+        return validated_entries
+
+    @staticmethod
+    def to_utc(timestamp):
+        if timestamp is None:
+            return None
+        if timestamp.tzinfo is None:
+            return timestamp.replace(tzinfo=tz.UTC)
+        return timestamp.astimezone(tz.UTC)
+
+    @staticmethod
+    def generate_response(log_rows, log_value_rows, failed):
+        """Generates the response of the batch based on the entries that failed
+
+        When no entry failed a status of success is sent, when every entry failed
+        error is sent, otherwise partial is sent
+        """
+        log_values = {}
+        for row in log_value_rows:
+            value = row['text_value']
+            if row['numeric_value'] is not None:
+                value = float(row['numeric_value'])
+            log_values.setdefault(row['log_id'],
+                                  {})[row['parameter_id']] = value
+
+        log_models = []
+        for row in log_rows:
+            log_model = Log(**row)
+            log_model.pivoted_values = log_values.get(row['id'], {})
+            log_models.append(log_model)
+
+        status = 'partial'
+        status = 'error' if len(log_rows) == 0 else status
+        status = 'success' if len(failed) == 0 else status
+        status_code = {
+            'error': 400,
+            'partial': 207,
+            'success': 201,
+        }
+        return {
+            'status': status,
+            'message': LOG_BATCH_MSG_DICT[status],
+            'data': {
+                'success':
+                LogSchema.pooled(many=True,
+                                 exclude=['created_by',
+                                          'updated_by']).dump(log_models),
+                'failed':
+                failed
+            }
+        }, status_code[status]
@@ -13,11 +13,11 @@ class CreateOrg(BaseView):
     def post(self, user_data):
         logo = request.files.get('logo')
         data_dict = {**request.form, 'logo': logo}
-        org_obj = OrganisationSchema().load(data_dict)
+        org_obj = OrganisationSchema.pooled().load(data_dict)
 
         org_obj.creator_id = user_data['id']
         org_obj.save(commit=False)
-        org_data = OrganisationSchema().dump_success_data(
+        org_data = OrganisationSchema.pooled().dump_success_data(
             org_obj, CREATED.format('organisation'))
         return org_data, 201
 
@@ -30,7 +30,8 @@ class RetrieveUserMemberships(BaseView, BasePaginatedView):
 
     SORT_KWARGS = {
         'defaults': 'organisation.name',
-        'sort_fields': {'organisation.name', 'role_id', 'role.name'}
+        'sort_fields': {'organisation.name', 'role_id', 'role.name'},
+        'cursor_pagination': True,
     }
     SEARCH_FILTER_ARGS = {
         'role_id': {
@@ -43,6 +44,8 @@ class RetrieveUserMemberships(BaseView, BasePaginatedView):
     __SCHEMA__ = OrgAndMembershipSchema
     EAGER_LOADING_FIELDS = ['organisation', 'role']
     RETRIEVE_SUCCESS_MSG = RETRIEVED.format('organisations')
+    ETAG_STRATEGY = 'timestamp'
+    ETAG_TIMESTAMP_RELATIONSHIPS = ['organisation']
 
     def filter_get_method_query(self, query, **kwargs):
         user_data = kwargs.get('user_data')
@@ -1,7 +1,7 @@
 from settings import org_endpoint
 from flask import request
 from .base import BaseOrgView, BasePaginatedView
-from api.models import Parameter
+from api.models import Parameter, Unit, User
 from api.schemas import ParameterSchema
 from api.utils.success_messages import CREATED, RETRIEVED
 
@@ -33,6 +33,9 @@ class ParameterView(BaseOrgView, BasePaginatedView):
         'created_by_id', 'updated_by', 'updated_by_id', 'organisation_id'
     ]
     EAGER_LOADING_FIELDS = ['unit', 'created_by', 'appliance_parameter']
+    CACHE_RESPONSES = True
+    CACHE_DEPENDENCIES = [Unit, User]
+    ETAG_STRATEGY = 'generation'
 
     def post(self, org_id, user_data, membership):
         exclude_fields = ['created_by', 'updated_by', 'organisation_id']
@@ -40,8 +43,9 @@ class ParameterView(BaseOrgView, BasePaginatedView):
         json_data = json_data if json_data else {}
         json_data['organisationId'] = org_id
         json_data['createdById'] = user_data['id']
-        param_obj = ParameterSchema().load(json_data)
+        param_obj = ParameterSchema.pooled().load(json_data)
         param_obj.save()
-        res_data = ParameterSchema(exclude=exclude_fields).dump_success_data(
-            param_obj, CREATED.format('Parameter'))
+        res_data = ParameterSchema.pooled(
+            exclude=exclude_fields).dump_success_data(
+                param_obj, CREATED.format('Parameter'))
         return res_data, 201
@@ -17,8 +17,8 @@ class Profile(BaseView):
     def get(self, user_data):
         user = User.query.get(user_data['id'])
 
-        user_data = UserSchema().dump_success_data(user,
-                                                   RETRIEVED.format("Profile"))
+        user_data = UserSchema.pooled().dump_success_data(
+            user, RETRIEVED.format("Profile"))
         return user_data, 200
 
     def patch(self, user_data):
@@ -27,7 +27,7 @@ class Profile(BaseView):
         if image:
             form_dict['image'] = image
 
-        schema = ProfileSchema()
+        schema = ProfileSchema.pooled()
         new_user_dict = schema.load(form_dict)
         data_to_update = ['username', 'first_name', 'last_name', 'image']
 
@@ -45,6 +45,6 @@ class Profile(BaseView):
         else:
             raise ResponseException(serialization_error['empty_update_data'])
         logging.info('---------Returning update data------')
-        user_data = UserSchema().dump_success_data(user_to_update,
-                                                   UPDATED.format("Profile"))
+        user_data = UserSchema.pooled().dump_success_data(
+            user_to_update, UPDATED.format("Profile"))
         return user_data, 201
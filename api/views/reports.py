@@ -3,7 +3,7 @@ from api.utils.error_messages import serialization_error
 from flask import request
 from .base import BaseOrgView, BaseValidateRelatedOrgModelMixin, BasePaginatedView
 from api.utils.success_messages import CREATED, RETRIEVED
-from api.schemas import ReportSchema, ReportSectionSchema, ReportColumnSchema
+from api.schemas import ReportSchema, ReportSectionSchema, ReportColumnSchema, ReportResultSchema
 from api.models import Report, ReportSection, ReportColumn, Appliance, Parameter
 from api.utils.exceptions import ResponseException
 
@@ -35,6 +35,7 @@ class ReportsView(BaseOrgView, BasePaginatedView,
 
     SCHEMA_EXCLUDE = ['sections']
     RETRIEVE_SUCCESS_MSG = RETRIEVED.format('Reports')
+    COUNT_STRATEGY = 'cached'
 
     # Validation Settings
     VALIDATE_RELATED_KWARGS = {
@@ -54,7 +55,7 @@ class ReportsView(BaseOrgView, BasePaginatedView,
     }
 
     def post(self, org_id, user_data, membership):
-        report_dict = ReportSchema().load(request.get_json())
+        report_dict = ReportSchema.pooled().load(request.get_json())
         sections = report_dict.pop('sections')
         report_model = Report(**report_dict,
                               organisation_id=org_id,
@@ -89,7 +90,7 @@ class ReportsView(BaseOrgView, BasePaginatedView,
         ReportSection.bulk_create(sections_model_list, commit=False)
         ReportColumn.bulk_create(column_model_list, commit=True)
 
-        report_dict = ReportSchema().dump_success_data(
+        report_dict = ReportSchema.pooled().dump_success_data(
             report_model, CREATED.format('Report'))
         return report_dict, 201
 
@@ -141,7 +142,58 @@ class ReportColumnView(BaseOrgView):
         if not section:
             raise ResponseException(
                 serialization_error['not_found'].format('Report Section'), 404)
-        schema = ReportSectionSchema()
+        schema = ReportSectionSchema.pooled()
 
         return schema.dump_success_data(section,
                                         RETRIEVED.format('Report Section'))
+
+
+@org_endpoint('/reports/<string:report_id>/results')
+class ReportResultsView(BaseOrgView):
+    PROTECTED_METHODS = ['GET']
+    ALLOWED_ROLES = {
+        'GET': ['ENGINEER', 'ADMIN', 'OWNER'],
+    }
+
+    @staticmethod
+    def get(report_id, org_id, **kwargs):
+        """Computes the aggregations of every column in a report
+
+        The columns of all the sections of an appliance are computed together in
+        one grouped query (see `Report.aggregate_appliance_logs`). Columns with
+        `aggregateByColumn` set get the total over the date range as their result
+        while the others get a list of the aggregated value of each day.
+        """
+        report = Report.eager('sections', 'sections.columns',
+                              'sections.columns.parameter',
+                              'sections.columns.parameter.unit').filter(
+                                  Report.id == report_id,
+                                  Report.organisation_id == org_id).first()
+        if not report:
+            raise ResponseException(
+                serialization_error['not_found'].format('Report'), 404)
+
+        columns_by_appliance = {}
+        for section in report.sections:
+            columns_by_appliance.setdefault(section.appliance_id,
+                                            []).extend(section.columns)
+
+        for appliance_id, columns in columns_by_appliance.items():
+            results = report.aggregate_appliance_logs(appliance_id, columns)
+            for column in columns:
+                values_by_day = results[(column.parameter_id,
+                                         column.aggregation_type)]
+                if column.aggregate_by_column:
+                    column.result = values_by_day.get(None)
+                else:
+                    column.result = [{
+                        'date': day.isoformat(),
+                        'value': value
+                    } for day, value in sorted(
+                        (day, value) for day, value in values_by_day.items()
+                        if day is not None)]
+
+        schema = ReportResultSchema.pooled(
+            exclude=['created_by', 'updated_by'])
+        return schema.dump_success_data(report,
+                                        RETRIEVED.format('Report Results'))
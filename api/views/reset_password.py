@@ -19,7 +19,7 @@ from api.services.redis_util import RedisUtil
 class ForgotPassword(BaseView):
     def patch(self):
         from api.utils.emails import EmailUtil
-        obj = ResetPasswordSchema().load(request.get_json(()))
+        obj = ResetPasswordSchema.pooled().load(request.get_json(()))
 
         user = User.query.filter_by(email=obj.email).first()
         if not user:
@@ -41,7 +41,8 @@ class ForgotPassword(BaseView):
 @endpoint('/auth/reset/confirm')
 class ConfirmResetPassword(BaseView, CookieGeneratorMixin):
     def patch(self):
-        loaded_data = CompleteResetPasswordSchema().load(request.get_json())
+        loaded_data = CompleteResetPasswordSchema.pooled().load(
+            request.get_json())
         token = RedisUtil.get_key(loaded_data['reset_id'])
         try:
             token_data = TokenValidator.decode_token_data(token, RESET_TOKEN)
@@ -70,7 +71,7 @@ class LoggedInUserChangePassword(BaseView, CookieGeneratorMixin):
     unverified_methods = ['PATCH']
 
     def patch(self, user_data, **kwargs):
-        data = ChangePasswordSchema().load(request.get_json())
+        data = ChangePasswordSchema.pooled().load(request.get_json())
         if data['current_password'] == data['new_password']:
             raise ResponseException(message=password_change_errors[
                 'new_pass_and_change_pass_are_eq'])
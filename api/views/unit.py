@@ -27,5 +27,7 @@ class UnitView(BaseOrgView, BasePaginatedView):
         'sort_fields': {'name', 'symbol'}
     }
     PROTECTED_METHODS = ['GET', 'POST']
+    CACHE_RESPONSES = True
+    ETAG_STRATEGY = 'generation'
 
     ALLOWED_ROLES = {'POST': ['OWNER', 'ENGINEER', 'ADMIN']}
@@ -1,11 +1,16 @@
-# from . import celery_scheduler
-# from celery.schedules import crontab
-#
-# celery_scheduler.conf.beat_schedule = {
-#     # This cronjob is used to test that celery_config is properly set up
-#     # It executes every 60 seconds
-#     'notify-user-of-bookings-about-to-expired-every-12-hours': {
-#         'task': 'add_number',
-#         'schedule':crontab(hour='0,12,18'),
-#     }
-# }
+from celery_config import celery_app
+
+celery_app.conf.beat_schedule = {
+    # Recomputes the hourly and daily rollups of the logs that were added since
+    # the last run
+    'update-log-rollups-every-5-minutes': {
+        'task': 'update-log-rollups',
+        'schedule': 5 * 60,
+    },
+    # Pre-creates the partitions of the upcoming months of the log tables and
+    # detaches the partitions that are older than the retention period
+    'maintain-log-partitions-every-day': {
+        'task': 'maintain-log-partitions',
+        'schedule': 24 * 60 * 60,
+    },
+}
@@ -0,0 +1,40 @@
+"""Add hourly and daily log rollup tables
+
+Revision ID: 5e0b8f3a7c21
+Revises: d4a7c2e91b10
+Create Date: 2020-06-05 16:40:12.093311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0b8f3a7c21'
+down_revision = 'd4a7c2e91b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table_name in ('HourlyLogRollup', 'DailyLogRollup'):
+        op.create_table(table_name,
+        sa.Column('organisation_id', sa.String(length=21), nullable=False),
+        sa.Column('appliance_id', sa.String(length=21), nullable=False),
+        sa.Column('parameter_id', sa.String(length=21), nullable=False),
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('sum', sa.Float(), nullable=False),
+        sa.Column('min', sa.Float(), nullable=False),
+        sa.Column('max', sa.Float(), nullable=False),
+        sa.Column('sum_of_squares', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['appliance_id'], ['Appliance.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['organisation_id'], ['Organisation.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['parameter_id'], ['Parameter.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('appliance_id', 'parameter_id', 'bucket')
+        )
+
+
+def downgrade():
+    op.drop_table('DailyLogRollup')
+    op.drop_table('HourlyLogRollup')
@@ -0,0 +1,27 @@
+"""Add the JSONB value columns of the wide log storage
+
+Revision ID: 8b3d6f1e2a94
+Revises: 5e0b8f3a7c21
+Create Date: 2020-06-09 11:27:38.402915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3d6f1e2a94'
+down_revision = '5e0b8f3a7c21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('Log', sa.Column('numeric_values', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('Log', sa.Column('text_values', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade():
+    op.drop_column('Log', 'text_values')
+    op.drop_column('Log', 'numeric_values')
@@ -0,0 +1,124 @@
+"""Partition the Log and LogValue tables by created_at
+
+Revision ID: 9c4e2a7b5d13
+Revises: 8b3d6f1e2a94
+Create Date: 2020-06-12 09:41:27.118504
+
+"""
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from dateutil.relativedelta import relativedelta
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e2a7b5d13'
+down_revision = '8b3d6f1e2a94'
+branch_labels = None
+depends_on = None
+
+PARTITIONS_AHEAD = 3
+LOG_COLUMNS = ('id', 'created_at', 'updated_at', 'appliance_id',
+               'created_by_id', 'updated_by_id', 'organisation_id',
+               'numeric_values', 'text_values')
+LOG_VALUE_COLUMNS = ('id', 'created_at', 'updated_at', 'text_value',
+                     'numeric_value', 'parameter_id', 'log_id')
+INDEXES = {
+    'Log': [('log_org_appliance_created_at_index', ['organisation_id', 'appliance_id', 'created_at'])],
+    'LogValue': [('log_value_log_id_parameter_id_index', ['log_id', 'parameter_id']),
+                 ('log_value_parameter_id_index', ['parameter_id'])],
+}
+
+
+def create_log_tables(partitioned):
+    table_kwargs = {'postgresql_partition_by': 'RANGE (created_at)'} if partitioned else {}
+    primary_key = ['id', 'created_at'] if partitioned else ['id']
+    op.create_table('Log',
+    sa.Column('id', sa.String(length=21), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=not partitioned),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('appliance_id', sa.String(length=21), nullable=False),
+    sa.Column('created_by_id', sa.String(length=21), nullable=True),
+    sa.Column('updated_by_id', sa.String(length=21), nullable=True),
+    sa.Column('organisation_id', sa.String(length=21), nullable=False),
+    sa.Column('numeric_values', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('text_values', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.ForeignKeyConstraint(['appliance_id'], ['Appliance.id'], ),
+    sa.ForeignKeyConstraint(['created_by_id'], ['User.id'], onupdate='CASCADE', ondelete='RESTRICT'),
+    sa.ForeignKeyConstraint(['organisation_id'], ['Organisation.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['updated_by_id'], ['User.id'], onupdate='CASCADE', ondelete='RESTRICT'),
+    sa.PrimaryKeyConstraint(*primary_key),
+    **table_kwargs
+    )
+    op.create_table('LogValue',
+    sa.Column('id', sa.String(length=21), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=not partitioned),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('text_value', sa.String(), nullable=True),
+    sa.Column('numeric_value', sa.Float(precision=2), nullable=True),
+    sa.Column('parameter_id', sa.String(length=21), nullable=False),
+    sa.Column('log_id', sa.String(length=21), nullable=False),
+    sa.ForeignKeyConstraint(['log_id', 'created_at'] if partitioned else ['log_id'],
+                            ['Log.id', 'Log.created_at'] if partitioned else ['Log.id'],
+                            ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['parameter_id'], ['Parameter.id'], ),
+    sa.PrimaryKeyConstraint(*primary_key),
+    **table_kwargs
+    )
+    for table_name, indexes in INDEXES.items():
+        for index_name, columns in indexes:
+            op.create_index(index_name, table_name, columns, unique=False)
+
+
+def create_monthly_partitions():
+    """Creates the default partitions and the monthly partitions of the existing logs"""
+    now = datetime.now(timezone.utc)
+    first_log_at = op.get_bind().execute(
+        'SELECT min(created_at) FROM "Log_old"').scalar() or now
+    first_log_at = first_log_at.astimezone(timezone.utc)
+    start = datetime(first_log_at.year, first_log_at.month, 1, tzinfo=timezone.utc)
+    last_start = datetime(now.year, now.month, 1, tzinfo=timezone.utc) + relativedelta(months=PARTITIONS_AHEAD)
+    for table_name in ('Log', 'LogValue'):
+        op.execute(f'CREATE TABLE "{table_name}_default" PARTITION OF "{table_name}" DEFAULT')
+    while start <= last_start:
+        end = start + relativedelta(months=1)
+        for table_name in ('Log', 'LogValue'):
+            op.execute(f'''CREATE TABLE "{table_name}_{start:%Y%m%d}" PARTITION OF "{table_name}"
+                FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')''')
+        start = end
+
+
+def replace_log_tables(partitioned):
+    """Replaces the log tables with partitioned or regular tables that have their rows"""
+    for table_name in ('LogValue', 'Log'):
+        for index_name, _ in INDEXES[table_name]:
+            op.drop_index(index_name, table_name=table_name)
+        op.execute(f'ALTER TABLE "{table_name}" RENAME CONSTRAINT "{table_name}_pkey" TO "{table_name}_old_pkey"')
+        op.rename_table(table_name, f'{table_name}_old')
+
+    create_log_tables(partitioned)
+    if partitioned:
+        create_monthly_partitions()
+        log_created_at, value_created_at = 'COALESCE(created_at, updated_at, now())', '"Log".created_at'
+    else:
+        log_created_at, value_created_at = 'created_at', 'value.created_at'
+
+    log_columns = ', '.join(LOG_COLUMNS)
+    op.execute(f'''INSERT INTO "Log" ({log_columns})
+        SELECT {log_columns.replace('created_at', log_created_at, 1)} FROM "Log_old"''')
+    value_columns = ', '.join(LOG_VALUE_COLUMNS)
+    selected_value_columns = ', '.join(f'value.{column}' for column in LOG_VALUE_COLUMNS)
+    op.execute(f'''INSERT INTO "LogValue" ({value_columns})
+        SELECT {selected_value_columns.replace('value.created_at', value_created_at, 1)}
+        FROM "LogValue_old" AS value JOIN "Log" ON "Log".id = value.log_id''')
+    op.drop_table('LogValue_old')
+    op.drop_table('Log_old')
+
+
+def upgrade():
+    replace_log_tables(partitioned=True)
+
+
+def downgrade():
+    replace_log_tables(partitioned=False)
@@ -0,0 +1,28 @@
+"""Add indexes for log time range queries
+
+Revision ID: d4a7c2e91b10
+Revises: c1fcdbef301c
+Create Date: 2020-06-02 10:12:44.517203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7c2e91b10'
+down_revision = 'c1fcdbef301c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('log_org_appliance_created_at_index', 'Log', ['organisation_id', 'appliance_id', 'created_at'], unique=False)
+    op.create_index('log_value_log_id_parameter_id_index', 'LogValue', ['log_id', 'parameter_id'], unique=False)
+    op.create_index('log_value_parameter_id_index', 'LogValue', ['parameter_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('log_value_parameter_id_index', table_name='LogValue')
+    op.drop_index('log_value_log_id_parameter_id_index', table_name='LogValue')
+    op.drop_index('log_org_appliance_created_at_index', table_name='Log')
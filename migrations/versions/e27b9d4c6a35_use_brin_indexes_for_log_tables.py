@@ -0,0 +1,32 @@
+"""Use BRIN indexes on created_at and narrow B-trees for the log tables
+
+Revision ID: e27b9d4c6a35
+Revises: 9c4e2a7b5d13
+Create Date: 2020-06-15 14:08:51.630127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e27b9d4c6a35'
+down_revision = '9c4e2a7b5d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('log_org_appliance_created_at_index', table_name='Log')
+    op.create_index('log_created_at_brin_index', 'Log', ['created_at'], unique=False, postgresql_using='brin', postgresql_with={'autosummarize': 'on'})
+    op.create_index('log_appliance_id_index', 'Log', ['appliance_id'], unique=False)
+    op.create_index('log_organisation_id_index', 'Log', ['organisation_id'], unique=False)
+    op.create_index('log_value_created_at_brin_index', 'LogValue', ['created_at'], unique=False, postgresql_using='brin', postgresql_with={'autosummarize': 'on'})
+
+
+def downgrade():
+    op.drop_index('log_value_created_at_brin_index', table_name='LogValue')
+    op.drop_index('log_organisation_id_index', table_name='Log')
+    op.drop_index('log_appliance_id_index', table_name='Log')
+    op.drop_index('log_created_at_brin_index', table_name='Log')
+    op.create_index('log_org_appliance_created_at_index', 'Log', ['organisation_id', 'appliance_id', 'created_at'], unique=False)
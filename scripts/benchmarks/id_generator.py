@@ -0,0 +1,45 @@
+"""Benchmarks generating IDs in batches against generating them one by one
+
+The script times `--ids` calls of `IDGenerator.generate_id` and one call of
+`IDGenerator.generate_ids` that generates as many IDs.
+
+Usage:
+    python -m scripts.benchmarks.id_generator
+"""
+import argparse
+import statistics
+import time
+
+from api.utils.id_generator import IDGenerator
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ids', type=int, default=20000)
+    parser.add_argument('--runs', type=int, default=5)
+    return parser.parse_args()
+
+
+def time_rate(generate, num_of_ids, runs):
+    """Returns the median number of IDs generated per second"""
+    rates = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        generate()
+        rates.append(num_of_ids / (time.perf_counter() - start))
+    return statistics.median(rates)
+
+
+def main():
+    args = parse_args()
+    scalar_rate = time_rate(
+        lambda: [IDGenerator.generate_id() for _ in range(args.ids)], args.ids,
+        args.runs)
+    batch_rate = time_rate(lambda: IDGenerator.generate_ids(args.ids),
+                           args.ids, args.runs)
+    print(f'generate_id: {scalar_rate:,.0f} IDs/s, '
+          f'generate_ids: {batch_rate:,.0f} IDs/s')
+
+
+if __name__ == '__main__':
+    main()
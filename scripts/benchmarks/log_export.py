@@ -0,0 +1,156 @@
+"""Benchmarks the log export query before and after the time range indexes
+
+The script creates a throwaway `log_benchmark` schema that mirrors the `Log` and
+`LogValue` tables, seeds it with `--log-values` rows and times the export query
+with the old `cast(created_at AS DATE)` filter and the half-open range filter,
+first without and then with the indexes added in `d4a7c2e91b10`.
+
+Usage:
+    BENCHMARK_DATABASE_URL=postgresql://... python scripts/benchmarks/log_export.py
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+import psycopg2
+
+SCHEMA = 'log_benchmark'
+
+CREATE_TABLES = f'''
+    DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+    CREATE SCHEMA {SCHEMA};
+    CREATE TABLE {SCHEMA}."Log" (
+        id VARCHAR(21) PRIMARY KEY,
+        organisation_id VARCHAR(21) NOT NULL,
+        appliance_id VARCHAR(21) NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL
+    );
+    CREATE TABLE {SCHEMA}."LogValue" (
+        id VARCHAR(21) PRIMARY KEY,
+        log_id VARCHAR(21) NOT NULL REFERENCES {SCHEMA}."Log"(id),
+        parameter_id VARCHAR(21) NOT NULL,
+        numeric_value FLOAT,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL
+    );
+'''
+
+SEED_TABLES = f'''
+    INSERT INTO {SCHEMA}."Log"
+        SELECT 'log-' || n,
+            'org-' || (n %% %(orgs)s),
+            'appliance-' || (n %% %(appliances)s),
+            TIMESTAMPTZ '2020-01-01' + (n * INTERVAL '1 second' * %(spread)s)
+        FROM generate_series(1, %(logs)s) AS n;
+    INSERT INTO {SCHEMA}."LogValue"
+        SELECT l.id || '-' || p, l.id, 'param-' || p, random() * 100,
+            l.created_at
+        FROM {SCHEMA}."Log" l, generate_series(1, %(params)s) AS p;
+    ANALYZE {SCHEMA}."Log";
+    ANALYZE {SCHEMA}."LogValue";
+'''
+
+CREATE_INDEXES = f'''
+    CREATE INDEX log_org_appliance_created_at_index
+        ON {SCHEMA}."Log" (organisation_id, appliance_id, created_at);
+    CREATE INDEX log_value_log_id_parameter_id_index
+        ON {SCHEMA}."LogValue" (log_id, parameter_id);
+    CREATE INDEX log_value_parameter_id_index
+        ON {SCHEMA}."LogValue" (parameter_id);
+    ANALYZE {SCHEMA}."Log";
+    ANALYZE {SCHEMA}."LogValue";
+'''
+
+EXPORT_QUERY = f'''
+    SELECT "Log".id, "Log".created_at, {{value_columns}}
+    FROM {SCHEMA}."Log" JOIN {SCHEMA}."LogValue"
+        ON "LogValue".log_id = "Log".id
+    WHERE "Log".organisation_id = %(org_id)s
+        AND "Log".appliance_id = %(appliance_id)s
+        AND {{date_filter}}
+    GROUP BY "Log".id
+    ORDER BY "Log".created_at, "Log".id
+'''
+
+DATE_FILTERS = {
+    'cast':
+    '''CAST("Log".created_at AS DATE) >= %(start_date)s
+        AND CAST("Log".created_at AS DATE) <= %(end_date)s''',
+    'range':
+    '''"Log".created_at >= %(start)s
+        AND "Log".created_at < %(end)s''',
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--log-values', type=int, default=10_000_000)
+    parser.add_argument('--params', type=int, default=10)
+    parser.add_argument('--appliances', type=int, default=50)
+    parser.add_argument('--orgs', type=int, default=5)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--window', type=int, default=7)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--keep', action='store_true')
+    return parser.parse_args()
+
+
+def time_query(cursor, sql, query_args, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        cursor.execute(sql, query_args)
+        rows = cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def run_benchmarks(cursor, args, label):
+    value_columns = ', '.join(f'''max("LogValue".numeric_value) FILTER (
+            WHERE "LogValue".parameter_id = 'param-{p}') AS "param-{p}"'''
+                              for p in range(1, args.params + 1))
+    start_date = date(2020, 1, 1) + timedelta(days=args.days // 2)
+    end_date = start_date + timedelta(days=args.window - 1)
+    query_args = {
+        'org_id': 'org-1',
+        'appliance_id': 'appliance-1',
+        'start_date': start_date,
+        'end_date': end_date,
+        'start': f'{start_date}T00:00:00+00:00',
+        'end': f'{end_date + timedelta(days=1)}T00:00:00+00:00',
+    }
+    for name, date_filter in DATE_FILTERS.items():
+        sql = EXPORT_QUERY.format(value_columns=value_columns,
+                                  date_filter=date_filter)
+        median, rows = time_query(cursor, sql, query_args, args.runs)
+        print(f'{label:<16}{name:<8}{median:>12.2f} ms{rows:>10} rows')
+
+
+def main():
+    args = parse_args()
+    logs = args.log_values // args.params
+    connection = psycopg2.connect(os.environ['BENCHMARK_DATABASE_URL'])
+    connection.autocommit = True
+    cursor = connection.cursor()
+    print(f'Seeding {logs} logs with {args.params} values each...')
+    cursor.execute(CREATE_TABLES)
+    cursor.execute(
+        SEED_TABLES, {
+            'orgs': args.orgs,
+            'appliances': args.appliances,
+            'logs': logs,
+            'params': args.params,
+            'spread': args.days * 24 * 60 * 60 / logs,
+        })
+    print(f'{"":<16}{"filter":<8}{"median":>15}{"":>15}')
+    run_benchmarks(cursor, args, 'no indexes')
+    cursor.execute(CREATE_INDEXES)
+    run_benchmarks(cursor, args, 'with indexes')
+    if not args.keep:
+        cursor.execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""Compares the storage and export latency of the EAV and the wide log storages
+
+The script creates a throwaway `log_storage_benchmark` schema with the `Log` and
+`LogValue` tables of the EAV storage and a `WideLog` table whose values are
+stored in a JSONB column like the wide storage (see `WideLogStorage`). Both are
+seeded with `--log-values` values and indexed like the application tables. The
+size of each storage and the median time of the export query of each storage
+are then printed.
+
+Usage:
+    BENCHMARK_DATABASE_URL=postgresql://... python scripts/benchmarks/log_storage.py
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+import psycopg2
+
+SCHEMA = 'log_storage_benchmark'
+
+CREATE_TABLES = f'''
+    DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+    CREATE SCHEMA {SCHEMA};
+    CREATE TABLE {SCHEMA}."Log" (
+        id VARCHAR(21) PRIMARY KEY,
+        organisation_id VARCHAR(21) NOT NULL,
+        appliance_id VARCHAR(21) NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE
+    );
+    CREATE TABLE {SCHEMA}."LogValue" (
+        id VARCHAR(21) PRIMARY KEY,
+        log_id VARCHAR(21) NOT NULL REFERENCES {SCHEMA}."Log"(id),
+        parameter_id VARCHAR(21) NOT NULL,
+        numeric_value FLOAT,
+        text_value VARCHAR,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE
+    );
+    CREATE TABLE {SCHEMA}."WideLog" (
+        id VARCHAR(21) PRIMARY KEY,
+        organisation_id VARCHAR(21) NOT NULL,
+        appliance_id VARCHAR(21) NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE,
+        numeric_values JSONB,
+        text_values JSONB
+    );
+'''
+
+SEED_TABLES = f'''
+    INSERT INTO {SCHEMA}."Log"
+        SELECT 'log-' || n,
+            'org-' || (n %% %(orgs)s),
+            'appliance-' || (n %% %(appliances)s),
+            TIMESTAMPTZ '2020-01-01' + (n * INTERVAL '1 second' * %(spread)s)
+        FROM generate_series(1, %(logs)s) AS n;
+    INSERT INTO {SCHEMA}."LogValue"
+        SELECT l.id || '-' || p, l.id, 'param-' || p, random() * 100, NULL,
+            l.created_at
+        FROM {SCHEMA}."Log" l, generate_series(1, %(params)s) AS p;
+    INSERT INTO {SCHEMA}."WideLog"
+        SELECT l.id, l.organisation_id, l.appliance_id, l.created_at, NULL,
+            jsonb_object_agg(v.parameter_id, v.numeric_value), '{{}}'::jsonb
+        FROM {SCHEMA}."Log" l JOIN {SCHEMA}."LogValue" v ON v.log_id = l.id
+        GROUP BY l.id;
+'''
+
+CREATE_INDEXES = f'''
+    CREATE INDEX log_org_appliance_created_at_index
+        ON {SCHEMA}."Log" (organisation_id, appliance_id, created_at);
+    CREATE INDEX log_value_log_id_parameter_id_index
+        ON {SCHEMA}."LogValue" (log_id, parameter_id);
+    CREATE INDEX log_value_parameter_id_index
+        ON {SCHEMA}."LogValue" (parameter_id);
+    CREATE INDEX wide_log_org_appliance_created_at_index
+        ON {SCHEMA}."WideLog" (organisation_id, appliance_id, created_at);
+    ANALYZE {SCHEMA}."Log";
+    ANALYZE {SCHEMA}."LogValue";
+    ANALYZE {SCHEMA}."WideLog";
+'''
+
+STORAGE_SIZES = {
+    'eav': f'''SELECT pg_total_relation_size('{SCHEMA}."Log"')
+        + pg_total_relation_size('{SCHEMA}."LogValue"')''',
+    'wide': f'''SELECT pg_total_relation_size('{SCHEMA}."WideLog"')''',
+}
+
+EXPORT_QUERIES = {
+    'eav':
+    f'''
+    SELECT "Log".id, "Log".created_at, {{eav_columns}}
+    FROM {SCHEMA}."Log" JOIN {SCHEMA}."LogValue"
+        ON "LogValue".log_id = "Log".id
+    WHERE "Log".organisation_id = %(org_id)s
+        AND "Log".appliance_id = %(appliance_id)s
+        AND "Log".created_at >= %(start)s AND "Log".created_at < %(end)s
+    GROUP BY "Log".id
+    ORDER BY "Log".created_at, "Log".id
+    ''',
+    'wide':
+    f'''
+    SELECT "WideLog".id, "WideLog".created_at, {{wide_columns}}
+    FROM {SCHEMA}."WideLog"
+    WHERE "WideLog".organisation_id = %(org_id)s
+        AND "WideLog".appliance_id = %(appliance_id)s
+        AND "WideLog".created_at >= %(start)s
+        AND "WideLog".created_at < %(end)s
+    ORDER BY "WideLog".created_at, "WideLog".id
+    ''',
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--log-values', type=int, default=10_000_000)
+    parser.add_argument('--params', type=int, default=10)
+    parser.add_argument('--appliances', type=int, default=50)
+    parser.add_argument('--orgs', type=int, default=5)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--window', type=int, default=7)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--keep', action='store_true')
+    return parser.parse_args()
+
+
+def time_query(cursor, sql, query_args, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        cursor.execute(sql, query_args)
+        rows = cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def run_benchmarks(cursor, args, num_of_values):
+    params = [f'param-{p}' for p in range(1, args.params + 1)]
+    columns = {
+        'eav_columns':
+        ', '.join(f'''max("LogValue".numeric_value) FILTER (
+            WHERE "LogValue".parameter_id = '{param}') AS "{param}"'''
+                  for param in params),
+        'wide_columns':
+        ', '.join(f'''("WideLog".numeric_values ->> '{param}')::float
+            AS "{param}"''' for param in params),
+    }
+    start_date = date(2020, 1, 1) + timedelta(days=args.days // 2)
+    end_date = start_date + timedelta(days=args.window)
+    query_args = {
+        'org_id': 'org-1',
+        'appliance_id': 'appliance-1',
+        'start': f'{start_date}T00:00:00+00:00',
+        'end': f'{end_date}T00:00:00+00:00',
+    }
+    print(f'{"storage":<8}{"size":>12}{"per value":>12}'
+          f'{"export":>15}{"":>15}')
+    for name, export_query in EXPORT_QUERIES.items():
+        cursor.execute(STORAGE_SIZES[name])
+        size = cursor.fetchone()[0]
+        median, rows = time_query(cursor, export_query.format(**columns),
+                                  query_args, args.runs)
+        print(f'{name:<8}{size / 2**20:>9.1f} MB'
+              f'{size / num_of_values:>10.1f} B'
+              f'{median:>12.2f} ms{rows:>10} rows')
+
+
+def main():
+    args = parse_args()
+    logs = args.log_values // args.params
+    connection = psycopg2.connect(os.environ['BENCHMARK_DATABASE_URL'])
+    connection.autocommit = True
+    cursor = connection.cursor()
+    print(f'Seeding {logs} logs with {args.params} values each...')
+    cursor.execute(CREATE_TABLES)
+    cursor.execute(
+        SEED_TABLES, {
+            'orgs': args.orgs,
+            'appliances': args.appliances,
+            'logs': logs,
+            'params': args.params,
+            'spread': args.days * 24 * 60 * 60 / logs,
+        })
+    cursor.execute(CREATE_INDEXES)
+    run_benchmarks(cursor, args, logs * args.params)
+    if not args.keep:
+        cursor.execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
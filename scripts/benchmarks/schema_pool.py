@@ -0,0 +1,48 @@
+"""Benchmarks pooled schemas against creating a schema on every request
+
+The script times `--requests` dumps of an empty page of logs with a new
+`LogSchema` per request and with the `LogSchema` of the `SchemaPool`.
+
+Usage:
+    python -m scripts.benchmarks.schema_pool
+"""
+import argparse
+import statistics
+import time
+
+from api.schemas import LogSchema
+
+EXCLUDE = ['created_by', 'updated_by']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=5)
+    return parser.parse_args()
+
+
+def time_requests(get_schema, num_of_requests, runs):
+    """Returns the median time of a request in microseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(num_of_requests):
+            get_schema().dump([])
+        timings.append((time.perf_counter() - start) * 1e6 / num_of_requests)
+    return statistics.median(timings)
+
+
+def main():
+    args = parse_args()
+    new_time = time_requests(lambda: LogSchema(many=True, exclude=EXCLUDE),
+                             args.requests, args.runs)
+    pooled_time = time_requests(
+        lambda: LogSchema.pooled(many=True, exclude=EXCLUDE), args.requests,
+        args.runs)
+    print(f'new schema: {new_time:,.1f}us/request, '
+          f'pooled schema: {pooled_time:,.1f}us/request')
+
+
+if __name__ == '__main__':
+    main()
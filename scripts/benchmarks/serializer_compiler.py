@@ -0,0 +1,100 @@
+"""Benchmarks the compiled serializers against marshmallow dumps
+
+The script builds pages of `--rows` unsaved logs and parameters and times
+`dump` and `dump_compiled` of their pooled schemas. The compiled dumps are
+checked to be the same as the marshmallow dumps.
+
+Usage:
+    python -m scripts.benchmarks.serializer_compiler
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from api.models import Log, LogValue, Parameter, Unit, User, ValueTypeEnum
+from api.schemas import LogSchema, ParameterSchema
+from api.utils.id_generator import IDGenerator
+from settings import create_app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--runs', type=int, default=5)
+    return parser.parse_args()
+
+
+def generate_user():
+    return User(id=IDGenerator.generate_id(),
+                username='benchmark',
+                first_name='Bench',
+                last_name='Mark',
+                email='benchmark@example.com',
+                password='benchmark-password',
+                created_at=datetime.now())
+
+
+def generate_logs(num_of_rows):
+    user = generate_user()
+    now = datetime.now()
+    return [
+        Log(id=log_id,
+            appliance_id='appliance-id',
+            organisation_id='org-id',
+            created_at=now,
+            updated_at=now,
+            created_by=user,
+            log_values=[
+                LogValue(parameter_id='param-one', numeric_value=index),
+                LogValue(parameter_id='param-two', text_value='text'),
+            ])
+        for index, log_id in enumerate(IDGenerator.generate_ids(num_of_rows))
+    ]
+
+
+def generate_parameters(num_of_rows):
+    user = generate_user()
+    unit = Unit(id='unit-id', name='Kilogram', symbol='kg')
+    now = datetime.now()
+    return [
+        Parameter(id=param_id,
+                  name=f'Parameter {index}',
+                  value_type=ValueTypeEnum.NUMERIC,
+                  organisation_id='org-id',
+                  created_at=now,
+                  updated_at=now,
+                  unit=unit,
+                  created_by=user)
+        for index, param_id in enumerate(IDGenerator.generate_ids(num_of_rows))
+    ]
+
+
+def time_dump(dump, objs, runs):
+    """Returns the median time of a dump in milliseconds and its result"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = dump(objs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    args = parse_args()
+    with create_app().app_context():
+        for schema_class, objs in ((LogSchema, generate_logs(args.rows)),
+                                   (ParameterSchema,
+                                    generate_parameters(args.rows))):
+            schema = schema_class.pooled(many=True)
+            schema.dump_compiled(objs[:1])
+            dump_time, expected = time_dump(schema.dump, objs, args.runs)
+            compiled_time, compiled = time_dump(schema.dump_compiled, objs,
+                                                args.runs)
+            assert compiled == expected
+            print(f'{schema_class.__name__}: dump {dump_time:.1f}ms, '
+                  f'compiled {compiled_time:.1f}ms per {args.rows} rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Benchmarks the compiled parameter validations against parsing them per reading
+
+The script validates `--readings` NUMERIC readings against `--validation` by
+parsing the validation for every reading and with one compiled
+`ValueValidator`, and checks that both accept the same readings.
+
+Usage:
+    python -m scripts.benchmarks.value_validator
+"""
+import argparse
+import statistics
+import time
+
+from api.models import Parameter, ValueTypeEnum
+from api.services.value_validator import ValueValidator
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readings', type=int, default=1000)
+    parser.add_argument('--validation', default='gte 0,lt 500')
+    parser.add_argument('--runs', type=int, default=5)
+    return parser.parse_args()
+
+
+def validate_parsed(validation, values):
+    valid = []
+    for value in values:
+        bounds = Parameter.parse_validation(ValueTypeEnum.NUMERIC, validation)
+        valid.append(bounds['gte'] <= float(value) < bounds['lt'])
+    return valid
+
+
+def validate_compiled(validation, values):
+    validator = ValueValidator(
+        ValueTypeEnum.NUMERIC,
+        Parameter.parse_validation(ValueTypeEnum.NUMERIC, validation))
+    return [error is None for error in validator.validate(values)]
+
+
+def time_validation(validate, validation, values, runs):
+    """Returns the median time of a validation in milliseconds and its result"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = validate(validation, values)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    args = parse_args()
+    values = [str(index % 600) for index in range(args.readings)]
+    parse_time, expected = time_validation(validate_parsed, args.validation,
+                                           values, args.runs)
+    compiled_time, valid = time_validation(validate_compiled, args.validation,
+                                           values, args.runs)
+    assert valid == expected
+    print(f'parsed {parse_time:.2f}ms, compiled {compiled_time:.2f}ms '
+          f'per {args.readings} readings')
+
+
+if __name__ == '__main__':
+    main()
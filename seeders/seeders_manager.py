@@ -36,7 +36,7 @@ class SeederManager:
                 lambda obj: obj not in model_objs, data_from_seed_file)
         ]
 
-        cls.MAPPER[key].__model__.bulk_create(seed_data_not_in_db)
+        cls.MAPPER[key].__model__.bulk_copy(seed_data_not_in_db)
 
     @classmethod
     def run(cls, key=None):
@@ -5,6 +5,7 @@ from flask import Blueprint
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import inspect
 from .configs import ENV_MAPPER
 from .service_config import add_id_event_to_models, create_cli_commands
@@ -34,6 +35,10 @@ def create_app(current_env=os.getenv('FLASK_ENV', 'production')):
 
     CORS(app, origins=origins, supports_credentials=True)
     app.config.from_object(ENV_MAPPER[current_env])
+    if app.config['NUM_OF_PROXIES']:
+        # makes request.remote_addr the address of the client instead of the proxy
+        app.wsgi_app = ProxyFix(app.wsgi_app,
+                                x_for=app.config['NUM_OF_PROXIES'])
     api = Api(app)
     db.init_app(app)
     migrate = Migrate(app, db)
@@ -13,17 +13,21 @@ class BaseConfig:
     CELERY_BROKER_URL = os.getenv('REDIS_SERVER_URL')
     CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND',
                                       default='redis://localhost:6379/0')
+    # the number of proxies in front of the app, e.g. the Heroku router
+    NUM_OF_PROXIES = int(os.getenv('NUM_OF_PROXIES', 0))
 
 
 class ProductionConfig(BaseConfig):
     TESTING = False
     FLASK_ENV = 'production'
     PROPAGATE_EXCEPTIONS = True
+    NUM_OF_PROXIES = int(os.getenv('NUM_OF_PROXIES', 1))
 
 
 class StagingConfig(BaseConfig):
     TESTING = False
     PROPAGATE_EXCEPTIONS = True
+    NUM_OF_PROXIES = int(os.getenv('NUM_OF_PROXIES', 1))
 
 
 class TestingConfig(BaseConfig):
@@ -5,6 +5,7 @@ from sentry_sdk.integrations.celery import CeleryIntegration
 
 import os
 import click
+from datetime import timezone
 from sqlalchemy import event
 import cloudinary
 from api.utils.time_util import TimeUtil
@@ -53,6 +54,52 @@ def create_cli_commands(app):
         from seeders.seeders_manager import SeederManager
         SeederManager.run(key)
 
+    @app.cli.command('rebuild-log-rollups')
+    @click.argument('start_date', type=click.DateTime(formats=['%Y-%m-%d']))
+    @click.argument('end_date', type=click.DateTime(formats=['%Y-%m-%d']))
+    def rebuild_log_rollups(start_date, end_date):
+        """Rebuilds the hourly and daily log rollups from START_DATE to END_DATE"""
+        from api.models import LogRollup
+        LogRollup.rebuild(start_date.date(), end_date.date())
+
+    @app.cli.command('backfill-wide-log-values')
+    @click.option('--batch-size', type=int, default=1000)
+    def backfill_wide_log_values(batch_size):
+        """Copies the LogValue rows of logs into the columns of the wide storage"""
+        from api.models import WideLogStorage
+        num_of_logs = WideLogStorage.backfill(batch_size)
+        click.echo(f'Backfilled {num_of_logs} logs')
+
+    @app.cli.command('maintain-log-partitions')
+    def maintain_log_partitions():
+        """Pre-creates the upcoming log partitions and detaches the expired ones"""
+        from api.models import LogPartition
+        partitions = LogPartition.maintain()
+        click.echo(f'Created: {", ".join(partitions["created"]) or "none"}')
+        click.echo(f'Detached: {", ".join(partitions["detached"]) or "none"}')
+
+    @app.cli.command('cluster-log-partitions')
+    @click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']))
+    def cluster_log_partitions(since):
+        """Rewrites the historical log partitions in appliance and time order
+
+        Only the partitions that start on or after --since are clustered. It
+        defaults to the previous partition.
+        """
+        from api.models import LogPartition
+        if since:
+            since = since.replace(tzinfo=timezone.utc)
+        partitions = LogPartition.cluster_historical(since)
+        click.echo(f'Clustered: {", ".join(partitions) or "none"}')
+
+    @app.cli.command('index-session-keys')
+    def index_session_keys():
+        """Indexes the login sessions that were stored before session indexes"""
+        from api.services.redis_util import RedisUtil
+        from api.utils.constants import REDIS_TOKEN_HASH_KEY
+        num_of_keys = RedisUtil.index_flat_hash_keys(REDIS_TOKEN_HASH_KEY)
+        click.echo(f'Indexed {num_of_keys} session keys')
+
 
 flask_env = os.getenv('FLASK_ENV')
 if flask_env in ['production', 'staging']:
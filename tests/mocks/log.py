@@ -47,7 +47,8 @@ class LogGenerator(BaseGenerator):
             value_kwargs = {value_key: value}
             log_values.append(
                 LogValue(log_id=log_model.id,
+                         created_at=log_model.created_at,
                          parameter_id=param.id,
                          **value_kwargs))
-        log_values = LogValue.bulk_create(log_values, commit=save)
+        log_values = LogValue.bulk_copy(log_values, commit=save)
         return log_model, log_values
@@ -1,18 +1,99 @@
 import re
 
 
+class PubSubMock:
+    def __init__(self, **kwargs):
+        self.handlers = {}
+
+    def subscribe(self, **handlers):
+        self.handlers.update(handlers)
+
+    def run_in_thread(self, sleep_time=0, daemon=False):
+        pass
+
+
+class PipelineMock:
+    def __init__(self, redis_mock):
+        self.redis_mock = redis_mock
+        self.commands = []
+
+    def __getattr__(self, command):
+        def queue_command(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+
+        return queue_command
+
+    def execute(self):
+        results = [
+            getattr(self.redis_mock, command)(*args, **kwargs)
+            for command, args, kwargs in self.commands
+        ]
+        self.commands = []
+        return results
+
+    def reset(self):
+        self.commands = []
+
+
 class RedisMock:
     cache = {}
     expired_cache = {}
 
     @classmethod
-    def set(cls, key, value):
+    def set(cls, key, value, ex=None):
         cls.cache[key] = value
+        if ex:
+            cls.expired_cache[key] = ex
+        return True
+
+    @classmethod
+    def mget(cls, keys):
+        return [cls.cache.get(key) for key in keys]
+
+    @classmethod
+    def pipeline(cls, transaction=True):
+        return PipelineMock(cls)
+
+    @classmethod
+    def delete(cls, *keys):
+        for key in keys:
+            cls.cache.pop(key, None)
+            cls.expired_cache.pop(key, None)
+
+    @classmethod
+    def exists(cls, key):
+        return int(key in cls.cache)
+
+    @classmethod
+    def ttl(cls, key):
+        if key not in cls.cache:
+            return -2
+        return cls.expired_cache.get(key, -1)
 
     @classmethod
-    def delete(cls, key):
-        if key in cls.cache:
-            del cls.cache[key]
+    def persist(cls, key):
+        cls.expired_cache.pop(key, None)
+
+    @classmethod
+    def sadd(cls, key, *members):
+        cls.cache.setdefault(key, set()).update(members)
+
+    @classmethod
+    def srem(cls, key, *members):
+        cls.cache.get(key, set()).difference_update(members)
+
+    @classmethod
+    def smembers(cls, key):
+        return set(cls.cache.get(key, set()))
+
+    @classmethod
+    def scard(cls, key):
+        return len(cls.cache.get(key, set()))
+
+    @classmethod
+    def scan_iter(cls, match='*', count=None):
+        return iter(cls.keys(match.replace('*', '.*') + '$'))
 
     @classmethod
     def keys(cls, regex):
@@ -27,10 +108,37 @@ class RedisMock:
     def get(cls, key):
         return cls.cache.get(key)
 
+    @classmethod
+    def incr(cls, key):
+        return cls.incrby(key, 1)
+
+    @classmethod
+    def incrby(cls, key, amount):
+        cls.cache[key] = int(cls.cache.get(key, 0)) + amount
+        return cls.cache[key]
+
+    @classmethod
+    def eval(cls, script, numkeys, *keys_and_args):
+        from api.services.redis_util import RedisUtil
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script == RedisUtil.INCREMENT_EXISTING_KEY_SCRIPT:
+            if cls.exists(keys[0]):
+                return cls.incrby(keys[0], int(args[0]))
+            return None
+        raise NotImplementedError(f'Unknown script {script}')
+
     @classmethod
     def expire(cls, key, exp_time):
         cls.expired_cache[key] = exp_time
 
+    @classmethod
+    def publish(cls, channel, message):
+        return 0
+
+    @classmethod
+    def pubsub(cls, **kwargs):
+        return PubSubMock(**kwargs)
+
     @classmethod
     def flush_all(cls):
         cls.cache = {}
@@ -1,14 +1,15 @@
 import json
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 import pandas as pd
 from tests.assertions import (add_cookie_to_client,
                               assert_user_not_in_organisation,
                               assert_user_does_not_have_permission,
                               assert_paginator_data_values,
                               assert_unverified_user)
-from api.models import Log, LogValue, db, Parameter, Unit
-from api.utils.success_messages import (SAVED, RETRIEVED)
+from api.models import Log, LogValue, LogRollup, db, Parameter, Unit
+from api.utils.success_messages import (SAVED, RETRIEVED, LOG_BATCH_MSG_DICT)
 from api.utils.error_messages import serialization_error
+from api.services.redis_util import RedisUtil
 
 from tests.mocks.user import UserGenerator
 from tests.mocks.paramter import ParameterGenerator
@@ -16,6 +17,7 @@ from io import StringIO
 
 URL = '/api/org/{}/logs'
 EXPORT_LOGS = '/api/org/{}/appliances/{}/export-logs'
+BATCH_URL = '/api/org/{}/logs/batch'
 
 
 def run_test_precondition(client, user_obj):
@@ -179,6 +181,179 @@ class TestAddLogToApplianceEndpoint:
         assert response_body['status'] == 'error'
 
 
+class TestBatchLogsEndpoint:
+    @staticmethod
+    def generate_entry(appliance, params, timestamp=None):
+        entry = {
+            'applianceId': appliance.id,
+            'logData':
+            {param.id: index * 10
+             for index, param in enumerate(params)},
+        }
+        if timestamp:
+            entry['timestamp'] = timestamp
+        return entry
+
+    def test_engineers_should_be_able_to_add_logs_of_many_appliances_at_once(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, params_one, _, appliance_one = saved_appliance_generator(
+            'ENGINEER', 3)
+        _, _, params_two, text_params, appliance_two = saved_appliance_generator(
+            num_of_numeric_units=2, num_of_text_units=1, org=org)
+        client = run_test_precondition(client, user_obj)
+        json_data = [
+            self.generate_entry(appliance_one, params_one,
+                                '2020-01-01T10:00:00+01:00'),
+            self.generate_entry(appliance_one, params_one),
+            self.generate_entry(appliance_two, params_two + text_params),
+        ]
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps(json_data),
+                               content_type="application/json")
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 201
+        assert response_body['status'] == 'success'
+        assert response_body['message'] == LOG_BATCH_MSG_DICT['success']
+        assert response_body['data']['failed'] == []
+        saved_logs = response_body['data']['success']
+        assert len(saved_logs) == 3
+        assert [log['logValues'] for log in saved_logs
+                ] == [entry['logData'] for entry in json_data]
+        assert Log.query.filter_by(organisation_id=org.id).count() == 3
+        assert LogValue.query.join(Log).filter(
+            Log.organisation_id == org.id).count() == 9
+        first_log = Log.query.get(saved_logs[0]['id'])
+        assert first_log.created_at == datetime(2020,
+                                                1,
+                                                1,
+                                                9,
+                                                tzinfo=timezone.utc)
+
+    def test_should_return_the_numeric_values_as_numbers(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, params, _, appliance = saved_appliance_generator(
+            'ENGINEER', 2)
+        client = run_test_precondition(client, user_obj)
+        json_data = [{
+            'applianceId': appliance.id,
+            'logData': {
+                params[0].id: '12',
+                params[1].id: 7
+            },
+        }]
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps(json_data),
+                               content_type="application/json")
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 201
+        assert response_body['data']['success'][0]['logValues'] == {
+            params[0].id: 12.0,
+            params[1].id: 7.0
+        }
+
+    def test_should_save_the_valid_entries_and_report_the_invalid_ones(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, params, _, appliance = saved_appliance_generator(
+            'ENGINEER', 2)
+        client = run_test_precondition(client, user_obj)
+        invalid_value_entry = self.generate_entry(appliance, params)
+        invalid_value_entry['logData'][params[0].id] = 'not a number'
+        missing_appliance_entry = self.generate_entry(appliance, params)
+        missing_appliance_entry['applianceId'] = 'missing-id'
+        json_data = [
+            self.generate_entry(appliance, params),
+            invalid_value_entry,
+            missing_appliance_entry,
+            {
+                'applianceId': appliance.id
+            },
+        ]
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps(json_data),
+                               content_type="application/json")
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 207
+        assert response_body['status'] == 'partial'
+        assert len(response_body['data']['success']) == 1
+        assert response_body['data']['failed'] == [
+            {
+                'index': 1,
+                'errors': {
+                    'logData': {
+                        params[0].id: serialization_error['number_only']
+                    }
+                }
+            },
+            {
+                'index': 2,
+                'errors': {
+                    'applianceId':
+                    [serialization_error['not_found'].format('Appliance')]
+                }
+            },
+            {
+                'index': 3,
+                'errors': {
+                    'logData': [serialization_error['required']]
+                }
+            },
+        ]
+        assert Log.query.filter_by(appliance_id=appliance.id).count() == 1
+        assert LogValue.query.join(Log).filter(
+            Log.appliance_id == appliance.id).count() == 2
+
+    def test_should_return_400_when_every_entry_is_invalid(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, params, _, appliance = saved_appliance_generator(
+            'ENGINEER', 2)
+        client = run_test_precondition(client, user_obj)
+        entry = self.generate_entry(appliance, params[:1])
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps([entry]),
+                               content_type="application/json")
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 400
+        assert response_body['status'] == 'error'
+        assert response_body['message'] == LOG_BATCH_MSG_DICT['error']
+        assert Log.query.filter_by(appliance_id=appliance.id).count() == 0
+
+    def test_should_fail_when_the_request_body_is_not_a_list_or_is_too_large(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, params, _, appliance = saved_appliance_generator(
+            'ENGINEER', 2)
+        client = run_test_precondition(client, user_obj)
+        entry = self.generate_entry(appliance, params)
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps(entry),
+                               content_type="application/json")
+        assert response.status_code == 400
+        assert json.loads(
+            response.data)['message'] == serialization_error['list_only']
+
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps([entry] * 1001),
+                               content_type="application/json")
+        assert response.status_code == 400
+        assert json.loads(
+            response.data
+        )['message'] == serialization_error['max_items_error'].format(1000)
+
+    def test_regular_users_should_not_be_able_to_add_logs_in_batches(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, params, _, appliance = saved_appliance_generator(
+            user_role='REGULAR USERS', num_of_numeric_units=2)
+        client = run_test_precondition(client, user_obj)
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps(
+                                   [self.generate_entry(appliance, params)]),
+                               content_type="application/json")
+        assert_user_does_not_have_permission(response)
+
+
 class TestExportLogsToCSVFile:
     def test_should_return_a_404_error_when_the_log_is_not_found(
             self, init_db, client, saved_appliance_generator):
@@ -227,7 +402,7 @@ class TestExportLogsToCSVFile:
         df = pd.read_csv(string_io)
         for param_name, param_args in param_values_by_name.items():
             param_value, param_symbol = param_args
-            assert (df[param_name] == f'{param_value} {param_symbol}').all()
+            assert (df[f'{param_name} ({param_symbol})'] == param_value).all()
 
     def test_should_export_data_within_the_specified_dates(
             self, init_db, client, saved_appliance_generator,
@@ -270,7 +445,7 @@ class TestExportLogsToCSVFile:
         assert response.status_code == 200
         for param_name, param_args in param_values_by_name.items():
             param_value, param_symbol = param_args
-            assert (df[param_name] == f'{param_value} {param_symbol}').all()
+            assert (df[f'{param_name} ({param_symbol})'] == param_value).all()
         assert len(df) == 2
 
     def test_should_return_error_when_start_date_is_more_than_end_date(
@@ -306,6 +481,146 @@ class TestExportLogsToCSVFile:
         )['message'] == serialization_error['f1_must_be_gte_f2'].format(
             'End date', 'Start Date')
 
+    def test_should_stream_the_csv_file_one_log_per_row_when_mode_is_stream(
+            self, init_db, client, saved_appliance_generator,
+            saved_logs_generator):
+        org, user_obj, numeric_params, _, appliance_model = saved_appliance_generator(
+            'ENGINEER', num_of_numeric_units=4)
+        value_mapper = {}
+        param_values_by_name = {}
+        for index, param in enumerate(numeric_params):
+            param = Parameter.query.get(param.id)
+            param.name = f'Parameter {index}'
+            value_mapper[param.id] = index * 90
+            param_values_by_name[param.name] = [index * 90, param.unit.symbol]
+
+        db.session.commit()
+        log_datetimes = [
+            datetime(2019, 9, 1, 10),
+            datetime(2019, 5, 1),
+            datetime(2019, 9, 1, 8),
+            datetime(2020, 1, 1)
+        ]
+        saved_logs_generator(appliance_model,
+                             numeric_params,
+                             4,
+                             value_mapper=value_mapper,
+                             log_datetimes=log_datetimes)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = EXPORT_LOGS.format(org.id, appliance_model.id)
+        url = f'{url}?start_date=2019-09-01&end_date=2020-01-01&mode=stream'
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.headers['Content-Type'].startswith('text/csv')
+        string_io = StringIO(response.data.decode('utf-8'))
+        df = pd.read_csv(string_io)
+        assert len(df) == 3
+        assert list(df.columns) == ['Date Created'] + [
+            f'{name} ({param_values_by_name[name][1]})'
+            for name in sorted(param_values_by_name)
+        ]
+        assert df['Date Created'].is_monotonic_increasing
+        for param_name, param_args in param_values_by_name.items():
+            param_value, param_symbol = param_args
+            assert (df[f'{param_name} ({param_symbol})'] == param_value).all()
+
+    def test_should_include_logs_created_at_any_time_on_the_start_and_end_dates(
+            self, init_db, client, saved_appliance_generator,
+            saved_logs_generator):
+        org, user_obj, numeric_params, _, appliance_model = saved_appliance_generator(
+            'ENGINEER', num_of_numeric_units=2)
+        log_datetimes = [
+            datetime(2019, 8, 31, 23, 59, 59, tzinfo=timezone.utc),
+            datetime(2019, 9, 1, tzinfo=timezone.utc),
+            datetime(2020, 1, 1, 23, 59, 59, tzinfo=timezone.utc),
+            datetime(2020, 1, 2, tzinfo=timezone.utc),
+        ]
+        saved_logs_generator(appliance_model,
+                             numeric_params,
+                             4,
+                             log_datetimes=log_datetimes)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = EXPORT_LOGS.format(org.id, appliance_model.id)
+        url = f'{url}?start_date=2019-09-01&end_date=2020-01-01'
+        response = client.get(url)
+
+        assert response.status_code == 200
+        df = pd.read_csv(StringIO(response.data.decode('utf-8')))
+        assert list(pd.to_datetime(df['Date Created'], utc=True)) == [
+            pd.Timestamp(log_datetimes[1]),
+            pd.Timestamp(log_datetimes[2]),
+        ]
+
+    def test_should_export_the_hourly_rollups_when_mode_is_aggregated(
+            self, init_db, client, saved_appliance_generator,
+            saved_logs_generator):
+        org, user_obj, numeric_params, text_params, appliance_model = saved_appliance_generator(
+            'ENGINEER', num_of_numeric_units=1, num_of_text_units=1)
+        param = Parameter.query.get(numeric_params[0].id)
+        log_datetimes = [
+            datetime(2019, 9, 1, 10, 5, tzinfo=timezone.utc),
+            datetime(2019, 9, 1, 10, 30, tzinfo=timezone.utc),
+            datetime(2019, 9, 1, 12, tzinfo=timezone.utc),
+        ]
+        saved_logs_generator(appliance_model,
+                             numeric_params + text_params,
+                             3,
+                             value_mapper=[{
+                                 param.id: value
+                             } for value in [2, 4, 9]],
+                             log_datetimes=log_datetimes)
+        LogRollup.rebuild(date(2019, 9, 1), date(2019, 9, 1))
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = EXPORT_LOGS.format(org.id, appliance_model.id)
+        url = f'{url}?start_date=2019-09-01&end_date=2019-09-01&mode=aggregated&granularity=hour'
+        response = client.get(url)
+
+        assert response.status_code == 200
+        df = pd.read_csv(StringIO(response.data.decode('utf-8')))
+        header = f'{param.name} ({param.unit.symbol})'
+        assert list(df.columns) == [
+            'Period Start', f'{header} Average', f'{header} Min',
+            f'{header} Max'
+        ]
+        assert df[f'{header} Average'].tolist() == [3, 9]
+        assert df[f'{header} Min'].tolist() == [2, 9]
+        assert df[f'{header} Max'].tolist() == [4, 9]
+
+    def test_should_fail_when_the_granularity_is_invalid_in_aggregated_mode(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, _, _, appliance_model = saved_appliance_generator(
+            'ENGINEER', 1)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = EXPORT_LOGS.format(org.id, appliance_model.id)
+        url = f'{url}?start_date=2019-09-01&end_date=2019-09-01&mode=aggregated&granularity=week'
+        response = client.get(url)
+
+        assert response.status_code == 400
+        assert json.loads(
+            response.data
+        )['message'] == serialization_error['invalid_option'].format(
+            'granularity', 'hour, day')
+
+    def test_should_return_a_404_error_in_stream_mode_when_no_log_is_found(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, _, _, appliance_model = saved_appliance_generator(
+            'ENGINEER', 3, 3)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = EXPORT_LOGS.format(org.id, appliance_model.id)
+        url = f'{url}?start_date=2019-09-01&end_date=2020-01-01&mode=stream'
+        response = client.get(url)
+        response_body = json.loads(response.data)
+        assert response.status_code == 404
+        assert response_body['message'] == serialization_error[
+            'not_found'].format('Logs with specified filters')
+
 
 class TestRetrieveLogsEndpoint:
     def test_permitted_user_should_be_able_to_retrieve_logs(
@@ -360,6 +675,38 @@ class TestRetrieveLogsEndpoint:
                 else:
                     assert text_or_number == log_value.numeric_value
 
+    def test_should_return_the_pivoted_log_values_when_appliance_id_search_is_specified(
+            self, init_db, client, saved_appliance_generator,
+            saved_logs_generator):
+        org, user_obj, numeric_params, text_params, appliance_model = saved_appliance_generator(
+            'ENGINEER', 2, 2)
+        params = numeric_params + text_params
+        value_mapper = {
+            numeric_param.id: index * 90 + 1
+            for index, numeric_param in enumerate(numeric_params)
+        }
+        for text_param in text_params:
+            value_mapper[text_param.id] = f'Text log for {text_param.id}'
+        created_logs = saved_logs_generator(appliance_model,
+                                            params,
+                                            3,
+                                            value_mapper=value_mapper)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = URL.format(org.id)
+        url = f'{url}?appliance_id_search={appliance_model.id}'
+
+        response = client.get(url)
+        response_body = json.loads(response.data)
+        assert response.status_code == 200
+        assert response_body['meta']['totalObjects'] == len(created_logs)
+        assert {log['id']
+                for log in response_body['data']
+                } == {log.id
+                      for log in created_logs}
+        for retrieved_log in response_body['data']:
+            assert retrieved_log['logValues'] == value_mapper
+
     def test_should_search_only_by_retrieved_appliacne_id_when_the_appliance_id_search_is_specified(
             self, init_db, client, saved_appliance_generator,
             saved_logs_generator):
@@ -455,6 +802,107 @@ class TestRetrieveLogsEndpoint:
             Log, (Log.id == LogValue.log_id) & (Log.organisation_id == org.id)
         ).count() == 2 * TOTAL_LOGS_FOR_EACH_APPLIANCE * len(params)
 
+    def test_should_update_the_cached_org_count_when_logs_are_added_or_deleted(
+            self, init_db, client, saved_appliance_generator,
+            saved_logs_generator):
+        org, user_obj, numeric_params, text_params, appliance_model = saved_appliance_generator(
+            'ENGINEER', 1, 1)
+        params = numeric_params + text_params
+        saved_logs_generator(appliance_model, params, 3)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = f'{URL.format(org.id)}?page_limit=2'
+        count_key = Log.org_count_key(org.id)
+
+        response_body = json.loads(client.get(url).data)
+        assert response_body['meta']['totalObjects'] == 3
+        assert response_body['meta']['isCountExact'] is True
+        assert int(RedisUtil.get_key(count_key)) == 3
+
+        new_logs = saved_logs_generator(appliance_model, params, 2)
+        assert int(RedisUtil.get_key(count_key)) == 5
+        for log_value in new_logs[0].log_values:
+            db.session.delete(log_value)
+        new_logs[0].delete()
+        assert int(RedisUtil.get_key(count_key)) == 4
+
+        response_body = json.loads(client.get(url).data)
+        assert response_body['meta']['totalObjects'] == 4
+        assert response_body['meta']['totalPages'] == 2
+
+    def test_should_return_the_planner_estimate_for_large_filtered_counts(
+            self, init_db, client, saved_appliance_generator,
+            saved_logs_generator, monkeypatch):
+        from api.views.logs import LogsView
+        monkeypatch.setattr(LogsView, 'ESTIMATED_COUNT_THRESHOLD', 0)
+        org, user_obj, numeric_params, text_params, appliance_model = saved_appliance_generator(
+            'ENGINEER', 1, 1)
+        saved_logs_generator(appliance_model, numeric_params + text_params, 3)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = URL.format(org.id)
+        url = f'{url}?appliance_id_search={appliance_model.id}&page_limit=1'
+
+        response = client.get(url)
+        response_body = json.loads(response.data)
+        assert response.status_code == 200
+        assert response_body['meta']['isCountExact'] is False
+        assert isinstance(response_body['meta']['totalObjects'], int)
+        assert len(response_body['data']) == 1
+
+    def test_should_retrieve_every_log_once_when_paginating_with_cursors(
+            self, init_db, client, saved_appliance_generator,
+            saved_logs_generator):
+        org, user_obj, numeric_params, text_params, appliance_model = saved_appliance_generator(
+            'ENGINEER', 2, 1)
+        log_datetimes = [
+            datetime(2020, 1, 1, 10, tzinfo=timezone.utc),
+            datetime(2020, 1, 1, 9, tzinfo=timezone.utc),
+            datetime(2020, 1, 1, 9, tzinfo=timezone.utc),
+            datetime(2020, 1, 1, 8, tzinfo=timezone.utc),
+            datetime(2020, 1, 1, 7, tzinfo=timezone.utc),
+        ]
+        created_logs = saved_logs_generator(appliance_model,
+                                            numeric_params + text_params,
+                                            5,
+                                            log_datetimes=log_datetimes)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = URL.format(org.id)
+        url = f'{url}?appliance_id_search={appliance_model.id}&page_limit=2'
+
+        retrieved_logs = []
+        cursor = ''
+        for _ in range(3):
+            response = client.get(f'{url}&cursor={cursor}')
+            response_body = json.loads(response.data)
+            assert response.status_code == 200
+            assert 'totalObjects' not in response_body['meta']
+            assert response_body['meta']['maxObjectsPerPage'] == 2
+            retrieved_logs.extend(response_body['data'])
+            cursor = response_body['meta']['nextCursor']
+
+        assert cursor is None
+        assert sorted(log['id'] for log in retrieved_logs) == sorted(
+            log.id for log in created_logs)
+        retrieved_dates = [
+            datetime.fromisoformat(log['createdAt']) for log in retrieved_logs
+        ]
+        assert retrieved_dates == sorted(retrieved_dates, reverse=True)
+
+    def test_should_fail_when_the_cursor_is_invalid(self, init_db, client,
+                                                    saved_appliance_generator):
+        org, user_obj, _, _, _ = saved_appliance_generator('ENGINEER', 1)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        url = URL.format(org.id)
+        response = client.get(f'{url}?cursor=not-a-cursor')
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 400
+        assert response_body['message'] == serialization_error[
+            'invalid_cursor']
+
     def test_should_fail_when_user_is_not_verified(self, init_db, client,
                                                    saved_appliance_generator):
         org, _, numeric_params, text_params, appliance_model = saved_appliance_generator(
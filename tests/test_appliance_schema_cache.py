@@ -0,0 +1,101 @@
+import json
+from unittest.mock import patch
+from sqlalchemy import event
+from api.models import db, Parameter, ValueTypeEnum
+from api.services.appliance_schema_cache import ApplianceSchemaCache
+from .assertions import add_cookie_to_client
+
+URL = '/api/org/{}/logs'
+
+
+class TestApplianceSchemaCache:
+    def setup_method(self):
+        ApplianceSchemaCache.CACHE.clear()
+
+    def test_should_cache_the_parameters_in_the_worker_and_in_redis(
+            self, init_db, saved_appliance_generator):
+        org, _, numeric_params, text_params, appliance = saved_appliance_generator(
+            num_of_numeric_units=2, num_of_text_units=1)
+
+        with patch.object(ApplianceSchemaCache,
+                          '_query_parameters',
+                          side_effect=ApplianceSchemaCache._query_parameters
+                          ) as mock_query:
+            params = ApplianceSchemaCache.get(org.id, appliance.id)
+            ApplianceSchemaCache.get(org.id, appliance.id)
+            ApplianceSchemaCache.CACHE.clear()
+            cached_params = ApplianceSchemaCache.get(org.id, appliance.id)
+            assert mock_query.call_count == 1
+
+        assert [param.to_dict() for param in cached_params
+                ] == [param.to_dict() for param in params]
+        assert {param.id: param.value_type
+                for param in params} == {
+                    param.id: param.value_type
+                    for param in numeric_params + text_params
+                }
+        assert ApplianceSchemaCache.get(org.id, 'missing-id') == []
+
+    def test_changes_to_the_parameters_should_invalidate_the_cache(
+            self, init_db, saved_appliance_generator):
+        org, _, numeric_params, _, appliance = saved_appliance_generator(
+            num_of_numeric_units=1)
+        param, = ApplianceSchemaCache.get(org.id, appliance.id)
+        assert param.rules == {}
+
+        saved_param = Parameter.query.get(numeric_params[0].id)
+        saved_param.validation = 'gte 0,lt 500'
+        saved_param.update()
+        param, = ApplianceSchemaCache.get(org.id, appliance.id)
+        assert param.rules == {'gte': 0.0, 'lt': 500.0}
+
+    def test_logs_should_be_validated_without_reading_the_parameters(
+            self, init_db, client, saved_appliance_generator):
+        org, user, numeric_params, _, appliance = saved_appliance_generator(
+            num_of_numeric_units=3)
+        add_cookie_to_client(client, user)
+        json_data = json.dumps({
+            'applianceId': appliance.id,
+            'logData': {param.id: 10
+                        for param in numeric_params},
+        })
+        ApplianceSchemaCache.get(org.id, appliance.id)
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record_statement)
+        try:
+            response = client.post(URL.format(org.id),
+                                   data=json_data,
+                                   content_type='application/json')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record_statement)
+
+        assert response.status_code == 201
+        assert not [
+            statement
+            for statement in statements if '"ApplianceParameter"' in statement
+        ]
+
+
+class TestParseValidation:
+    def test_should_parse_numeric_bounds_into_floats(self):
+        assert Parameter.parse_validation(ValueTypeEnum.NUMERIC,
+                                          'gte 0,lt 500') == {
+                                              'gte': 0.0,
+                                              'lt': 500.0
+                                          }
+
+    def test_should_parse_the_options_of_enum_parameters(self):
+        assert Parameter.parse_validation(ValueTypeEnum.ENUM, 'low, high') == {
+            'options': ['low', 'high']
+        }
+
+    def test_should_keep_the_date_bounds_as_they_were_saved(self):
+        assert Parameter.parse_validation(ValueTypeEnum.DATE,
+                                          'gt 2020-01-01') == {
+                                              'gt': '2020-01-01'
+                                          }
+        assert Parameter.parse_validation(ValueTypeEnum.DATE, None) == {}
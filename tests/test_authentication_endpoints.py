@@ -10,9 +10,10 @@ from api.utils.success_messages import (CREATED, LOGIN, CONFIRM_EMAIL_RESENT,
                                         REG_VERIFIED, RESET_PASS_MAIL,
                                         PASSWORD_CHANGED)
 from api.utils.error_messages import serialization_error, authentication_errors, password_change_errors
-from api.utils.constants import CONFIRM_TOKEN, RESET_TOKEN, COOKIE_TOKEN_KEY, REDIS_TOKEN_HASH_KEY
+from api.utils.constants import CONFIRM_TOKEN, RESET_TOKEN, COOKIE_TOKEN_KEY, REDIS_TOKEN_HASH_KEY, FAILED_LOGIN_LIMITS
 from api.models import User
 from api.services.redis_util import RedisUtil
+from api.services.login_throttle import LoginThrottle
 from .mocks.user import UserGenerator
 from .mocks.redis import RedisMock
 from dateutil import parser
@@ -28,6 +29,11 @@ CONFIRM_RESET_PASSWORD_ENDPOINT = 'api/auth/reset/confirm'
 CHANGE_PASSWORD_ENDPOINT = 'api/auth/password'
 
 
+def cached_keys():
+    """Retrieves the keys in redis except the generations of the models"""
+    return [key for key in RedisMock.cache if not key.endswith('_GENERATION')]
+
+
 class TestLogoutEndpoint:
     def test_should_logout_user_successfully(self, init_db, client):
         redirect_url = UserGenerator.generate_api_input_data()['redirectURL']
@@ -105,6 +111,27 @@ class TestChangePasswordEndpoint:
         # This checks that the redis cache was cleared for that user
         assert len(RedisMock.keys(f'{redis_hash}*')) == 0
 
+    def test_should_reject_the_previous_cookie_after_the_password_is_changed(
+            self, init_db, client):
+        user = UserGenerator.generate_model_obj(save=True, verified=True)
+        user_data = {
+            "currentPassword": user.password,
+            "newPassword": "password!!1234"
+        }
+        add_cookie_to_client(client, user)
+        cookie_value = next(cookie.value for cookie in client.cookie_jar
+                            if cookie.name == COOKIE_TOKEN_KEY)
+        response = client.patch(CHANGE_PASSWORD_ENDPOINT,
+                                data=json.dumps(user_data),
+                                content_type="application/json")
+        assert response.status_code == 200
+
+        client.set_cookie('/', COOKIE_TOKEN_KEY, cookie_value)
+        response = client.patch(CHANGE_PASSWORD_ENDPOINT,
+                                data=json.dumps(user_data),
+                                content_type="application/json")
+        assert response.status_code == 401
+
     def test_unverified_user_should_change_password(self, init_db, client):
         user = UserGenerator.generate_model_obj(save=True, verified=False)
         new_password = "password!!1234"
@@ -218,7 +245,8 @@ class TestLoginEndpoint:
             'usernameOrEmail': valid_user.email,
             'password': valid_user.password,
         }
-        RedisUtil.hset('login', valid_user.email, 7)
+        for _ in range(FAILED_LOGIN_LIMITS):
+            LoginThrottle.record_failure(valid_user.email, '127.0.0.1')
         response = client.post(LOGIN_URL,
                                data=json.dumps(user_data),
                                content_type="application/json")
@@ -367,7 +395,7 @@ class TestResendEmail:
         html_content = assert_send_grid_mock_send(mock_send, user.email)
 
         set_key = None
-        for key in RedisMock.cache.keys():
+        for key in cached_keys():
             if REDIS_TOKEN_HASH_KEY not in key:
                 set_key = key
                 break
@@ -554,14 +582,14 @@ class TestResetPassword:
 
         assert mock_send_html_delay.called
         assert len(RedisMock.expired_cache) == len(
-            RedisMock.cache) == 1  # expired and set were called once
+            cached_keys()) == 1  # expired and set were called once
         html_to_check_for = '<h1>Reset Account</h1>'
         assert_successful_response(response,
                                    RESET_PASS_MAIL.format(user.email))
         html_content = assert_send_grid_mock_send(mock_send, user.email)
 
         set_key = None
-        for key in RedisMock.cache.keys():
+        for key in cached_keys():
             if REDIS_TOKEN_HASH_KEY not in key:
                 set_key = key
                 break
@@ -601,7 +629,7 @@ class TestResetPassword:
             'email_not_found']
         assert response_body['status'] == 'error'
         assert not mock_send.called
-        assert len(RedisMock.expired_cache) == len(RedisMock.cache) == 0
+        assert len(RedisMock.expired_cache) == len(cached_keys()) == 0
 
     def test_should_fail_when_redirect_url_is_not_provided(
             self, mock_send, init_db, client):
@@ -621,7 +649,7 @@ class TestResetPassword:
         assert 'redirectURL' in response_body['errors']
         assert response_body['status'] == 'error'
         assert not mock_send.called
-        assert len(RedisMock.expired_cache) == len(RedisMock.cache) == 0
+        assert len(RedisMock.expired_cache) == len(cached_keys()) == 0
 
 
 @patch('api.utils.emails.EmailUtil.SEND_CLIENT.send', autospec=True)
@@ -646,9 +674,9 @@ class TestRegisterEndpoint:
         html_content = assert_send_grid_mock_send(mock_send, user.email)
 
         # Check redis interactions
-        assert len(RedisMock.expired_cache) == len(RedisMock.cache) == 1
+        assert len(RedisMock.expired_cache) == len(cached_keys()) == 1
 
-        key = list(RedisMock.cache.keys())[0]
+        key = cached_keys()[0]
         token = RedisMock.cache.get(key)
         exp_key = list(RedisMock.expired_cache.keys())[0]
         exp_time = RedisMock.expired_cache.get(exp_key)
@@ -680,7 +708,7 @@ class TestRegisterEndpoint:
         assert 'email' in response_body['errors']
 
         assert mock_send.called is False
-        assert len(RedisMock.expired_cache) == len(RedisMock.cache) == 1
+        assert len(RedisMock.expired_cache) == len(cached_keys()) == 1
 
     def test_attempt_to_register_user_with_first_name_or_last_name_gt_20_should_fail(
             self, mock_send, init_db, client):
@@ -706,7 +734,7 @@ class TestRegisterEndpoint:
             'max_length_error'].format(20)
 
         assert mock_send.called is False
-        assert len(RedisMock.expired_cache) == len(RedisMock.cache) == 1
+        assert len(RedisMock.expired_cache) == len(cached_keys()) == 1
 
     def test_attempt_to_register_user_with_first_name_or_last_name_lt_3_chars_should_fail(
             self, mock_send, init_db, client):
@@ -732,7 +760,7 @@ class TestRegisterEndpoint:
             'min_length_error'].format(3)
 
         assert mock_send.called is False
-        assert len(RedisMock.expired_cache) == len(RedisMock.cache) == 1
+        assert len(RedisMock.expired_cache) == len(cached_keys()) == 1
 
     def test_attempt_to_register_a_user_with_existing_email_should_fail(
             self, mock_send, init_db, client):
@@ -756,4 +784,4 @@ class TestRegisterEndpoint:
         assert response_body['message'] == serialization_error[
             'already_exists'].format('Username or email')
         assert mock_send.called is False
-        assert len(RedisMock.expired_cache) == len(RedisMock.cache) == 1
+        assert len(RedisMock.expired_cache) == len(cached_keys()) == 1
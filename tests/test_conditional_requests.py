@@ -0,0 +1,61 @@
+from unittest.mock import patch
+from api.models import Unit
+from api.services.response_cache import ResponseCache
+from api.views.organisation import RetrieveUserMemberships
+from api.views.unit import UnitView
+from .assertions import add_cookie_to_client
+
+UNITS_ENDPOINT = '/api/org/{}/units'
+USER_ORGS_ENDPOINT = '/api/user/orgs'
+
+
+class TestConditionalRequests:
+    def setup_method(self):
+        ResponseCache.LOCAL.clear()
+
+    def test_should_return_not_modified_until_the_models_change(
+            self, init_db, client, saved_org_and_user_generator):
+        user, org = saved_org_and_user_generator
+        add_cookie_to_client(client, user)
+        url = UNITS_ENDPOINT.format(org.id)
+
+        response = client.get(url)
+        etag = response.headers['ETag']
+        assert response.status_code == 200
+        assert etag.startswith('W/')
+
+        with patch.object(UnitView, 'generate_page_data') as mock_generate:
+            response = client.get(url, headers={'If-None-Match': etag})
+            assert not mock_generate.called
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.data == b''
+
+        other_page = client.get(f'{url}?page=2',
+                                headers={'If-None-Match': etag})
+        assert other_page.status_code == 200
+
+        Unit(name='Changed Unit', symbol='chu', organisation_id=org.id).save()
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_timestamp_etags_should_change_with_the_related_rows(
+            self, init_db, client, saved_org_and_user_generator):
+        user, org = saved_org_and_user_generator
+        add_cookie_to_client(client, user)
+
+        etag = client.get(USER_ORGS_ENDPOINT).headers['ETag']
+        with patch.object(RetrieveUserMemberships,
+                          'generate_page_data') as mock_generate:
+            response = client.get(USER_ORGS_ENDPOINT,
+                                  headers={'If-None-Match': etag})
+            assert not mock_generate.called
+        assert response.status_code == 304
+
+        org.name = 'Renamed Organisation'
+        org.update()
+        response = client.get(USER_ORGS_ENDPOINT,
+                              headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
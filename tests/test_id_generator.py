@@ -16,3 +16,34 @@ class TestIdGenerator:
         id_two = IDGenerator.generate_id()
         assert id_one != id_two
         assert mock_time.call_count == 2
+
+    def test_should_generate_increasing_ids_in_the_same_time_stamp(
+            self, mock_time):
+        mock_time.return_value = 60001
+        ids = IDGenerator.generate_ids(500) + IDGenerator.generate_ids(500)
+        assert len(set(ids)) == 1000
+        assert ids == sorted(ids)
+        assert all(len(id_) == 20 for id_ in ids)
+        assert mock_time.call_count == 2
+
+    def test_should_carry_over_when_the_last_random_char_overflows(
+            self, mock_time):
+        mock_time.return_value = 70001
+        IDGenerator.generate_id()
+        IDGenerator.last_rand_value = IDGenerator._HALF_BASE - 2
+        id_one, id_two = IDGenerator.generate_ids(2)
+        assert id_one[8:] == '------zzzzzz'
+        assert id_two[8:] == '-----0------'
+
+
+class TestGenerateIds:
+    NUM_OF_IDS = 20000
+
+    def test_generate_ids_should_continue_the_order_of_generate_id(self):
+        scalar_ids = [
+            IDGenerator.generate_id() for _ in range(self.NUM_OF_IDS)
+        ]
+        batch_ids = IDGenerator.generate_ids(self.NUM_OF_IDS)
+
+        assert len(set(scalar_ids + batch_ids)) == 2 * self.NUM_OF_IDS
+        assert scalar_ids + batch_ids == sorted(scalar_ids + batch_ids)
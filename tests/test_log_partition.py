@@ -0,0 +1,228 @@
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+from api.models import (db, Log, LogValue, LogPartition, LogStorage, Report,
+                        AggregationType)
+from api.services.log_partition import LogPartitionManager
+
+MARCH_LOG_DATETIMES = [
+    datetime(2020, 3, 1, tzinfo=timezone.utc),
+    datetime(2020, 3, 31, 23, 59, tzinfo=timezone.utc),
+]
+
+
+def partitions_of_rows(model, appliance):
+    return {
+        row[0]
+        for row in db.session.execute(
+            f'''SELECT DISTINCT tableoid::regclass::text FROM "{model.__tablename__}"
+            WHERE {'id' if model is Log else 'log_id'} IN (
+                SELECT id FROM "Log" WHERE appliance_id = :appliance_id)''',
+            {'appliance_id': appliance.id})
+    }
+
+
+def explain(query):
+    statement = query.statement.compile(dialect=db.engine.dialect)
+    return '\n'.join(row[0] for row in db.session.connection().execute(
+        f'EXPLAIN (COSTS OFF) {statement}', statement.params))
+
+
+def scanned_tables(query):
+    plan = explain(query)
+    return {
+        name
+        for model in (Log, LogValue)
+        for name in [model.default_partition_name()] +
+        [name for name, _, _ in LogPartition.partitions_of(model)]
+        if f'on "{name}"' in plan
+    }
+
+
+class TestLogPartition:
+    def create_logs(self, saved_appliance_generator, saved_logs_generator,
+                    log_datetimes):
+        _, _, numeric_params, _, appliance = saved_appliance_generator(
+            num_of_numeric_units=2)
+        saved_logs_generator(appliance,
+                             numeric_params,
+                             len(log_datetimes),
+                             log_datetimes=log_datetimes)
+        return appliance, numeric_params
+
+    def test_maintain_should_create_the_upcoming_partitions(
+            self, init_db, saved_appliance_generator, saved_logs_generator):
+        now = datetime(2020, 11, 20, tzinfo=timezone.utc)
+        appliance, _ = self.create_logs(saved_appliance_generator,
+                                        saved_logs_generator, [now])
+        assert partitions_of_rows(Log, appliance) == {'"Log_default"'}
+
+        with patch.object(LogPartition, 'PARTITIONS_AHEAD', 2):
+            partitions = LogPartition.maintain(now)
+
+        assert partitions == {
+            'created': [
+                'Log_20201101', 'LogValue_20201101', 'Log_20201201',
+                'LogValue_20201201', 'Log_20210101', 'LogValue_20210101'
+            ],
+            'detached': [],
+        }
+        assert [(start, end)
+                for _, start, end in LogPartition.partitions_of(LogValue)
+                ][-1] == (datetime(2021, 1, 1, tzinfo=timezone.utc),
+                          datetime(2021, 2, 1, tzinfo=timezone.utc))
+        assert partitions_of_rows(Log, appliance) == {'"Log_20201101"'}
+        assert partitions_of_rows(LogValue,
+                                  appliance) == {'"LogValue_20201101"'}
+        with patch.object(LogPartition, 'PARTITIONS_AHEAD', 2):
+            assert LogPartition.maintain(now)['created'] == []
+
+    def test_queries_in_a_date_range_should_only_scan_its_partitions(
+            self, init_db, saved_appliance_generator, saved_logs_generator):
+        appliance, params = self.create_logs(saved_appliance_generator,
+                                             saved_logs_generator,
+                                             MARCH_LOG_DATETIMES)
+        LogPartition.create(datetime(2020, 3, 15, tzinfo=timezone.utc))
+        LogPartition.create(datetime(2020, 4, 15, tzinfo=timezone.utc))
+        assert partitions_of_rows(Log, appliance) == {'"Log_20200301"'}
+
+        export_query = LogStorage.active().appliance_logs_in_date_range(
+            appliance.organisation_id, appliance.id, params, date(2020, 3, 1),
+            date(2020, 3, 31))
+        assert len(export_query.all()) == 2
+        assert scanned_tables(export_query) == {
+            'Log_20200301', 'LogValue_20200301'
+        }
+
+        report = Report(organisation_id=appliance.organisation_id,
+                        start_date=date(2020, 4, 1),
+                        end_date=date(2020, 4, 2))
+        report_query = report.aggregation_query(
+            appliance.id, [(params[0].id, AggregationType.SUMMATION)])
+        assert scanned_tables(report_query) == {
+            'Log_20200401', 'LogValue_20200401'
+        }
+
+    def test_maintain_should_detach_the_expired_partitions(
+            self, init_db, saved_appliance_generator, saved_logs_generator):
+        appliance, _ = self.create_logs(saved_appliance_generator,
+                                        saved_logs_generator,
+                                        MARCH_LOG_DATETIMES)
+        LogPartition.create(datetime(2020, 3, 1, tzinfo=timezone.utc))
+
+        with patch.object(LogPartition, 'RETENTION_DAYS', 30):
+            partitions = LogPartitionManager.maintain_partitions()
+
+        assert {'LogValue_20200301', 'Log_20200301'} <= set(
+            partitions['detached'])
+        assert partitions_of_rows(Log, appliance) == set()
+        assert db.session.execute(
+            'SELECT count(*) FROM "Log_20200301" WHERE appliance_id = :id', {
+                'id': appliance.id
+            }).scalar() == 2
+        for name in partitions['detached']:
+            db.session.execute(f'DROP TABLE "{name}"')
+        db.session.commit()
+
+
+def used_indexes(query):
+    """Returns the indexes of the log tables whose partitions the query scans"""
+    plan = explain(query)
+    assert 'Seq Scan' not in plan
+    partition_indexes = db.session.execute(
+        '''SELECT child.relname, parent.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE parent.relkind = 'I' ''')
+    return {
+        index
+        for partition_index, index in partition_indexes
+        if f'on "{partition_index}"' in plan
+    }
+
+
+class TestLogIndexes:
+    def seed_logs(self, saved_appliance_generator):
+        """Saves a log every 7 minutes in March 2020, one in ten for `appliance`"""
+        org, _, params, _, appliance = saved_appliance_generator(
+            num_of_numeric_units=2)
+        _, _, _, _, other_appliance = saved_appliance_generator(
+            num_of_numeric_units=1, org=org)
+        log_rows = [{
+            'organisation_id':
+            org.id,
+            'appliance_id':
+            appliance.id if index % 10 == 0 else other_appliance.id,
+            'created_at':
+            datetime(2020, 3, 1, tzinfo=timezone.utc) +
+            timedelta(minutes=7 * index),
+        } for index in range(6000)]
+        Log.bulk_insert(log_rows, commit=False)
+        LogValue.bulk_copy([{
+            'log_id': row['id'],
+            'created_at': row['created_at'],
+            'parameter_id': param.id,
+            'numeric_value': index,
+        } for index, row in enumerate(log_rows) for param in params])
+        LogPartition.create(datetime(2020, 3, 1, tzinfo=timezone.utc))
+        return org, appliance, params
+
+    def test_export_and_report_queries_should_use_the_log_indexes(
+            self, init_db, saved_appliance_generator):
+        org, appliance, params = self.seed_logs(saved_appliance_generator)
+        db.session.execute('ANALYZE "Log_20200301"')
+        db.session.execute('ANALYZE "LogValue_20200301"')
+        profile_indexes = {
+            'log_appliance_id_index', 'log_created_at_brin_index',
+            'log_value_created_at_brin_index',
+            'log_value_log_id_parameter_id_index'
+        }
+
+        export_query = LogStorage.active().appliance_logs_in_date_range(
+            org.id, appliance.id, params, date(2020, 3, 10), date(2020, 3, 12))
+        report_query = Report(organisation_id=org.id,
+                              start_date=date(2020, 3, 10),
+                              end_date=date(2020, 3, 12)).aggregation_query(
+                                  appliance.id,
+                                  [(params[0].id, AggregationType.SUMMATION)])
+
+        for query in (export_query, report_query):
+            indexes = used_indexes(query)
+            assert indexes <= profile_indexes
+            assert indexes & {
+                'log_appliance_id_index', 'log_created_at_brin_index'
+            }
+            assert indexes & {
+                'log_value_created_at_brin_index',
+                'log_value_log_id_parameter_id_index'
+            }
+        assert len(export_query.all()) == 61
+
+    def test_cluster_should_order_the_partitions_by_appliance_and_time(
+            self, init_db, saved_appliance_generator):
+        org, appliance, params = self.seed_logs(saved_appliance_generator)
+        num_of_logs = Log.query.filter_by(organisation_id=org.id).count()
+
+        assert LogPartition.cluster_historical(
+            datetime(2020, 3, 1, tzinfo=timezone.utc),
+            now=datetime(2020, 4, 15, tzinfo=timezone.utc)) == [
+                'Log_20200301', 'LogValue_20200301'
+            ]
+
+        physical_order = db.session.execute('''SELECT appliance_id, created_at
+            FROM "Log_20200301" ORDER BY ctid''').fetchall()
+        assert physical_order == sorted(physical_order)
+        value_order = db.session.execute(
+            '''SELECT log.appliance_id, log.created_at
+            FROM "LogValue_20200301" AS value
+            JOIN "Log_20200301" AS log ON log.id = value.log_id
+            ORDER BY value.ctid''').fetchall()
+        assert value_order == sorted(value_order)
+        assert Log.query.filter_by(
+            organisation_id=org.id).count() == num_of_logs
+        assert LogValue.query.join(Log).filter(
+            Log.appliance_id == appliance.id).count() == 600 * len(params)
+        assert 'Log_20200301' in {
+            name
+            for name, _, _ in LogPartition.partitions_of(Log)
+        }
@@ -0,0 +1,95 @@
+from datetime import date, datetime, timezone
+from api.models import (db, Log, LogValue, LogRollup, HourlyLogRollup,
+                        DailyLogRollup)
+from api.services.redis_util import RedisUtil
+from api.utils.id_generator import IDGenerator
+
+
+def create_logs(saved_appliance_generator, saved_logs_generator):
+    org, _, numeric_params, text_params, appliance = saved_appliance_generator(
+        num_of_numeric_units=2, num_of_text_units=1)
+    param_one, param_two = numeric_params
+    log_datetimes = [
+        datetime(2020, 3, 1, 10, 5, tzinfo=timezone.utc),
+        datetime(2020, 3, 1, 10, 55, tzinfo=timezone.utc),
+        datetime(2020, 3, 1, 13, tzinfo=timezone.utc),
+        datetime(2020, 3, 2, 1, tzinfo=timezone.utc),
+    ]
+    value_mapper = [{
+        param_one.id: value,
+        param_two.id: -value
+    } for value in [1, 3, 8, 100]]
+    saved_logs_generator(appliance,
+                         numeric_params + text_params,
+                         4,
+                         value_mapper=value_mapper,
+                         log_datetimes=log_datetimes)
+    return appliance, param_one, param_two
+
+
+def rollup_rows(model, appliance, parameter):
+    return [
+        (row.bucket, row.count, row.sum, row.min, row.max, row.sum_of_squares)
+        for row in model.query.filter_by(appliance_id=appliance.id,
+                                         parameter_id=parameter.id).order_by(
+                                             model.bucket)
+    ]
+
+
+class TestLogRollup:
+    def test_rebuild_should_aggregate_numeric_values_by_hour_and_day(
+            self, init_db, saved_appliance_generator, saved_logs_generator):
+        appliance, param_one, param_two = create_logs(
+            saved_appliance_generator, saved_logs_generator)
+
+        LogRollup.rebuild(date(2020, 3, 1), date(2020, 3, 2))
+
+        assert rollup_rows(HourlyLogRollup, appliance, param_one) == [
+            (datetime(2020, 3, 1, 10, tzinfo=timezone.utc), 2, 4, 1, 3, 10),
+            (datetime(2020, 3, 1, 13, tzinfo=timezone.utc), 1, 8, 8, 8, 64),
+            (datetime(2020, 3, 2, 1,
+                      tzinfo=timezone.utc), 1, 100, 100, 100, 10000),
+        ]
+        assert rollup_rows(DailyLogRollup, appliance, param_two) == [
+            (datetime(2020, 3, 1, tzinfo=timezone.utc), 3, -12, -8, -1, 74),
+            (datetime(2020, 3, 2,
+                      tzinfo=timezone.utc), 1, -100, -100, -100, 10000),
+        ]
+        assert HourlyLogRollup.query.filter_by(
+            appliance_id=appliance.id).count() == 6
+
+    def test_refresh_should_remove_the_rollups_of_deleted_logs(
+            self, init_db, saved_appliance_generator, saved_logs_generator):
+        appliance, param_one, _ = create_logs(saved_appliance_generator,
+                                              saved_logs_generator)
+        LogRollup.rebuild(date(2020, 3, 1), date(2020, 3, 2))
+        last_log = Log.query.filter_by(appliance_id=appliance.id).order_by(
+            Log.created_at.desc()).first()
+        LogValue.query.filter_by(log_id=last_log.id).delete()
+        db.session.delete(last_log)
+        db.session.commit()
+
+        LogRollup.rebuild(date(2020, 3, 2), date(2020, 3, 2))
+
+        assert [
+            row[0] for row in rollup_rows(DailyLogRollup, appliance, param_one)
+        ] == [datetime(2020, 3, 1, tzinfo=timezone.utc)]
+
+
+class TestLogRollupUpdater:
+    def test_should_only_refresh_the_buckets_of_logs_added_since_the_last_run(
+            self, init_db, saved_appliance_generator, saved_logs_generator):
+        from api.services.log_rollup import LogRollupUpdater
+        appliance, param_one, _ = create_logs(saved_appliance_generator,
+                                              saved_logs_generator)
+        LogRollupUpdater.update_rollups()
+        assert len(rollup_rows(HourlyLogRollup, appliance, param_one)) == 3
+
+        HourlyLogRollup.query.filter_by(appliance_id=appliance.id).delete()
+        db.session.commit()
+        # 2100-01-01 so the logs above were created before the last run
+        RedisUtil.set_key(LogRollupUpdater.WATERMARK_KEY, 4102444800000)
+        min_log_id = LogRollupUpdater.update_rollups()
+
+        assert min_log_id > IDGenerator.generate_id()
+        assert rollup_rows(HourlyLogRollup, appliance, param_one) == []
@@ -0,0 +1,130 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+import pytest
+from api.models import (db, Log, LogValue, LogRollup, HourlyLogRollup,
+                        LogStorage, EAVLogStorage, WideLogStorage, Report,
+                        AggregationType)
+from api.services.appliance_schema_cache import ApplianceSchemaCache
+from .assertions import add_cookie_to_client
+
+URL = '/api/org/{}/logs'
+BATCH_URL = '/api/org/{}/logs/batch'
+EXPORT_LOGS = '/api/org/{}/appliances/{}/export-logs'
+
+
+@pytest.fixture(scope='function')
+def wide_storage():
+    with patch.object(LogStorage, 'ACTIVE_NAME', 'wide'):
+        yield WideLogStorage
+
+
+class TestWideLogStorage:
+    def setup_method(self):
+        ApplianceSchemaCache.CACHE.clear()
+
+    def save_logs(self, client, saved_appliance_generator):
+        org, user, numeric_params, text_params, appliance = saved_appliance_generator(
+            'ENGINEER', 2, 1)
+        add_cookie_to_client(client, user)
+        params = numeric_params + text_params
+
+        def log_data(value):
+            return {
+                params[0].id: value,
+                params[1].id: str(value * 2),
+                params[2].id: f'comment {value}',
+            }
+
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps([{
+                                   'applianceId': appliance.id,
+                                   'logData': log_data(value)
+                               } for value in (1, 2)]),
+                               content_type='application/json')
+        assert response.status_code == 201
+        response = client.post(URL.format(org.id),
+                               data=json.dumps({
+                                   'applianceId': appliance.id,
+                                   'logData': log_data(3)
+                               }),
+                               content_type='application/json')
+        assert response.status_code == 201
+        assert json.loads(response.data)['data']['logValues'] == {
+            params[0].id: 3,
+            params[1].id: 6,
+            params[2].id: 'comment 3',
+        }
+        return org, appliance, params
+
+    def test_should_store_the_values_in_the_log_rows(self, init_db, client,
+                                                     saved_appliance_generator,
+                                                     wide_storage):
+        org, appliance, params = self.save_logs(client,
+                                                saved_appliance_generator)
+        logs = Log.query.filter_by(appliance_id=appliance.id).all()
+
+        assert len(logs) == 3
+        assert LogValue.query.filter(
+            LogValue.log_id.in_([log.id for log in logs])).count() == 0
+        assert sorted(log.numeric_values[params[0].id]
+                      for log in logs) == [1, 2, 3]
+        assert {log.text_values[params[2].id]
+                for log in logs} == {'comment 1', 'comment 2', 'comment 3'}
+
+    def test_views_should_read_the_values_from_the_log_rows(
+            self, init_db, client, saved_appliance_generator, wide_storage):
+        org, appliance, params = self.save_logs(client,
+                                                saved_appliance_generator)
+
+        for query_string in ('', f'&appliance_id_search={appliance.id}'):
+            response = client.get(
+                f'{URL.format(org.id)}?page_limit=100{query_string}')
+            log_values = [
+                log['logValues'] for log in json.loads(response.data)['data']
+                if log['applianceId'] == appliance.id
+            ]
+            assert sorted(values[params[0].id]
+                          for values in log_values) == [1, 2, 3]
+
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        response = client.get(
+            f'{EXPORT_LOGS.format(org.id, appliance.id)}'
+            f'?start_date={yesterday}&end_date={datetime.utcnow()}')
+        rows = response.data.decode('utf-8').splitlines()
+        assert response.status_code == 200
+        assert len(rows) == 4
+        assert any('comment 3' in row and '6.0' in row for row in rows)
+
+    def test_aggregations_should_read_the_values_from_the_log_rows(
+            self, init_db, client, saved_appliance_generator, wide_storage):
+        org, appliance, params = self.save_logs(client,
+                                                saved_appliance_generator)
+
+        LogRollup.refresh_all(Log.appliance_id == appliance.id)
+        rollup = HourlyLogRollup.query.filter_by(
+            appliance_id=appliance.id, parameter_id=params[0].id).one()
+        assert (rollup.count, rollup.sum, rollup.max) == (3, 6, 3)
+
+        report = Report(organisation_id=org.id)
+        results = report.aggregate_appliance_logs(appliance.id, [
+            SimpleNamespace(parameter_id=params[1].id,
+                            aggregation_type=AggregationType.SUMMATION)
+        ])
+        assert results[(params[1].id, AggregationType.SUMMATION)][None] == 12
+
+    def test_backfill_should_copy_the_values_of_eav_logs(
+            self, init_db, saved_appliance_generator, saved_logs_generator):
+        _, _, numeric_params, text_params, appliance = saved_appliance_generator(
+            num_of_numeric_units=2, num_of_text_units=1)
+        saved_logs_generator(appliance, numeric_params + text_params, 3)
+        logs = Log.eager('log_values').filter_by(
+            appliance_id=appliance.id).all()
+        eav_values = {log.id: EAVLogStorage.values_of(log) for log in logs}
+
+        assert WideLogStorage.backfill(batch_size=2) >= 3
+        assert WideLogStorage.backfill() == 0
+        db.session.expire_all()
+        for log in Log.query.filter_by(appliance_id=appliance.id):
+            assert WideLogStorage.values_of(log) == eav_values[log.id]
@@ -0,0 +1,101 @@
+import json
+from unittest.mock import patch
+from api.models import User
+from api.services.login_throttle import LoginThrottle
+from api.utils.constants import FAILED_LOGIN_LIMITS, FAILED_LOGIN_IP_LIMITS
+from api.utils.error_messages import authentication_errors
+from .mocks.redis import RedisMock
+from .mocks.user import UserGenerator
+
+LOGIN_URL = '/api/auth/login'
+WINDOW = LoginThrottle.WINDOW_SECONDS
+
+
+@patch('time.time')
+class TestLoginThrottle:
+    def setup_method(self):
+        RedisMock.flush_all()
+        LoginThrottle.BLOCKED.clear()
+
+    def test_should_block_an_identifier_once_it_reaches_the_limit(
+            self, mock_time):
+        mock_time.return_value = 100 * WINDOW
+        for _ in range(FAILED_LOGIN_LIMITS - 1):
+            LoginThrottle.record_failure('User@Mail.com', '10.0.0.1')
+        assert not LoginThrottle.is_blocked('user@mail.com', '10.0.0.2')
+
+        LoginThrottle.record_failure('user@mail.com ', '10.0.0.1')
+        assert LoginThrottle.is_blocked('user@mail.com', '10.0.0.2') == 'ID'
+        assert not LoginThrottle.is_blocked('other@mail.com', '10.0.0.2')
+
+    def test_should_block_an_ip_address_once_it_reaches_the_limit(
+            self, mock_time):
+        mock_time.return_value = 100 * WINDOW
+        for index in range(FAILED_LOGIN_IP_LIMITS):
+            LoginThrottle.record_failure(f'user{index}', '10.0.0.1')
+
+        assert LoginThrottle.is_blocked('new-user', '10.0.0.1') == 'IP'
+        assert not LoginThrottle.is_blocked('new-user', '10.0.0.2')
+        assert not LoginThrottle.is_blocked('new-user', None)
+
+    def test_should_count_the_part_of_the_previous_window_in_the_sliding_window(
+            self, mock_time):
+        mock_time.return_value = 100 * WINDOW + WINDOW - 1
+        for _ in range(FAILED_LOGIN_LIMITS):
+            LoginThrottle.record_failure('user', '10.0.0.1')
+
+        mock_time.return_value = 101 * WINDOW + WINDOW / 4
+        LoginThrottle.record_failure('user', '10.0.0.1')
+        assert not LoginThrottle.is_blocked('user', '10.0.0.2')
+        LoginThrottle.record_failure('user', '10.0.0.1')
+        assert LoginThrottle.is_blocked('user', '10.0.0.2')
+
+        LoginThrottle.BLOCKED.clear()
+        mock_time.return_value = 103 * WINDOW
+        assert not LoginThrottle.is_blocked('user', '10.0.0.2')
+
+    def test_blocked_attempts_should_not_verify_the_password(
+            self, mock_time, init_db, client):
+        mock_time.return_value = 100 * WINDOW
+        valid_user = UserGenerator.generate_model_obj(save=True)
+        for _ in range(FAILED_LOGIN_LIMITS):
+            LoginThrottle.record_failure(valid_user.email, '127.0.0.1')
+
+        with patch.object(User, 'verify_password') as mock_verify:
+            response = client.post(LOGIN_URL,
+                                   data=json.dumps({
+                                       'usernameOrEmail':
+                                       valid_user.email,
+                                       'password':
+                                       valid_user.password,
+                                   }),
+                                   content_type="application/json")
+            assert not mock_verify.called
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == authentication_errors[
+            'login_limit_reached'].format(FAILED_LOGIN_LIMITS)
+
+    def test_an_ip_address_should_only_be_blocked_when_proxies_are_configured(
+            self, mock_time, init_db, app, client):
+        mock_time.return_value = 100 * WINDOW
+        valid_user = UserGenerator.generate_model_obj(save=True)
+        for index in range(FAILED_LOGIN_IP_LIMITS):
+            LoginThrottle.record_failure(f'user{index}', '127.0.0.1')
+        login_data = json.dumps({
+            'usernameOrEmail': valid_user.email,
+            'password': valid_user.password,
+        })
+
+        with patch.dict(app.config, NUM_OF_PROXIES=0):
+            response = client.post(LOGIN_URL,
+                                   data=login_data,
+                                   content_type="application/json")
+        assert response.status_code == 200
+
+        with patch.dict(app.config, NUM_OF_PROXIES=1):
+            response = client.post(LOGIN_URL,
+                                   data=login_data,
+                                   content_type="application/json")
+        assert response.status_code == 400
+        assert json.loads(response.data)['message'] == authentication_errors[
+            'login_limit_reached'].format(FAILED_LOGIN_IP_LIMITS)
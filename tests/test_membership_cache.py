@@ -0,0 +1,56 @@
+import json
+from unittest.mock import patch
+from api.models import Membership, Role
+from api.services.membership_cache import MembershipCache
+from api.services.redis_util import RedisUtil
+from .mocks.user import UserGenerator
+from .mocks.organisation import OrganisationGenerator
+
+
+class TestMembershipCache:
+    def test_should_cache_the_membership_in_the_worker_and_in_redis(
+            self, init_db, client):
+        user = UserGenerator.generate_model_obj(save=True, verified=True)
+        org = OrganisationGenerator.generate_model_obj(user.id, save=True)
+
+        with patch.object(
+                MembershipCache,
+                '_query_membership',
+                side_effect=MembershipCache._query_membership) as mock_query:
+            membership = MembershipCache.get(user.id, org.id)
+            MembershipCache.get(user.id, org.id)
+            MembershipCache.CACHE.clear()
+            cached_membership = MembershipCache.get(user.id, org.id)
+            assert mock_query.call_count == 1
+
+        assert membership.role_name == 'OWNER'
+        assert cached_membership.to_dict() == membership.to_dict()
+        assert RedisUtil.get_key(MembershipCache.redis_key(user.id,
+                                                           org.id)) is not None
+
+    def test_should_invalidate_the_cache_when_a_membership_is_created(
+            self, init_db, client):
+        user = UserGenerator.generate_model_obj(save=True, verified=True)
+        other_user = UserGenerator.generate_model_obj(save=True, verified=True)
+        org = OrganisationGenerator.generate_model_obj(user.id, save=True)
+        assert MembershipCache.get(other_user.id, org.id) is None
+        stale_fields = {
+            'id': 'stale-id',
+            'user_id': other_user.id,
+            'organisation_id': org.id,
+            'role_id': 'stale-role-id',
+            'role_name': 'REGULAR USERS',
+        }
+        MembershipCache.CACHE.set(f'{other_user.id}/{org.id}', stale_fields)
+        RedisUtil.set_key(MembershipCache.redis_key(other_user.id, org.id),
+                          json.dumps(stale_fields))
+
+        role_id = Role.query.filter_by(name='ENGINEER').one().id
+        Membership(organisation_id=org.id,
+                   user_id=other_user.id,
+                   role_id=role_id).save()
+
+        membership = MembershipCache.get(other_user.id, org.id)
+        assert membership.role_name == 'ENGINEER'
+        assert membership.model.member.id == other_user.id
+        assert membership.model.organisation.id == org.id
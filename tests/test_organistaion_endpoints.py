@@ -236,6 +236,34 @@ class TestRetrieveUserOrganisation:
             prev_page=None,
         )
 
+    def test_should_retrieve_user_organisations_with_cursors(
+        self, init_db, client, saved_org_and_user_generator):
+        org_objs, creator, org = self.create_test_precondition(
+            saved_org_and_user_generator, 3)
+        user = UserGenerator.generate_model_obj(save=True)
+        role_id = Role.query.filter_by(name='REGULAR USERS').one().id
+        Membership.bulk_create([
+            Membership(organisation_id=org.id,
+                       user_id=user.id,
+                       role_id=role_id) for org in org_objs
+        ])
+        token = UserGenerator.generate_token(user)
+        add_cookie_to_client(client, user, token)
+        url = f'{RETRIEVE_USER_ORGANISATIONS}?sort_by=-organisation.name&page_limit=2'
+
+        response_body = json.loads(client.get(f'{url}&cursor=').data)
+        next_cursor = response_body['meta']['nextCursor']
+        first_page = [m['organisation']['name'] for m in response_body['data']]
+        response_body = json.loads(
+            client.get(f'{url}&cursor={next_cursor}').data)
+        second_page = [
+            m['organisation']['name'] for m in response_body['data']
+        ]
+
+        assert first_page == ['Organisation 3', 'Organisation 2']
+        assert second_page == ['Organisation 1']
+        assert response_body['meta']['nextCursor'] is None
+
     def test_should_return_empty_array_when_no_membership_is_found(
         self, init_db, client, saved_org_and_user_generator):
         self.create_test_precondition(saved_org_and_user_generator, 5)
@@ -1,4 +1,5 @@
 import json
+from sqlalchemy import event
 from api.models import (
     Unit,
     ValueTypeEnum,
@@ -486,3 +487,51 @@ class TestRetrieveParameter:
             prev_page=None,
         )
         assert len(response_body['data']) == 1
+
+    def test_should_only_select_and_return_the_requested_fields(
+            self, init_db, client, saved_parameters_to_org):
+        run_test_precondition()
+        unit = Unit.query.filter_by(name='Voltage').first()
+        params_objs, org = saved_parameters_to_org(3, unit_id=unit.id)
+        add_cookie_to_client(client, org.creator)
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record_statement)
+        try:
+            response = client.get(
+                f'{PARAMETER_ENDPOINTS.format(org.id)}?fields=name,editable')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record_statement)
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 200
+        assert sorted(data['name']
+                      for data in response_body['data']) == sorted(
+                          param.name for param in params_objs)
+        for data in response_body['data']:
+            assert list(data.keys()) == ['id', 'name', 'editable']
+            assert data['editable'] is True
+        page_statement, = [
+            statement for statement in statements
+            if statement.startswith('SELECT "Parameter"')
+        ]
+        assert '"Unit"' not in page_statement
+        assert '"User"' not in page_statement
+        assert '"Parameter".validation' not in page_statement
+
+    def test_should_fail_when_an_unknown_field_is_requested(
+            self, init_db, client, saved_parameters_to_org):
+        run_test_precondition()
+        params_objs, org = saved_parameters_to_org(1)
+        add_cookie_to_client(client, org.creator)
+
+        response = client.get(
+            f'{PARAMETER_ENDPOINTS.format(org.id)}?fields=name,password')
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 400
+        assert response_body['message'].startswith(
+            serialization_error['invalid_option'].format('fields', ''))
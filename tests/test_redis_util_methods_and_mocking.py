@@ -1,3 +1,4 @@
+from datetime import timedelta
 from unittest.mock import Mock, patch
 from .mocks.redis import RedisMock
 from api.services.redis_util import RedisUtil
@@ -15,6 +16,128 @@ class TestRedisUtil:
         assert Role.query.filter_by(name='OWNER').one().id == owner_role
         assert RedisMock.get('ROLE_OWNER') == owner_role
 
+    def test_delete_hash_should_delete_only_the_fields_of_the_hash_without_scanning_keys(
+            self):
+        RedisMock.flush_all()
+        RedisUtil.hset('user1_TOKEN', 'one', 'a', timedelta(days=1))
+        RedisUtil.hset('user1_TOKEN', 'two', 'b', timedelta(days=5))
+        RedisUtil.hset('user2_TOKEN', 'one', 'c', timedelta(days=1))
+        assert RedisMock.ttl(RedisUtil.hash_index_key('user1_TOKEN')) == int(
+            timedelta(days=5).total_seconds())
+
+        with patch.object(RedisMock, 'keys') as mock_keys:
+            RedisUtil.delete_hash('user1_TOKEN')
+            assert not mock_keys.called
+
+        assert RedisUtil.hget('user1_TOKEN', 'one') is None
+        assert RedisUtil.hget('user1_TOKEN', 'two') is None
+        assert RedisUtil.hget('user2_TOKEN', 'one') == 'c'
+        assert RedisMock.get(RedisUtil.hash_index_key('user1_TOKEN')) is None
+
+    def test_should_remove_expired_fields_from_the_index_when_it_is_too_large(
+            self):
+        RedisMock.flush_all()
+        with patch.object(RedisUtil, 'MAX_HASH_INDEX_SIZE', 2):
+            RedisUtil.hset('user1_TOKEN', 'one', 'a')
+            RedisUtil.hset('user1_TOKEN', 'two', 'b')
+            RedisMock.delete('user1_TOKEN_one')
+            RedisUtil.hset('user1_TOKEN', 'three', 'c')
+
+        assert RedisMock.smembers(RedisUtil.hash_index_key('user1_TOKEN')) == {
+            'user1_TOKEN_two', 'user1_TOKEN_three'
+        }
+
+    def test_index_flat_hash_keys_should_index_fields_set_before_indexes_existed(
+            self):
+        RedisMock.flush_all()
+        RedisMock.set('user_1_TOKEN_-M1a_b', 'a')
+        RedisMock.expire('user_1_TOKEN_-M1a_b', 600)
+        RedisMock.set('user_1_TOKEN_-M1a_c', 'b')
+        RedisMock.set('ROLE_OWNER', 'owner-id')
+
+        assert RedisUtil.index_flat_hash_keys('TOKEN') == 2
+        assert RedisUtil.index_flat_hash_keys('TOKEN') == 2
+        RedisUtil.delete_hash('user_1_TOKEN')
+
+        assert RedisMock.get('user_1_TOKEN_-M1a_b') is None
+        assert RedisMock.get('user_1_TOKEN_-M1a_c') is None
+        assert RedisMock.get('ROLE_OWNER') == 'owner-id'
+
+    def test_set_key_should_set_the_value_and_expiry_in_one_command(self):
+        RedisMock.flush_all()
+        with patch.object(RedisMock, 'expire') as mock_expire:
+            RedisUtil.set_key('some-key', 'value', timedelta(minutes=2))
+            assert not mock_expire.called
+        assert RedisMock.get('some-key') == 'value'
+        assert RedisMock.expired_cache['some-key'] == 120
+
+    def test_batch_should_send_the_writes_when_the_context_exits(self):
+        RedisMock.flush_all()
+        with RedisUtil.batch():
+            RedisUtil.set_key('key-one', 'one')
+            RedisUtil.mset({'key-two': 'two', 'key-three': 'three'})
+            assert RedisUtil.get_key('key-one') is None
+
+        assert RedisUtil.mget(['key-one', 'key-two',
+                               'missing']) == ['one', 'two', None]
+
+    def test_batch_should_discard_the_writes_when_an_error_is_raised(self):
+        RedisMock.flush_all()
+        try:
+            with RedisUtil.batch():
+                RedisUtil.set_key('key-one', 'one')
+                raise ValueError()
+        except ValueError:
+            pass
+        assert RedisUtil.get_key('key-one') is None
+
+    def test_increment_existing_key_should_only_increment_cached_counters(
+            self):
+        RedisMock.flush_all()
+        RedisUtil.set_key('cached-count', 3, timedelta(minutes=2))
+        RedisUtil.increment_existing_key('cached-count', -1)
+        RedisUtil.increment_existing_key('missing-count', 1)
+
+        assert RedisMock.get('cached-count') == 2
+        assert RedisMock.expired_cache['cached-count'] == 120
+        assert not RedisMock.exists('missing-count')
+
+    def test_increment_existing_key_should_not_recreate_a_key_that_expired_before_the_increment(
+            self):
+        RedisMock.flush_all()
+        RedisUtil.set_key('cached-count', 3, timedelta(minutes=2))
+        with RedisUtil.batch():
+            RedisUtil.increment_existing_key('cached-count', 1)
+            RedisMock.delete('cached-count')
+
+        assert not RedisMock.exists('cached-count')
+        assert RedisMock.ttl('cached-count') == -2
+
+    def test_get_role_ids_should_read_every_role_in_one_round_trip(
+            self, init_db, client):
+        RedisMock.flush_all()
+        roles = {role.name: role.id for role in Role.query.all()}
+        assert RedisUtil.get_role_ids(
+            'OWNER', 'ADMIN') == [roles['OWNER'], roles['ADMIN']]
+
+        RedisUtil.reset_latency_stats()
+        with patch.object(Role, 'query') as mock_query:
+            assert RedisUtil.get_role_ids(
+                'OWNER', 'ADMIN') == [roles['OWNER'], roles['ADMIN']]
+            assert not mock_query.filter.called
+        assert RedisUtil.latency_stats()['mget']['count'] == 1
+
+    def test_should_record_the_latency_of_each_command(self):
+        RedisMock.flush_all()
+        RedisUtil.reset_latency_stats()
+        RedisUtil.hset('user1_TOKEN', 'one', 'a', timedelta(days=1))
+        RedisUtil.hget('user1_TOKEN', 'one')
+        stats = RedisUtil.latency_stats()
+
+        assert stats['pipeline']['count'] == 2
+        assert stats['get']['count'] == 1
+        assert stats['get']['average_ms'] == stats['get']['total_ms']
+
     #
     # def test_set_method_should_not_be_called_when_id_exists_in_redis(
     #         self, mock_redis_set, mock_redis_get, init_db, client):
@@ -1,4 +1,5 @@
 import json
+from datetime import datetime, timezone
 from api.models import (Report, ReportSection, ReportColumn, ValueTypeEnum, db,
                         Parameter, AggregationType)
 
@@ -11,6 +12,7 @@ from .mocks.user import UserGenerator
 REPORT_URL = '/api/org/{}/reports'
 REPORT_SECTION_URL = REPORT_URL + '/{}/sections'
 SINGLE_REPORT_SECTION_URL = REPORT_SECTION_URL + '/{}'
+REPORT_RESULTS_URL = REPORT_URL + '/{}/results'
 
 
 class TestCreateReportEndpoint:
@@ -276,3 +278,106 @@ class TestRetrieveReportEndpoint:
             'not_found'].format('Report Section')
 
         assert response.status_code == 404
+
+
+class TestReportResultsEndpoint:
+    def run_precondition(self, client, saved_appliance_generator,
+                         saved_logs_generator):
+        org, user_obj, numeric_params, _, appliance = saved_appliance_generator(
+            user_role='ENGINEER', num_of_numeric_units=2)
+        param_one, param_two = numeric_params
+        log_datetimes = [
+            datetime(2019, 1, 1, 10, tzinfo=timezone.utc),
+            datetime(2019, 1, 1, 12, tzinfo=timezone.utc),
+            datetime(2019, 1, 2, 23, 59, tzinfo=timezone.utc),
+            datetime(2019, 1, 3, tzinfo=timezone.utc),
+        ]
+        value_mapper = [{
+            param_one.id: value,
+            param_two.id: value * 2
+        } for value in [10, 20, 30, 1000]]
+        saved_logs_generator(appliance,
+                             numeric_params,
+                             4,
+                             value_mapper=value_mapper,
+                             log_datetimes=log_datetimes)
+        report = ReportGenerator.generate_model_obj(
+            organisation_id=org.id,
+            created_by_id=user_obj.id,
+            start_date='2019-01-01',
+            end_date='2019-01-02',
+        )
+        report.save()
+        report_section = ReportSectionGenerator.generate_model_obj(
+            report_id=report.id,
+            appliance_id=appliance.id,
+            name='Appliance Section')
+        report_section.save()
+        column_args = [
+            (param_one, AggregationType.AVERAGE, True),
+            (param_one, AggregationType.SUMMATION, False),
+            (param_two, AggregationType.MAXIMUM, True),
+            (param_two, AggregationType.MINIMUM, False),
+        ]
+        ReportColumn.bulk_create([
+            ReportColumnGenerator.generate_model_obj(
+                report_section_id=report_section.id,
+                parameter_id=param.id,
+                aggregation_type=aggregation_type,
+                aggregate_by_column=aggregate_by_column,
+            ) for param, aggregation_type, aggregate_by_column in column_args
+        ])
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        return org, report, column_args
+
+    def test_should_compute_the_aggregations_of_every_column_in_the_report(
+            self, init_db, client, saved_appliance_generator,
+            saved_logs_generator):
+        org, report, column_args = self.run_precondition(
+            client, saved_appliance_generator, saved_logs_generator)
+
+        response = client.get(REPORT_RESULTS_URL.format(org.id, report.id))
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 200
+        assert response_body['message'] == RETRIEVED.format('Report Results')
+        columns = response_body['data']['sections'][0]['columns']
+        results = {(column['parameterId'], column['aggregationType']):
+                   column['result']
+                   for column in columns}
+        (param_one, _, _), _, (param_two, _, _), _ = column_args
+        assert results == {
+            (param_one.id, 'AVERAGE'):
+            20,
+            (param_one.id, 'SUMMATION'): [{
+                'date': '2019-01-01',
+                'value': 30
+            }, {
+                'date': '2019-01-02',
+                'value': 30
+            }],
+            (param_two.id, 'MAXIMUM'):
+            60,
+            (param_two.id, 'MINIMUM'): [{
+                'date': '2019-01-01',
+                'value': 20
+            }, {
+                'date': '2019-01-02',
+                'value': 60
+            }],
+        }
+
+    def test_should_return_404_when_the_report_is_not_found(
+            self, init_db, client, saved_appliance_generator):
+        org, user_obj, _, _, _ = saved_appliance_generator(
+            user_role='ENGINEER', num_of_numeric_units=1)
+        token = UserGenerator.generate_token(user_obj)
+        add_cookie_to_client(client, user_obj, token)
+        response = client.get(
+            REPORT_RESULTS_URL.format(org.id, 'missing-report-id'))
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 404
+        assert response_body['message'] == serialization_error[
+            'not_found'].format('Report')
@@ -0,0 +1,91 @@
+import json
+import pytest
+from unittest.mock import patch
+from api.models import db, Unit, Log
+from api.services.response_cache import ResponseCache
+from api.views.base import BasePaginatedView
+from api.views.unit import UnitView
+from .assertions import add_cookie_to_client
+from .mocks.redis import RedisMock
+
+UNITS_ENDPOINT = '/api/org/{}/units'
+
+
+def retrieve_unit_names(client, org, query_string='?page_limit=100'):
+    response = client.get(f'{UNITS_ENDPOINT.format(org.id)}{query_string}')
+    assert response.status_code == 200
+    return {unit['name'] for unit in json.loads(response.data)['data']}
+
+
+class TestResponseCache:
+    def setup_method(self):
+        ResponseCache.LOCAL.clear()
+        ResponseCache.reset_metrics()
+
+    def test_should_serve_repeated_requests_from_the_cache(
+            self, init_db, client, saved_org_and_user_generator):
+        user, org = saved_org_and_user_generator
+        add_cookie_to_client(client, user)
+        Unit(name='Cached Unit', symbol='cu', organisation_id=org.id).save()
+
+        names = retrieve_unit_names(client, org, '?page_limit=100&page=1')
+        with patch.object(UnitView, 'generate_page_data') as mock_generate:
+            assert retrieve_unit_names(client, org,
+                                       '?page=1&page_limit=100') == names
+            ResponseCache.LOCAL.clear()
+            assert retrieve_unit_names(client, org,
+                                       '?page=1&page_limit=100') == names
+            assert not mock_generate.called
+
+        assert 'Cached Unit' in names
+        assert ResponseCache.metrics()['UnitView'] == {
+            'local_hits': 1,
+            'redis_hits': 1,
+            'misses': 1,
+            'hit_ratio': 2 / 3,
+        }
+
+    def test_changes_to_the_models_should_generate_new_responses(
+            self, init_db, client, saved_org_and_user_generator):
+        user, org = saved_org_and_user_generator
+        add_cookie_to_client(client, user)
+        unit = Unit(name='First Unit', symbol='fu', organisation_id=org.id)
+        unit.save()
+        assert 'First Unit' in retrieve_unit_names(client, org)
+
+        unit.name = 'Renamed Unit'
+        unit.update()
+        names = retrieve_unit_names(client, org)
+        assert 'Renamed Unit' in names and 'First Unit' not in names
+
+        Unit.bulk_create([{'name': 'Bulk Unit', 'symbol': 'bu'}])
+        assert 'Bulk Unit' in retrieve_unit_names(client, org)
+
+        Unit.query.filter_by(name='Bulk Unit').delete()
+        db.session.commit()
+        assert 'Bulk Unit' not in retrieve_unit_names(client, org)
+
+        unit.delete()
+        assert 'Renamed Unit' not in retrieve_unit_names(client, org)
+        assert ResponseCache.metrics()['UnitView']['misses'] == 5
+
+    def test_rolled_back_changes_should_not_bump_the_generations(
+            self, init_db, saved_org_and_user_generator):
+        user, org = saved_org_and_user_generator
+        generation_keys = Unit.generation_keys(org.id)
+        generations = RedisMock.mget(generation_keys)
+
+        Unit(name='Rolled Back', symbol='rb',
+             organisation_id=org.id).save(commit=False)
+        db.session.rollback()
+        assert RedisMock.mget(generation_keys) == generations
+
+        Unit(name='Committed', symbol='cm', organisation_id=org.id).save()
+        assert RedisMock.mget(generation_keys)[1] == (generations[1] or 0) + 1
+
+    def test_should_not_cache_views_whose_models_are_not_tracked(self):
+        with pytest.raises(TypeError):
+
+            class UntrackedView(BasePaginatedView):
+                __model__ = Log
+                CACHE_RESPONSES = True
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from api.schemas import LogSchema, UserSchema
+from api.schemas.base import SchemaPool
+from api.utils.local_cache import LocalCache
+
+
+class TestSchemaPool:
+    def setup_method(self):
+        SchemaPool.clear()
+
+    def test_should_return_the_same_instance_for_the_same_options(self):
+        schema = LogSchema.pooled(exclude=['created_by', 'updated_by'],
+                                  many=True)
+        assert schema is SchemaPool.get(
+            LogSchema, exclude=('updated_by', 'created_by'), many=True)
+        assert schema.many
+        assert schema.exclude == {'created_by', 'updated_by'}
+
+    def test_should_return_different_instances_for_different_options(self):
+        schemas = [
+            LogSchema.pooled(),
+            LogSchema.pooled(many=True),
+            LogSchema.pooled(exclude=['created_by']),
+            UserSchema.pooled(),
+        ]
+        assert len(set(map(id, schemas))) == len(schemas)
+
+    def test_should_build_one_instance_when_requested_by_many_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            schemas = list(
+                executor.map(lambda _: LogSchema.pooled(many=True),
+                             range(100)))
+        assert all(schema is schemas[0] for schema in schemas)
+
+    def test_pooled_schemas_should_load_data_like_new_instances(self):
+        data = {'applianceId': 'appliance-id', 'logData': {'a': 1}}
+        assert LogSchema.pooled().load(data) == LogSchema().load(data)
+        assert LogSchema.pooled().load(data) == LogSchema().load(data)
+
+    def test_should_only_keep_the_most_recently_used_sparse_schemas(self):
+        with patch.object(SchemaPool, 'SPARSE_SCHEMAS',
+                          LocalCache(max_size=2, ttl=60)):
+            name_only = SchemaPool.get_sparse(UserSchema,
+                                              exclude=['email', 'username'],
+                                              many=True)
+            assert name_only is SchemaPool.get_sparse(
+                UserSchema, exclude=('username', 'email', 'email'), many=True)
+            assert name_only is not UserSchema.pooled(
+                exclude=['email', 'username'], many=True)
+
+            SchemaPool.get_sparse(UserSchema, exclude=['email'], many=True)
+            SchemaPool.get_sparse(UserSchema, exclude=['username'], many=True)
+            assert name_only is not SchemaPool.get_sparse(
+                UserSchema, exclude=['email', 'username'], many=True)
@@ -0,0 +1,126 @@
+import json
+from datetime import datetime, timezone
+from marshmallow import post_dump
+from api.models import (db, Log, LogValue, Parameter, Appliance,
+                        ApplianceCategory, ApplianceParameter, Unit,
+                        ValueTypeEnum)
+from api.schemas import (LogSchema, ParameterSchema, ApplianceSchema,
+                         ApplianceCategorySchema, ApplianceParameterSchema,
+                         UserSchema)
+from api.schemas.base import BaseSchema, SchemaPool, SerializerCompiler
+from api.utils.id_generator import IDGenerator
+from .mocks.user import UserGenerator
+
+
+def assert_same_dump(schema, objs):
+    expected = schema.dump(objs)
+    compiled = schema.dump_compiled(objs)
+    assert compiled == expected
+    assert json.dumps(compiled) == json.dumps(expected)
+
+
+class TestSerializerCompilerParity:
+    def setup_method(self):
+        SchemaPool.clear()
+
+    def test_compiled_dumps_should_match_the_dumps_of_list_schemas(
+            self, init_db, saved_appliance_generator, saved_logs_generator):
+        org, user, numeric_params, text_params, appliance = saved_appliance_generator(
+            num_of_numeric_units=2, num_of_text_units=1)
+        saved_logs_generator(appliance, numeric_params + text_params, 3)
+        appliance.created_by_id = user.id
+        for param in numeric_params:
+            param.created_by_id = user.id
+        db.session.commit()
+
+        logs = Log.query.filter_by(appliance_id=appliance.id).all()
+        parameters = Parameter.query.filter_by(organisation_id=org.id).all()
+        cases = [
+            (LogSchema, [], logs),
+            (LogSchema, ['created_by', 'updated_by'], logs),
+            (ParameterSchema, [], parameters),
+            (ParameterSchema, ['unit', 'created_at'], parameters),
+            (ApplianceSchema, [],
+             Appliance.query.filter_by(organisation_id=org.id).all()),
+            (ApplianceCategorySchema, ['updated_by'],
+             ApplianceCategory.query.filter_by(organisation_id=org.id).all()),
+            (ApplianceParameterSchema, [],
+             ApplianceParameter.query.filter_by(
+                 appliance_id=appliance.id).all()),
+        ]
+        for schema_class, exclude, objs in cases:
+            assert len(objs) > 0
+            schema = schema_class.pooled(exclude=exclude, many=True)
+            assert_same_dump(schema, objs)
+            assert_same_dump(schema_class.pooled(exclude=exclude), objs[0])
+
+        logs[0].pivoted_values = {numeric_params[0].id: 10}
+        assert_same_dump(LogSchema.pooled(many=True), logs)
+
+    def test_should_dump_mappings_with_the_schema(self):
+        user_dict = {
+            'id': 'user-id',
+            'username': 'user',
+            'verified': 1,
+            'created_at': datetime(2020, 3, 1, tzinfo=timezone.utc),
+        }
+        assert_same_dump(UserSchema.pooled(), user_dict)
+        assert_same_dump(UserSchema.pooled(many=True), [user_dict, user_dict])
+
+    def test_should_not_compile_schemas_with_dump_processors(self):
+        class ProcessedSchema(BaseSchema):
+            @post_dump
+            def add_type(self, data, **kwargs):
+                return {**data, 'type': 'processed'}
+
+        schema = ProcessedSchema()
+        assert SerializerCompiler.get(schema) is None
+        assert schema.dump_compiled(Unit(id='unit-id')) == {
+            'id': 'unit-id',
+            'type': 'processed'
+        }
+
+
+class TestSerializerCompilerPages:
+    NUM_OF_ROWS = 1000
+
+    def generate_logs(self):
+        user = UserGenerator.generate_model_obj(id=IDGenerator.generate_id(),
+                                                created_at=datetime.now())
+        now = datetime.now()
+        return [
+            Log(id=log_id,
+                appliance_id='appliance-id',
+                organisation_id='org-id',
+                created_at=now,
+                updated_at=now,
+                created_by=user,
+                log_values=[
+                    LogValue(parameter_id='param-one', numeric_value=index),
+                    LogValue(parameter_id='param-two', text_value='text'),
+                ]) for index, log_id in enumerate(
+                    IDGenerator.generate_ids(self.NUM_OF_ROWS))
+        ]
+
+    def generate_parameters(self):
+        user = UserGenerator.generate_model_obj(id=IDGenerator.generate_id(),
+                                                created_at=datetime.now())
+        unit = Unit(id='unit-id', name='Kilogram', symbol='kg')
+        now = datetime.now()
+        return [
+            Parameter(id=param_id,
+                      name=f'Parameter {index}',
+                      value_type=ValueTypeEnum.NUMERIC,
+                      organisation_id='org-id',
+                      created_at=now,
+                      updated_at=now,
+                      unit=unit,
+                      created_by=user) for index, param_id in enumerate(
+                          IDGenerator.generate_ids(self.NUM_OF_ROWS))
+        ]
+
+    def test_compiled_dumps_should_match_dumps_on_1000_row_pages(self, app):
+        for schema_class, objs in ((LogSchema, self.generate_logs()),
+                                   (ParameterSchema,
+                                    self.generate_parameters())):
+            assert_same_dump(schema_class.pooled(many=True), objs)
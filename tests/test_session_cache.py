@@ -0,0 +1,66 @@
+from unittest.mock import patch
+from api.utils.local_cache import LocalCache
+from api.services.session_cache import SessionCache
+from api.services.redis_util import RedisUtil
+from api.utils.constants import COOKIE_TOKEN_KEY, REDIS_TOKEN_HASH_KEY
+from .assertions import add_cookie_to_client
+from .mocks.user import UserGenerator
+
+USER_ORGS_URL = '/api/user/orgs'
+
+
+@patch('time.time')
+class TestLocalCache:
+    def test_should_not_return_values_that_have_expired(self, mock_time):
+        mock_time.return_value = 1000
+        cache = LocalCache(max_size=10, ttl=60)
+        cache.set('ttl', 'value')
+        cache.set('expires-at', 'value', expires_at=1010)
+
+        mock_time.return_value = 1020
+        assert cache.get('ttl') == 'value'
+        assert cache.get('expires-at') is None
+
+        mock_time.return_value = 1061
+        assert cache.get('ttl') is None
+
+    def test_should_remove_the_least_recently_used_value_when_full(
+            self, mock_time):
+        mock_time.return_value = 1000
+        cache = LocalCache(max_size=2)
+        cache.set('one', 1)
+        cache.set('two', 2)
+        cache.get('one')
+        cache.set('three', 3)
+
+        assert cache.get('one') == 1
+        assert cache.get('two') is None
+        assert cache.get('three') == 3
+
+
+class TestSessionCache:
+    def test_should_not_read_redis_for_a_recently_verified_cookie(
+            self, init_db, client):
+        user = UserGenerator.generate_model_obj(save=True, verified=True)
+        add_cookie_to_client(client, user)
+
+        with patch.object(RedisUtil, 'hget',
+                          side_effect=RedisUtil.hget) as mock_hget:
+            assert client.get(USER_ORGS_URL).status_code == 200
+            assert client.get(USER_ORGS_URL).status_code == 200
+            assert mock_hget.call_count == 1
+
+    def test_should_reject_cached_cookies_once_the_token_hash_is_deleted(
+            self, init_db, client):
+        user = UserGenerator.generate_model_obj(save=True, verified=True)
+        add_cookie_to_client(client, user)
+        assert client.get(USER_ORGS_URL).status_code == 200
+
+        cookie_value = next(cookie.value for cookie in client.cookie_jar
+                            if cookie.name == COOKIE_TOKEN_KEY)
+        assert SessionCache.get(cookie_value) is not None
+
+        RedisUtil.delete_hash(f'{user.id}_{REDIS_TOKEN_HASH_KEY}')
+
+        assert SessionCache.get(cookie_value) is None
+        assert client.get(USER_ORGS_URL).status_code == 401
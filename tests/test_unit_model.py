@@ -65,3 +65,38 @@ class TestUnitModel:
             'column_must_have_a_value'].format('symbol')
         assert e.value.api_message == model_operations[
             'column_must_have_a_value'].format('symbol')
+
+    def test_bulk_copy_should_save_dicts_and_models_with_generated_ids(
+        self, init_db):
+        create_test_precondition(init_db)
+        units = Unit.bulk_copy([
+            {
+                'name': 'Ohm, "Resistance"',
+                'symbol': 'Ω'
+            },
+            Unit(name='Newton\nMeter', symbol='Nm'),
+        ])
+
+        assert all(unit['id'] if isinstance(unit, dict) else unit.id
+                   for unit in units)
+        saved_units = Unit.query.filter(Unit.symbol.in_(['Ω', 'Nm'])).order_by(
+            Unit.symbol).all()
+        assert [(unit.name, unit.symbol, unit.organisation_id)
+                for unit in saved_units] == [
+                    ('Newton\nMeter', 'Nm', None),
+                    ('Ohm, "Resistance"', 'Ω', None),
+                ]
+        assert saved_units[0].created_at == saved_units[1].created_at
+
+    def test_bulk_copy_should_map_integrity_errors(self, init_db):
+        create_test_precondition(init_db)
+        Unit(name='Hertz', symbol='Hz').save()
+        with pytest.raises(UniqueConstraintException) as e:
+            Unit.bulk_copy([{'name': 'Hertz', 'symbol': 'Hz'}])
+        assert e.value.message == serialization_error['exists_in_org'].format(
+            'Unit')
+
+        with pytest.raises(ModelOperationException) as e:
+            Unit.bulk_copy([{'name': 'Hertz'}])
+        assert e.value.api_message == model_operations[
+            'column_must_have_a_value'].format('symbol')
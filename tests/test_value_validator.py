@@ -0,0 +1,193 @@
+import json
+import warnings
+from api.models import Parameter, ValueTypeEnum
+from api.services.appliance_schema_cache import ApplianceSchemaCache
+from api.services.value_validator import ValueValidator
+from api.utils.error_messages import parameter_errors, serialization_error
+from .assertions import add_cookie_to_client
+
+URL = '/api/org/{}/logs'
+BATCH_URL = '/api/org/{}/logs/batch'
+
+
+def compile_validation(value_type, validation):
+    return ValueValidator(value_type,
+                          Parameter.parse_validation(value_type, validation))
+
+
+class TestValueValidator:
+    def test_should_validate_numeric_bounds(self):
+        validator = compile_validation(ValueTypeEnum.NUMERIC, 'gte 0,lt 500')
+        out_of_bounds = serialization_error['value_out_of_bounds'].format(
+            'more than or equal to 0 and less than 500')
+
+        assert validator.validate([0, '499.5', 500, -1, 'abc', None]) == [
+            None,
+            None,
+            out_of_bounds,
+            out_of_bounds,
+            serialization_error['number_only'],
+            serialization_error['required'],
+        ]
+
+    def test_should_validate_the_options_of_enum_parameters(self):
+        validator = compile_validation(ValueTypeEnum.ENUM, 'low,high')
+
+        assert validator.validate(['low', 'medium']) == [
+            None, serialization_error['invalid_option'].format(
+                'medium', 'high, low')
+        ]
+
+    def test_should_validate_date_bounds(self):
+        validator = compile_validation(ValueTypeEnum.DATE_TIME,
+                                       'gte 2020-01-01T00:00:00Z')
+
+        assert validator.validate(
+            ['2020-01-01T00:30:00+01:00', '2020-01-01', 'not-a-date']) == [
+                serialization_error['value_out_of_bounds'].format(
+                    'more than or equal to 2020-01-01T00:00:00Z'),
+                None,
+                parameter_errors['invalid_date'].format('not-a-date'),
+            ]
+
+    def test_should_reject_list_and_dict_readings(self):
+        for rules in ({}, {'gte': 0.0}):
+            validator = ValueValidator(ValueTypeEnum.NUMERIC, rules)
+            assert validator.validate([[5], {
+                'value': 5
+            }, 5]) == [
+                serialization_error['number_only'],
+                serialization_error['number_only'],
+                None,
+            ]
+
+        validator = compile_validation(ValueTypeEnum.ENUM, 'low,high')
+        assert validator.validate([['low'], {
+            'low': 1
+        }]) == [
+            serialization_error['invalid_option'].format(['low'], 'high, low'),
+            serialization_error['invalid_option'].format({'low': 1},
+                                                         'high, low'),
+        ]
+
+    def test_should_reject_nan_readings_without_comparing_them(self):
+        validator = compile_validation(ValueTypeEnum.NUMERIC, 'gte 0,lt 500')
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            errors = validator.validate(['nan', float('nan'), 'NaN', 5])
+        assert errors == [serialization_error['number_only']] * 3 + [None]
+        assert compile_validation(ValueTypeEnum.NUMERIC, None).validate(
+            ['nan']) == [serialization_error['number_only']]
+
+    def test_should_reject_non_string_date_readings(self):
+        for value_type in (ValueTypeEnum.DATE, ValueTypeEnum.DATE_TIME):
+            for validation in ('gte 2020-01-01', None):
+                validator = compile_validation(value_type, validation)
+                assert validator.validate([5, 20200101.0, '2020-02-01']) == [
+                    parameter_errors['invalid_date'].format(5),
+                    parameter_errors['invalid_date'].format(20200101.0),
+                    None,
+                ]
+
+    def test_should_only_require_values_without_a_validation(self):
+        validator = compile_validation(ValueTypeEnum.TEXT, None)
+        assert validator.validate(
+            ['text', None]) == [None, serialization_error['required']]
+
+    def test_compiled_validation_should_match_parsed_validation(self):
+        validation = 'gte 0,lt 500'
+        values = [str(index % 600) for index in range(1000)]
+        bounds = Parameter.parse_validation(ValueTypeEnum.NUMERIC, validation)
+        expected = [
+            bounds['gte'] <= float(value) < bounds['lt'] for value in values
+        ]
+
+        errors = compile_validation(ValueTypeEnum.NUMERIC,
+                                    validation).validate(values)
+        assert [error is None for error in errors] == expected
+
+
+class TestLogValidation:
+    def setup_method(self):
+        ApplianceSchemaCache.CACHE.clear()
+
+    def create_appliance(self, saved_appliance_generator):
+        org, user, numeric_params, _, appliance = saved_appliance_generator(
+            'ENGINEER', 2)
+        bounded_param = Parameter.query.get(numeric_params[0].id)
+        bounded_param.validation = 'gte 0,lte 100'
+        bounded_param.update()
+        return org, user, numeric_params, appliance
+
+    def test_logs_with_values_out_of_bounds_should_be_rejected(
+            self, init_db, client, saved_appliance_generator):
+        org, user, params, appliance = self.create_appliance(
+            saved_appliance_generator)
+        add_cookie_to_client(client, user)
+
+        response = client.post(URL.format(org.id),
+                               data=json.dumps({
+                                   'applianceId': appliance.id,
+                                   'logData': {
+                                       params[0].id: 101,
+                                       params[1].id: 101
+                                   },
+                               }),
+                               content_type='application/json')
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 400
+        assert response_body['errors'] == {
+            params[0].id:
+            serialization_error['value_out_of_bounds'].format(
+                'more than or equal to 0 and less than or equal to 100')
+        }
+
+    def test_batches_should_report_the_entries_out_of_bounds(
+            self, init_db, client, saved_appliance_generator):
+        org, user, params, appliance = self.create_appliance(
+            saved_appliance_generator)
+        add_cookie_to_client(client, user)
+        entries = [{
+            'applianceId': appliance.id,
+            'logData': {
+                params[0].id: value,
+                params[1].id: value
+            },
+        } for value in (50, 150, 100)]
+
+        response = client.post(BATCH_URL.format(org.id),
+                               data=json.dumps(entries),
+                               content_type='application/json')
+        response_body = json.loads(response.data)
+
+        assert response.status_code == 207
+        assert [
+            failure['index'] for failure in response_body['data']['failed']
+        ] == [1]
+        assert len(response_body['data']['success']) == 2
+
+    def test_logs_with_list_readings_should_be_rejected(
+            self, init_db, client, saved_appliance_generator):
+        org, user, params, appliance = self.create_appliance(
+            saved_appliance_generator)
+        add_cookie_to_client(client, user)
+
+        response = client.post(URL.format(org.id),
+                               data=json.dumps({
+                                   'applianceId': appliance.id,
+                                   'logData': {
+                                       params[0].id: [5],
+                                       params[1].id: {
+                                           'value': 5
+                                       }
+                                   },
+                               }),
+                               content_type='application/json')
+
+        assert response.status_code == 400
+        assert json.loads(response.data)['errors'] == {
+            params[0].id: serialization_error['number_only'],
+            params[1].id: serialization_error['number_only'],
+        }